@@ -173,7 +173,7 @@ def get_job_relation_graph(job_id: str, graph_type: str = "all") -> str:
 def trigger_generate_job_profile(job_name: str) -> str:
     try:
         from job_profile.job_profile_service import (
-            get_job_profile_service, job_profile_conf, _save_profiles_store
+            get_job_profile_service, job_profile_conf
         )
         service = get_job_profile_service()
         target_jobs = job_profile_conf.get("target_jobs", [])
@@ -185,8 +185,7 @@ def trigger_generate_job_profile(job_name: str) -> str:
                     f"支持生成的岗位：{', '.join(available)}")
 
         profile = service.generate_profile(job_config)
-        service.profiles_store[job_config["job_id"]] = profile
-        _save_profiles_store(service.profiles_store)
+        service.store_profile(job_config["job_id"], profile)
 
         return (f"✅ 岗位画像生成完成！\n"
                 f"岗位：{profile['job_name']}\n"
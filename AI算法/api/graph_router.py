@@ -104,11 +104,18 @@ def job_recruitments():
 
 @graph_bp.route('/job/search', methods=['POST'])
 def job_search():
-    keyword = (request.get_json(silent=True) or {}).get('keyword', '').strip()
+    """岗位搜索；可选 salary_min / salary_max（月薪，元）按薪资区间筛选"""
+    body = request.get_json(silent=True) or {}
+    keyword = body.get('keyword', '').strip()
     if not keyword:
         return _json.dumps({'code': 400, 'msg': '关键词不能为空', 'data': None}, ensure_ascii=False), 400, {'Content-Type': 'application/json'}
     try:
-        results = search_jobs(keyword, top_n=10)
+        salary_min = float(body['salary_min']) if body.get('salary_min') not in (None, '') else None
+        salary_max = float(body['salary_max']) if body.get('salary_max') not in (None, '') else None
+    except (TypeError, ValueError):
+        return _json.dumps({'code': 400, 'msg': 'salary_min / salary_max 须为数字', 'data': None}, ensure_ascii=False), 400, {'Content-Type': 'application/json'}
+    try:
+        results = search_jobs(keyword, top_n=10, salary_min=salary_min, salary_max=salary_max)
         return _json.dumps({'code': 200, 'msg': 'success', 'data': {'jobs': results, 'total': len(results)}}, ensure_ascii=False), 200, {'Content-Type': 'application/json'}
     except Exception as e:
         logger.exception("[graph] job/search 异常")
@@ -10,16 +10,16 @@
   POST /api/v1/job/ai-generate-result   - 4.5 获取AI生成结果
 """
 
-import csv
 import json
 import os
+import time
 from flask import Blueprint, request, jsonify, Response
 from datetime import datetime
 import threading
 import json as _json
 
-import csv
-from job_profile.job_profile_service import get_job_profile_service, job_profile_conf, _load_profiles_store
+from job_profile.job_catalog import get_job_catalog
+from job_profile.job_profile_service import get_job_profile_service, job_profile_conf
 from job_profile.job_graph_service import get_job_graph_service
 from job_profile.career_path_generator import generate_career_path
 from utils.logger_handler import logger
@@ -267,13 +267,14 @@ def _run_task_async(task_id: str, func, *args, **kwargs):
 # POST /api/v1/job/profiles  或  GET /api/v1/job/profiles?page=1&size=12&keyword=xxx&industry=xxx&level=xxx
 # ============================================================
 def _get_profiles_params():
-    """从 GET 查询串或 POST body 读取 page, size, keyword, industry, level"""
+    """从 GET 查询串或 POST body 读取 page, size, keyword, industry, level 及可选的 city, company_type, company_scale"""
     if request.method == "GET":
         page = request.args.get("page", "1")
         size = request.args.get("size", "20")
         keyword = request.args.get("keyword", "").strip() or None
         industry = request.args.get("industry", "").strip() or None
         level = request.args.get("level", "").strip() or None
+        extra = {k: request.args.get(k, "").strip() or None for k in ("city", "company_type", "company_scale")}
     else:
         body = request.get_json(silent=True) or {}
         page = body.get("page", 1)
@@ -281,25 +282,26 @@ def _get_profiles_params():
         keyword = body.get("keyword") or None
         industry = body.get("industry") or None
         level = body.get("level") or None
+        extra = {k: body.get(k) or None for k in ("city", "company_type", "company_scale")}
     page = int(page) if page else 1
     size = int(size) if size else 20
-    return page, size, keyword, industry, level
+    return page, size, keyword, industry, level, extra
 
 
 @job_bp.route("/profiles", methods=["GET", "POST"])
 def get_job_profiles():
     """
     获取岗位画像列表。GET 用查询参数，POST 用请求体。
-    参数：page, size, keyword, industry, level
+    参数：page, size, keyword, industry, level；可选 city, company_type, company_scale
     """
     try:
-        page, size, keyword, industry, level = _get_profiles_params()
+        page, size, keyword, industry, level, extra = _get_profiles_params()
         if page < 1 or size < 1 or size > 100:
             return error_response(400, "分页参数错误：page>=1, 1<=size<=100")
 
         service = get_job_profile_service()
         result = service.get_profile_list(page=page, size=size,
-                                          keyword=keyword, industry=industry, level=level)
+                                          keyword=keyword, industry=industry, level=level, **extra)
         return success_response(result)
 
     except Exception as e:
@@ -313,35 +315,31 @@ def get_job_profiles():
 # ============================================================
 
 def _search_csv(job_name, size):
-    """从 CSV 按岗位名前 4 字模糊匹配，最多返回 size 条。"""
-    csv_path = get_abs_path("data/求职岗位信息数据.csv")
-    if not job_name or not os.path.exists(csv_path):
+    """从 CSV（共享岗位目录中的行）按岗位名前 4 字模糊匹配，最多返回 size 条。"""
+    if not job_name:
         return []
     keyword = (job_name[:4] if len(job_name) >= 4 else job_name).strip()
     if not keyword:
         return []
     results = []
     try:
-        with open(csv_path, encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                title = (row.get("职位名称") or "").strip()
-                if keyword in title:
-                    desc = (row.get("职位描述") or "").strip()
-                    intro = (row.get("公司简介") or "").strip()
-                    results.append({
-                        "jobTitle": title,
-                        "company": row.get("公司全称", ""),
-                        "salary": row.get("薪资范围", ""),
-                        "address": row.get("工作地址", ""),
-                        "industry": row.get("所属行业", ""),
-                        "scale": row.get("人员规模", ""),
-                        "companyType": row.get("企业性质", ""),
-                        "description": (desc[:200] + "…") if len(desc) > 200 else desc,
-                        "companyIntro": (intro[:150] + "…") if len(intro) > 150 else intro,
-                    })
-                    if len(results) >= size:
-                        break
+        catalog = get_job_catalog()
+        for i in catalog.rows_where("职位名称", lambda title: keyword in title.strip(), limit=size):
+            row = catalog.row(i)
+            title = row.get("职位名称", "").strip()
+            desc = (row.get("职位描述") or "").strip()
+            intro = (row.get("公司简介") or "").strip()
+            results.append({
+                "jobTitle": title,
+                "company": row.get("公司全称", ""),
+                "salary": row.get("薪资范围", ""),
+                "address": row.get("工作地址", ""),
+                "industry": row.get("所属行业", ""),
+                "scale": row.get("人员规模", ""),
+                "companyType": row.get("企业性质", ""),
+                "description": (desc[:200] + "…") if len(desc) > 200 else desc,
+                "companyIntro": (intro[:150] + "…") if len(intro) > 150 else intro,
+            })
     except Exception as e:
         logger.warning(f"[API] real-data 读取 CSV 失败: {e}", exc_info=True)
     return results
@@ -627,10 +625,10 @@ def _resolve_job_id_for_graph(job_id):
         return job_id, (job_index[job_id].get("name") or job_id)
 
     # 从 profiles_store 取岗位名称，再按名称匹配 target_jobs
-    profiles = _load_profiles_store()
+    profile = get_job_catalog().get(job_id)
     job_name = ""
-    if job_id in profiles:
-        job_name = (profiles[job_id].get("job_name") or "").strip()
+    if isinstance(profile, dict):
+        job_name = (profile.get("job_name") or "").strip()
     if not job_name:
         job_name = job_id
     # 去掉括号后缀便于匹配，如 "算法工程师(A174435)" -> "算法工程师"
@@ -657,6 +655,13 @@ def _build_graph_data_from_json(resolved_id, graph_type, display_name, job_index
     except Exception as e:
         logger.warning(f"[API] 读取 graph.json 失败: {e}")
         return None
+    # 预计算流水线（graph_precompute）写入的该岗位完整图谱优先
+    precomputed = (graph_file.get("precomputed") or {}).get(resolved_id)
+    if isinstance(precomputed, dict) and precomputed.get("center_job"):
+        from job_profile.job_relations_db import select_graph_type
+        result = {key: precomputed[key] for key in ("center_job", "vertical_graph", "transfer_graph", "career_path")
+                  if key in precomputed}
+        return select_graph_type(result, graph_type)
     nodes_by_id = {n["job_id"]: n for n in graph_file.get("transfer_graph", {}).get("nodes", [])}
     all_edges = graph_file.get("transfer_graph", {}).get("edges", [])
     center_node = nodes_by_id.get(resolved_id, {})
@@ -698,6 +703,10 @@ def _build_graph_data_from_json(resolved_id, graph_type, display_name, job_index
     return result
 
 
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 2)
+
+
 @job_bp.route("/relation-graph", methods=["POST"])
 def get_job_relation_graph():
     """
@@ -710,6 +719,7 @@ def get_job_relation_graph():
     job_id = (body.get("job_id") or "").strip()
     graph_type = body.get("graph_type", "all")
     logger.info(f"[API] relation-graph 接口被调用, 参数: job_id={job_id!r}, graph_type={graph_type!r}")
+    request_start = time.perf_counter()
 
     try:
         if not job_id:
@@ -734,6 +744,7 @@ def get_job_relation_graph():
                         db_data[key] = _empty_graph_data(resolved_id)[key]
                 if display_name and db_data.get("center_job"):
                     db_data["center_job"]["job_name"] = display_name
+                db_data["timings"] = {"source": "db", "total_ms": _elapsed_ms(request_start)}
                 return success_response(db_data)
         except Exception as e:
             logger.warning(f"[API] relation-graph 从 DB 读取失败: {e}")
@@ -744,9 +755,19 @@ def get_job_relation_graph():
             for key in ("center_job", "vertical_graph", "transfer_graph", "career_path"):
                 if key not in json_data:
                     json_data[key] = _empty_graph_data(resolved_id)[key]
+            json_data["timings"] = {"source": "graph_json", "total_ms": _elapsed_ms(request_start)}
             return success_response(json_data)
 
-        # 3) 回退实时构建（可能较慢）
+        # target_jobs 的图谱由后台预计算（graph_precompute）生成，调度运行中且未构建失败时不在请求内实时调用 LLM
+        from job_profile.graph_precompute import is_graph_pending
+        if resolved_id in job_index and is_graph_pending(resolved_id):
+            data = _empty_graph_data(resolved_id, "图谱生成中，请稍后再试")
+            data["center_job"]["job_name"] = display_name or resolved_id
+            data["timings"] = {"source": "pending", "total_ms": _elapsed_ms(request_start)}
+            return success_response(data)
+
+        # 3) 回退实时构建（可能较慢）；timings 在服务内各阶段耗时的基础上补充前两步查找耗时
+        lookup_ms = _elapsed_ms(request_start)
         graph_service = get_job_graph_service()
         graph_data = graph_service.get_job_graph(resolved_id, graph_type)
 
@@ -758,6 +779,9 @@ def get_job_relation_graph():
                     graph_data[key] = _empty_graph_data(resolved_id)[key]
         if display_name and graph_data.get("center_job"):
             graph_data["center_job"]["job_name"] = display_name
+        timings = graph_data.get("timings") if isinstance(graph_data.get("timings"), dict) else {}
+        graph_data["timings"] = {"source": "live", "lookup_ms": lookup_ms, **timings,
+                                 "total_ms": _elapsed_ms(request_start)}
         return success_response(graph_data)
 
     except ValueError as e:
@@ -784,8 +808,7 @@ def get_job_career_path():
         job_name = (request.args.get("jobName") or "").strip()
         job_id = (request.args.get("jobId") or "").strip()
         if not job_name and job_id:
-            profiles = _load_profiles_store()
-            profile = profiles.get(job_id) if isinstance(profiles, dict) else None
+            profile = get_job_catalog().get(job_id)
             if profile and isinstance(profile, dict):
                 job_name = (profile.get("job_name") or profile.get("name") or "").strip()
             if not job_name:
@@ -962,9 +985,7 @@ def ai_generate_profile():
                 if job_descriptions:
                     cfg["external_jd_list"] = job_descriptions[:sample_size]
                 profile = service.generate_profile(cfg)
-                service.profiles_store[cfg["job_id"]] = profile
-                from job_profile.job_profile_service import _save_profiles_store
-                _save_profiles_store(service.profiles_store)
+                service.store_profile(cfg["job_id"], profile)
                 return profile
 
             _run_task_async(task_id, _generate_single)
@@ -993,12 +1014,12 @@ def ai_generate_profile():
                     cfg["job_id"] = _synthetic_job_id(name, tid)
                     try:
                         profile = service.generate_profile(dict(cfg))
-                        service.profiles_store[cfg["job_id"]] = profile
+                        service.store_profile(cfg["job_id"], profile, persist=False)
                         results[name] = cfg["job_id"]
                     except Exception as ex:
                         errors[name] = str(ex)
                 from job_profile.job_profile_service import _save_profiles_store
-                _save_profiles_store(service.profiles_store)
+                _save_profiles_store()
                 return {"results": results, "errors": errors}
 
             _run_task_async(task_id, _generate_batch)
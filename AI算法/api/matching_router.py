@@ -4,14 +4,19 @@
 
 路由列表：
   POST /api/v1/matching/recommend-jobs    - 6.1 获取推荐岗位
+  POST /api/v1/matching/recommend-jobs/stream - 6.1 获取推荐岗位（SSE：先推送分数，再逐个推送推荐解释）
   POST /api/v1/matching/analyze           - 6.2 获取单个岗位匹配分析
   POST /api/v1/matching/batch-analyze     - 6.3 批量匹配分析
+  GET  /api/v1/matching/cache-stats       - 辅助：匹配缓存命中统计
 """
 
-from flask import Blueprint, request, jsonify
+import json
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from datetime import datetime
 
 from matching.matching_service import get_job_matching_service
+from job_profile.profile_filter_index import parse_salary_min
 from utils.logger_handler import logger
 
 # 创建Blueprint
@@ -28,6 +33,48 @@ def error_response(code, msg, data=None):
     return jsonify({"code": code, "msg": msg, "data": data}), code
 
 
+def _parse_top_n(body, default: int = 10) -> int:
+    """
+    请求体中的 top_n（缺省为 default）：只接受整数或纯数字字符串（不接受 3.7、true 等），
+    否则或不在 1-50 之间时抛 ValueError
+    """
+    value = body.get("top_n", default)
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError("top_n 参数应为整数")
+    if value < 1 or value > 50:
+        raise ValueError("top_n 参数应在1-50之间")
+    return value
+
+
+def _parse_flag(body, key: str, default: bool = False) -> bool:
+    """请求体中的布尔开关：接受 true/false、1/0 及其字符串形式（"false" 为假），其他取值抛 ValueError"""
+    value = body.get(key, default)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ("true", "1", "false", "0", ""):
+        return value.strip().lower() in ("true", "1")
+    raise ValueError(f"{key} 参数应为布尔值")
+
+
+def _parse_filters(body) -> dict:
+    """请求体中的 filters（默认 {}）；salary_min 转为数值（空值去掉），filters 非对象或 salary_min 非数字时抛 ValueError"""
+    filters = body.get("filters") or {}
+    if not isinstance(filters, dict):
+        raise ValueError("filters 参数应为对象")
+    if "salary_min" in filters:
+        filters = dict(filters)
+        salary_min = parse_salary_min(filters.pop("salary_min"))
+        if salary_min is not None:
+            filters["salary_min"] = salary_min
+    return filters
+
+
 # ============================================================
 # 6.1 获取推荐岗位
 # POST /api/v1/matching/recommend-jobs
@@ -36,24 +83,27 @@ def error_response(code, msg, data=None):
 def recommend_jobs():
     """
     基于学生能力画像，推荐匹配的岗位
-    请求体：{ user_id, top_n, filters [, ability_profile] }
+    请求体：{ user_id, top_n, filters [, ability_profile, exhaustive] }
     ability_profile: 可选，由 Java 传入的能力画像，有则优先使用
+    exhaustive: 可选，true 时跳过粗排、对全部岗位精排（用于对比两阶段召回）
     """
     try:
         body = request.get_json(silent=True) or {}
         user_id = body.get("user_id")
-        top_n = body.get("top_n", 10)
-        filters = body.get("filters", {})
         ability_profile = body.get("ability_profile")
 
         if not user_id:
             return error_response(400, "请提供 user_id 参数")
 
-        if top_n < 1 or top_n > 50:
-            return error_response(400, "top_n 参数应在1-50之间")
+        try:
+            top_n = _parse_top_n(body)
+            exhaustive = _parse_flag(body, "exhaustive")
+            filters = _parse_filters(body)
+        except ValueError as e:
+            return error_response(400, str(e))
 
         service = get_job_matching_service()
-        result = service.recommend_jobs(user_id, top_n, filters, ability_profile=ability_profile)
+        result = service.recommend_jobs(user_id, top_n, filters, ability_profile=ability_profile, exhaustive=exhaustive)
 
         logger.info(f"[API] 为用户{user_id}推荐{len(result['recommendations'])}个岗位")
         
@@ -66,6 +116,59 @@ def recommend_jobs():
         return error_response(500, f"服务器内部错误: {str(e)}")
 
 
+# ============================================================
+# 6.1 获取推荐岗位（流式）
+# POST /api/v1/matching/recommend-jobs/stream
+# ============================================================
+@matching_bp.route("/recommend-jobs/stream", methods=["POST"])
+def recommend_jobs_stream():
+    """
+    与 /recommend-jobs 参数相同，以 SSE 返回：
+      data: {"type": "scores", "data": {total_matched, recommendations(不含推荐解释), retrieval}}
+      data: {"type": "explanation", "data": {job_id, match_reason, strengths, skill_gap, growth_potential}}  （每个岗位一条）
+      data: [DONE]
+    """
+    body = request.get_json(silent=True) or {}
+    user_id = body.get("user_id")
+    ability_profile = body.get("ability_profile")
+
+    if not user_id:
+        return error_response(400, "请提供 user_id 参数")
+
+    try:
+        top_n = _parse_top_n(body)
+        exhaustive = _parse_flag(body, "exhaustive")
+        filters = _parse_filters(body)
+    except ValueError as e:
+        return error_response(400, str(e))
+
+    service = get_job_matching_service()
+
+    def generate():
+        try:
+            for event, data in service.stream_recommendations(
+                user_id, top_n, filters, ability_profile=ability_profile, exhaustive=exhaustive
+            ):
+                yield f"data: {json.dumps({'type': event, 'data': data}, ensure_ascii=False)}\n\n"
+        except ValueError as e:
+            yield f"data: {json.dumps({'type': 'error', 'code': 404, 'msg': str(e)}, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"[API] /matching/recommend-jobs/stream 异常: {e}", exc_info=True)
+            yield f"data: {json.dumps({'type': 'error', 'code': 500, 'msg': f'服务器内部错误: {str(e)}'}, ensure_ascii=False)}\n\n"
+        finally:
+            yield "data: [DONE]\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Connection": "keep-alive",
+        },
+    )
+
+
 # ============================================================
 # 6.x 语义岗位搜索（Embedding + FAISS）
 # POST /api/v1/matching/search-jobs
@@ -80,11 +183,11 @@ def search_jobs():
     try:
         body = request.get_json(silent=True) or {}
         keyword = body.get("keyword", "") or ""
-        top_n = body.get("top_n", 20)
-        filters = body.get("filters", {}) or {}
-
-        if top_n < 1 or top_n > 50:
-            return error_response(400, "top_n 参数应在1-50之间")
+        try:
+            top_n = _parse_top_n(body, 20)
+            filters = _parse_filters(body)
+        except ValueError as e:
+            return error_response(400, str(e))
 
         service = get_job_matching_service()
         result = service.search_jobs(keyword, top_n, filters)
@@ -141,8 +244,9 @@ def analyze_job():
 @matching_bp.route("/batch-analyze", methods=["POST"])
 def batch_analyze():
     """
-    分析学生与多个岗位的匹配情况
-    请求体：{ user_id, job_ids }
+    分析学生与多个岗位的匹配情况（并发分析，单岗位超时 / 失败不影响其余岗位）
+    请求体：{ user_id, job_ids [, ability_profile] }
+    返回：{ analyses, best_match, errors: [{job_id, error}], partial }
     """
     try:
         body = request.get_json(silent=True) or {}
@@ -166,6 +270,8 @@ def batch_analyze():
         
         return success_response(result)
 
+    except ValueError as e:
+        return error_response(404, str(e))
     except Exception as e:
         logger.error(f"[API] /matching/batch-analyze 异常: {e}", exc_info=True)
         return error_response(500, f"服务器内部错误: {str(e)}")
@@ -177,8 +283,9 @@ def batch_analyze():
 @matching_bp.route("/statistics", methods=["POST"])
 def get_matching_statistics():
     """
-    获取匹配度统计信息
-    请求体：{ user_id }
+    获取匹配度统计信息（覆盖全部岗位）
+    请求体：{ user_id [, filters, ability_profile] }
+    返回：分档计数、平均分，以及 summary（数量 / 均值 / 极值 / 分位数 / 10 分一档的直方图）
     """
     try:
         body = request.get_json(silent=True) or {}
@@ -186,35 +293,40 @@ def get_matching_statistics():
 
         if not user_id:
             return error_response(400, "请提供 user_id 参数")
+        try:
+            filters = _parse_filters(body)
+        except ValueError as e:
+            return error_response(400, str(e))
 
         service = get_job_matching_service()
-        
-        # 推荐所有岗位，不限制数量
-        all_matches = service.recommend_jobs(user_id, top_n=100, filters={})
-        
-        # 统计匹配度分布
-        high_match = len([r for r in all_matches["recommendations"] if r["match_score"] >= 85])
-        medium_match = len([r for r in all_matches["recommendations"] if 70 <= r["match_score"] < 85])
-        low_match = len([r for r in all_matches["recommendations"] if r["match_score"] < 70])
-        
-        # 平均匹配度
-        avg_score = sum([r["match_score"] for r in all_matches["recommendations"]]) / len(all_matches["recommendations"]) if all_matches["recommendations"] else 0
-        
-        statistics = {
-            "total_jobs": all_matches["total_matched"],
-            "high_match_count": high_match,
-            "medium_match_count": medium_match,
-            "low_match_count": low_match,
-            "average_match_score": int(avg_score),
-            "distribution": {
-                "85-100分": high_match,
-                "70-84分": medium_match,
-                "0-69分": low_match
-            }
-        }
+
+        # 全部岗位的分数分布（只汇总分数，不生成逐岗位推荐结果）
+        statistics = service.matching_statistics(user_id, filters=filters,
+                                                 ability_profile=body.get("ability_profile"))
         
         return success_response(statistics)
 
+    except ValueError as e:
+        return error_response(404, str(e))
     except Exception as e:
         logger.error(f"[API] /matching/statistics 异常: {e}", exc_info=True)
         return error_response(500, f"服务器内部错误: {str(e)}")
+
+
+# ============================================================
+# 辅助接口：匹配缓存命中统计
+# GET /api/v1/matching/cache-stats
+# ============================================================
+@matching_bp.route("/cache-stats", methods=["GET"])
+def get_cache_stats():
+    """返回 LLM 技能验证缓存、岗位推荐结果缓存的命中/未命中计数"""
+    try:
+        from matching.verdict_cache import get_verdict_cache
+        from matching.recommendation_cache import get_recommendation_cache
+        return success_response({
+            "llm_verdicts": get_verdict_cache().stats(),
+            "recommendations": get_recommendation_cache().stats(),
+        })
+    except Exception as e:
+        logger.error(f"[API] /matching/cache-stats 异常: {e}", exc_info=True)
+        return error_response(500, f"服务器内部错误: {str(e)}")
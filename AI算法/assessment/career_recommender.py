@@ -5,11 +5,11 @@
 - 最匹配职业（suitable_careers，来自数据集）
 """
 
-import csv
-import os
 from typing import List, Dict, Any, Optional, Tuple
 from utils.logger_handler import logger
-from utils.path_tool import get_abs_path
+from job_profile.job_catalog import get_job_catalog
+# JOB_TITLE_TO_FIELD（职位名称关键词 -> 标准领域）与其他职位名称归一化规则统一放在 job_title_attrs
+from job_profile.job_title_attrs import JOB_TITLE_TO_FIELD, job_field  # noqa: F401
 
 
 # 适合职业领域：固定为计算机相关岗位类型（用于报告展示）
@@ -26,20 +26,6 @@ STANDARD_IT_FIELDS = [
     "网络安全工程师",
 ]
 
-# 职位名称关键词 -> 标准领域（用于从 CSV 职位归类）
-JOB_TITLE_TO_FIELD = [
-    (["前端", "web前端", "vue", "react", "前端开发"], "前端开发工程师"),
-    (["后端", "java开发", "python开发", "go开发", "服务端", "后台开发", "开发工程师", "软件开发"], "后端开发工程师"),
-    (["算法", "机器学习", "深度学习", "AI", "人工智能", "算法工程师"], "算法工程师"),
-    (["产品经理", "产品专员", "ITBP", "产品助理"], "产品经理"),
-    (["UI", "UX", "交互设计", "界面设计", "视觉设计", "设计师"], "UI/UX设计师"),
-    (["数据分析", "数据开发", "数据工程师", "BI", "数据科学"], "数据分析师"),
-    (["测试", "QA", "测试工程师", "测试开发"], "测试工程师"),
-    (["运维", "运维工程师", "DevOps", "SRE", "IT运维", "系统运维", "运维开发"], "运维工程师"),
-    (["项目经理", "项目主管", "PM", "项目管理", "实施经理"], "项目经理"),
-    (["安全", "网络安全", "信息安全", "安全工程师", "渗透"], "网络安全工程师"),
-]
-
 # Holland 类型 -> 更匹配的标准领域（用于按兴趣排序）
 HOLLAND_TO_FIELDS = {
     "R": ["运维工程师", "网络安全工程师", "测试工程师"],  # 实用型
@@ -52,28 +38,25 @@ HOLLAND_TO_FIELDS = {
 
 
 def _load_jobs_csv() -> List[Dict[str, str]]:
-    """加载求职岗位信息数据.csv，只保留计算机/IT 相关岗位。"""
-    path = get_abs_path("data/求职岗位信息数据.csv")
-    if not os.path.exists(path):
-        logger.warning("[CareerRecommender] 岗位数据文件不存在: %s", path)
-        return []
-
+    """加载求职岗位信息数据.csv（共享岗位目录中的行），只保留计算机/IT 相关岗位。"""
     rows = []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if not reader.fieldnames:
-                return []
-            for row in reader:
-                job_id = (row.get("职位编号") or "").strip()
-                title = (row.get("职位名称") or "").strip()
-                # 筛选：职位编号以 IT- 开头，或职位名称包含计算机相关关键词
-                if job_id.startswith("IT-"):
-                    rows.append({"职位名称": title, "职位编号": job_id, "职位描述": row.get("职位描述", "")})
-                    continue
-                low = title.lower()
-                if any(k in low or k in title for k in ["开发", "算法", "测试", "运维", "产品经理", "数据", "IT", "软件", "程序员", "工程师", "项目经理", "信息化", "网络安全"]):
-                    rows.append({"职位名称": title, "职位编号": job_id, "职位描述": row.get("职位描述", "")})
+        catalog = get_job_catalog()
+        if catalog.row_count == 0:
+            logger.warning("[CareerRecommender] 岗位数据文件不存在或为空: %s", catalog.csv_path)
+            return []
+        # 岗位领域为岗位目录按职位名称预先算好的派生列
+        for row in catalog.iter_rows(columns=("职位编号", "职位名称", "职位描述", "岗位领域")):
+            job_id = (row.get("职位编号") or "").strip()
+            title = (row.get("职位名称") or "").strip()
+            item = {"职位名称": title, "职位编号": job_id, "职位描述": row.get("职位描述", ""), "岗位领域": row.get("岗位领域")}
+            # 筛选：职位编号以 IT- 开头，或职位名称包含计算机相关关键词
+            if job_id.startswith("IT-"):
+                rows.append(item)
+                continue
+            low = title.lower()
+            if any(k in low or k in title for k in ["开发", "算法", "测试", "运维", "产品经理", "数据", "IT", "软件", "程序员", "工程师", "项目经理", "信息化", "网络安全"]):
+                rows.append(item)
     except Exception as e:
         logger.error("[CareerRecommender] 读取岗位CSV失败: %s", e, exc_info=True)
         return []
@@ -81,13 +64,10 @@ def _load_jobs_csv() -> List[Dict[str, str]]:
 
 
 def _normalize_title_to_field(title: str) -> Optional[str]:
-    """将职位名称映射到标准领域之一。"""
+    """将职位名称映射到标准领域之一（按名称备忘）。"""
     if not title:
         return None
-    for keywords, field in JOB_TITLE_TO_FIELD:
-        if any(kw in title for kw in keywords):
-            return field
-    return None
+    return job_field(title)
 
 
 def _score_job_by_holland(title: str, field: Optional[str], holland_code: str, holland_scores: Optional[Dict[str, int]] = None) -> float:
@@ -183,7 +163,7 @@ def recommend_fields_and_careers(
     scored = []
     for j in jobs:
         title = j.get("职位名称") or ""
-        field = _normalize_title_to_field(title)
+        field = j.get("岗位领域")
         s = _score_job_by_holland(title, field, code, holland_scores)
         scored.append((title, field, s))
 
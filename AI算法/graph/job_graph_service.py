@@ -1,102 +1,233 @@
 # 关联图谱：岗位搜索与薪资上下文（基于 求职岗位信息数据.csv）
-import pandas as pd
 import re
-import os
-from functools import lru_cache
+import threading
 
-CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', '求职岗位信息数据.csv')
+import numpy as np
+
+from job_profile.job_catalog import get_job_catalog
+from job_profile.salary_index import parse_salary_range
+from job_profile.job_title_attrs import JOB_CATEGORIES, job_category  # noqa: F401  JOB_CATEGORIES 保留原导入路径
+
+SEARCH_COLUMNS = ('职位编号', '职位名称', '薪资范围', '工作地址', '公司全称', '所属行业',
+                  '职位描述', '企业性质', '人员规模', '公司简介')
 
 
-@lru_cache(maxsize=1)
 def load_jobs():
-    """启动时加载一次，缓存内存，不要每次请求都读文件"""
-    df = pd.read_csv(CSV_PATH, encoding='utf-8-sig')
-    df = df.fillna('')
-    return df
+    """岗位数据来自共享的岗位目录（JobCatalog），进程内只加载一份，不再单独读取 CSV"""
+    catalog = get_job_catalog()
+    if catalog.row_count == 0:
+        raise FileNotFoundError(catalog.csv_path)
+    return catalog
+
+
+def _salary_dict(r) -> dict:
+    if r is None:
+        return None
+    return {"min": r.min, "max": r.max, "display": f"{r.min//1000}k–{r.max//1000}k"}
 
 
 def parse_salary(s: str) -> dict:
-    """统一解析各种薪资格式为结构化数据"""
+    """
+    统一解析各种薪资格式为结构化数据（解析规则见 job_profile.salary_index，按原文备忘）。
+    min / max 为月薪（元），与检索的薪资区间筛选使用同一解析结果。
+
+    与原先只认 "x-y万"、"x-y元" 的正则相比，行为有变化：
+    - "15k-25k"、"8-12千"、无单位的 "8000-12000"、单值 "1万" 原先 min/max 为 None、display 为原文，现在解析为区间
+    - "/天" 按每月 21.75 个工作日、"/年" 按 12 个月折算为月薪（原先直接取原数值）
+    - "8000-1.2万" 左侧按元（原先两侧都按万，得到 8000 万）；上下限颠倒时交换
+    "x-y万"、"x-y元"（含 "·13薪"）、面议与无法识别的写法结果不变。
+    """
     if not s or str(s).strip() == '面议':
         return {"min": None, "max": None, "display": "面议"}
-    s = re.sub(r'·\d+薪', '', str(s)).strip()
-    m = re.search(r'([\d.]+)-([\d.]+)万', s)
-    if m:
-        lo, hi = int(float(m.group(1)) * 10000), int(float(m.group(2)) * 10000)
-        return {"min": lo, "max": hi, "display": f"{lo//1000}k–{hi//1000}k"}
-    m = re.search(r'(\d+)-(\d+)元', s)
-    if m:
-        lo, hi = int(m.group(1)), int(m.group(2))
-        return {"min": lo, "max": hi, "display": f"{lo//1000}k–{hi//1000}k"}
-    return {"min": None, "max": None, "display": str(s)}
-
-
-JOB_CATEGORIES = {
-    "算法工程师":     ["算法", "计算机视觉", "CV", "NLP", "深度学习", "AI工程", "大模型", "机器学习工程"],
-    "数据分析师":     ["数据分析", "数据挖掘", "BI", "数据运营", "报表分析"],
-    "产品经理":       ["产品经理", "产品总监", "AI产品", "产品负责人", "产品运营"],
-    "后端开发工程师": ["后端", "Java工程师", "Python开发", "服务端", "Spring", "Go工程师", "Node.js"],
-    "前端开发工程师": ["前端", "React", "Vue", "H5开发", "小程序开发", "Web开发"],
-    "数据科学家":     ["数据科学", "机器学习", "统计建模", "量化建模"],
-    "大数据架构师":   ["架构师", "大数据", "Spark", "Flink", "Hadoop", "系统架构", "技术总监"],
-    "量化研究员":     ["量化", "策略研究", "量化交易", "对冲基金"],
-    "AI研究员":       ["研究员", "research scientist", "AI研究", "创新算法", "前沿算法"],
-    "运维工程师":     ["运维", "DevOps", "SRE", "k8s", "容器化", "云原生"],
-}
+    return _salary_dict(parse_salary_range(str(s))) or {"min": None, "max": None, "display": str(s)}
 
 
 def normalize_job(name: str) -> str:
-    """将原始职位名标准化为标准岗位名"""
-    for std, kws in JOB_CATEGORIES.items():
-        for kw in kws:
-            if kw.lower() in (name or '').lower():
-                return std
-    return name or ""
-
-
-def search_jobs(keyword: str, top_n: int = 10) -> list:
-    """从CSV检索岗位，支持精确/模糊/标准化/描述匹配，响应 < 100ms"""
-    df = load_jobs()
+    """将原始职位名标准化为标准岗位名（规则见 job_title_attrs.JOB_CATEGORIES，按名称备忘）"""
+    return job_category(name)
+
+
+# 匹配层级分数：名称完全相同 / 名称包含 / 标准岗位名相同 / 标准岗位名包含 / 职位描述包含
+SCORE_EXACT, SCORE_NAME, SCORE_STD_EXACT, SCORE_STD, SCORE_DESC = 100, 80, 70, 60, 30
+
+
+def _ngrams(text: str, n: int) -> set:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class JobSearchIndex:
+    """
+    岗位检索索引（按岗位目录的一个状态构建，目录重新加载后重建）：
+    - 职位名称按去重后的名称建索引：名称 -> 行号数组，字符 1-gram / 2-gram 倒排表 -> 名称序号
+    - 标准岗位名取岗位目录的「岗位类别」列（入库时按名称算好），标准岗位名 -> 名称序号
+    - 职位描述：不另存副本，直接在列式快照的职位描述字节上做正则匹配（英文字母不区分大小写），
+      按行号顺序命中足够行数即停止
+    """
+
+    def __init__(self, catalog):
+        state = catalog.state
+        self.state = state
+        names = state.column('职位名称')
+        categories = state.column('岗位类别')
+        self.n_rows = len(names)
+        rows_by_name = {}
+        std_by_name = {}
+        for i, name in enumerate(names):
+            rows_by_name.setdefault(str(name), []).append(i)
+            std_by_name.setdefault(str(name), categories[i])
+        self.names = list(rows_by_name)
+        self.name_lower = [name.lower() for name in self.names]
+        self.name_rows = [np.asarray(rows, dtype=np.int64) for rows in rows_by_name.values()]
+        self.std_lower = [std_by_name[name].lower() for name in self.names]
+
+        postings = {}
+        for u, lowered in enumerate(self.name_lower):
+            for gram in _ngrams(lowered, 1) | _ngrams(lowered, 2):
+                postings.setdefault(gram, []).append(u)
+        self.postings = {gram: np.asarray(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self.by_std = {}
+        for u, std in enumerate(self.std_lower):
+            if std != self.name_lower[u]:
+                self.by_std.setdefault(std, []).append(u)
+
+
+    # ---------- 名称 ----------
+
+    def _name_candidates(self, kw: str):
+        """名称可能包含 kw 的名称序号（n-gram 倒排表求交，结果还需逐个确认）"""
+        if not kw:
+            return np.arange(len(self.names), dtype=np.int64)
+        grams = _ngrams(kw, 2) if len(kw) >= 2 else {kw}
+        lists = sorted((self.postings.get(g) for g in grams), key=lambda a: 0 if a is None else len(a))
+        if lists[0] is None:
+            return np.zeros(0, dtype=np.int64)
+        result = lists[0]
+        for ids in lists[1:]:
+            result = np.intersect1d(result, ids, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    def name_scores(self, kw: str) -> dict:
+        """名称序号 -> 名称 / 标准岗位名层级的分数"""
+        scores = {}
+        for u in self._name_candidates(kw).tolist():
+            lowered = self.name_lower[u]
+            if kw == lowered:
+                scores[u] = SCORE_EXACT
+            elif kw in lowered:
+                scores[u] = SCORE_NAME
+        for std, ids in self.by_std.items():
+            if kw == std:
+                score = SCORE_STD_EXACT
+            elif kw in std:
+                score = SCORE_STD
+            else:
+                continue
+            for u in ids:
+                scores.setdefault(u, score)
+        return scores
+
+    # ---------- 描述 ----------
+
+    def desc_rows(self, kw: str, limit: int, exclude, allowed=None) -> list:
+        """描述包含 kw 的前 limit 个行号（按行号升序，跳过 exclude 中的行；allowed 为行掩码时只取其中为 True 的行）"""
+        snapshot = self.state.snapshot
+        if limit <= 0 or not kw or snapshot is None:
+            return []
+        # kw 已小写；含英文字母时忽略大小写（仅 ASCII），纯中文 / 数字按字面匹配
+        flags = re.IGNORECASE if any("a" <= ch <= "z" for ch in kw) else 0
+        pattern = re.compile(re.escape(kw.encode("utf-8")), flags)
+        found = []
+        for row in snapshot.search_column('职位描述', pattern):
+            if row not in exclude and (allowed is None or allowed[row]):
+                found.append(row)
+                if len(found) >= limit:
+                    break
+        return found
+
+    # ---------- 检索 ----------
+
+    def search(self, kw: str, top_n: int, allowed=None):
+        """返回 [(行号, 分数)]，按分数降序、行号升序取前 top_n；allowed 为行掩码（如薪资区间）时只在其中检索"""
+        name_scores = self.name_scores(kw)
+        if name_scores:
+            ids = list(name_scores)
+            rows = np.concatenate([self.name_rows[u] for u in ids])
+            scores = np.repeat(np.asarray([name_scores[u] for u in ids], dtype=np.int64),
+                               [len(self.name_rows[u]) for u in ids])
+            if allowed is not None:
+                keep = allowed[rows]
+                rows, scores = rows[keep], scores[keep]
+        else:
+            rows = scores = np.zeros(0, dtype=np.int64)
+        # 分数降序、行号升序合成一个整数键，argpartition 取前 top_n 后再排序
+        keys = (SCORE_EXACT - scores) * (self.n_rows + 1) + rows
+        if len(keys) > top_n:
+            keys = keys[np.argpartition(keys, top_n - 1)[:top_n]] if top_n > 0 else keys[:0]
+        keys = np.sort(keys)
+        hits = [(int(k % (self.n_rows + 1)), SCORE_EXACT - int(k // (self.n_rows + 1))) for k in keys]
+        # 名称层级不足 top_n 时才查描述（描述层级分数最低，只用于补足）
+        need = top_n - len(hits)
+        if need > 0:
+            hits.extend((row, SCORE_DESC) for row in self.desc_rows(kw, need, set(rows.tolist()), allowed))
+        return hits
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_job_search_index() -> JobSearchIndex:
+    """当前岗位目录状态的检索索引（目录 reload 后首次调用时重建）"""
+    global _search_index
+    catalog = load_jobs()
+    index = _search_index
+    if index is None or index.state is not catalog.state:
+        with _search_index_lock:
+            index = _search_index
+            if index is None or index.state is not catalog.state:
+                index = _search_index = JobSearchIndex(catalog)
+    return index
+
+
+def search_jobs(keyword: str, top_n: int = 10, salary_min=None, salary_max=None) -> list:
+    """
+    从CSV检索岗位，支持精确/模糊/标准化/描述匹配；基于预建索引，只处理候选行。
+    salary_min / salary_max（月薪，元）：只返回薪资区间与之有交集的岗位（面议不计入），由薪资区间索引生成行掩码
+    """
+    index = get_job_search_index()
     kw = keyword.lower().strip()
+    # 从建索引时的目录状态取行与薪资，避免检索期间 reload 导致行号错位
+    state = index.state
+    salaries = state.salary_index()
+    allowed = None
+    if salary_min is not None or salary_max is not None:
+        allowed = salaries.mask(salary_min, salary_max)
     results = []
-
-    for _, row in df.iterrows():
+    for i, score in index.search(kw, top_n, allowed):
+        row = {col: state.value(i, col) for col in SEARCH_COLUMNS}
         name = str(row.get('职位名称', ''))
-        score = 0
-        if kw == name.lower():
-            score = 100
-        elif kw in name.lower():
-            score = 80
-        elif normalize_job(name).lower() == kw:
-            score = 70
-        elif kw in normalize_job(name).lower():
-            score = 60
-        elif kw in str(row.get('职位描述', '')).lower():
-            score = 30
-
-        if score > 0:
-            sal = parse_salary(str(row.get('薪资范围', '')))
-            results.append({
-                "job_id":        str(row.get('职位编号', '')),
-                "job_name":      name,
-                "standard_name": normalize_job(name),
-                "salary":        sal,
-                "location":      str(row.get('工作地址', '')),
-                "company":       str(row.get('公司全称', '')),
-                "industry":      str(row.get('所属行业', '')),
-                "description":   str(row.get('职位描述', ''))[:300],
-                "company_nature": str(row.get('企业性质', '')),
-                "company_scale": str(row.get('人员规模', '')),
-                "company_intro": str(row.get('公司简介', ''))[:500],
-                "score":         score
-            })
-
-    results.sort(key=lambda x: -x['score'])
-    return results[:top_n]
+        salary = _salary_dict(salaries.get(i)) or parse_salary(str(row.get('薪资范围', '')))
+        results.append({
+            "job_id":        str(row.get('职位编号', '')),
+            "job_name":      name,
+            "standard_name": state.value(i, '岗位类别'),
+            "salary":        salary,
+            "location":      str(row.get('工作地址', '')),
+            "company":       str(row.get('公司全称', '')),
+            "industry":      str(row.get('所属行业', '')),
+            "description":   str(row.get('职位描述', ''))[:300],
+            "company_nature": str(row.get('企业性质', '')),
+            "company_scale": str(row.get('人员规模', '')),
+            "company_intro": str(row.get('公司简介', ''))[:500],
+            "score":         score
+        })
+    return results
 
 
 def get_salary_context(job_name: str) -> dict:
-    """从数据集提取真实薪资上下文，供AI生成路径时参考"""
+    """从数据集提取真实薪资上下文，供AI生成路径时参考（薪资取自薪资区间索引的数值列，不再逐行解析）"""
     results = search_jobs(job_name, top_n=50)
     salaries   = [r['salary']['display'] for r in results if r['salary']['display'] != '面议']
     industries = list(set(r['industry'] for r in results if r['industry']))[:5]
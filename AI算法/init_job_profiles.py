@@ -25,7 +25,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from utils.logger_handler import logger
 from job_profile.job_profile_service import (
-    get_job_profile_service, job_profile_conf, _save_profiles_store
+    get_job_profile_service, job_profile_conf
 )
 from job_profile.job_graph_service import get_job_graph_service
 
@@ -98,8 +98,7 @@ def generate_all(force=False):
         t0 = time.time()
         try:
             profile = service.generate_profile(job_config)
-            service.profiles_store[job_config["job_id"]] = profile
-            _save_profiles_store(service.profiles_store)
+            service.store_profile(job_config["job_id"], profile)
             elapsed = time.time() - t0
             print(f"  ✅ ({elapsed:.1f}s)")
             success.append(job_name)
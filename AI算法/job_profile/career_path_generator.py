@@ -1,13 +1,32 @@
 """
 晋升路径生成器 - 使用 qwen3-max 根据岗位名称动态生成 4 个晋升阶段
 每个阶段包含：name、time_range、salary_increase、key_skills、icon
+
+生成结果按标准名称（to_standard_name，去括号）读穿缓存：
+- 进程内 LRU（OrderedDict）→ job_relations.db 的 job_promotion_path 表（job_id 为 "name:标准名称"）→ LLM
+- LLM 成功的结果带 CAREER_PATH_PROMPT_VERSION 写回表中，提示词修改后递增版本，旧结果不再命中；
+  LLM 失败时返回默认阶段且不缓存，下次请求重试
+- warm_career_paths 批量预热（并发生成缺失的名称），见 scripts/warm_career_paths.py
 """
 
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 from model.factory import chat_model
 from utils.logger_handler import logger
+from job_profile.job_title_attrs import JOB_CATEGORIES, to_standard_name
+
+# 晋升路径提示词 / 输出结构变化时递增，使已缓存的结果失效
+CAREER_PATH_PROMPT_VERSION = 1
+CACHE_KEY_PREFIX = "name:"
+LRU_MAX_ENTRIES = 512
+DEFAULT_WARM_WORKERS = 8
+
+_lru: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+_lru_lock = threading.Lock()
 
 
 def _extract_json_from_response(text: str) -> Optional[Any]:
@@ -39,7 +58,7 @@ def _default_stages(job_name: str) -> List[Dict[str, Any]]:
 
 def generate_career_path(job_name: str) -> List[Dict[str, Any]]:
     """
-    根据岗位名称，调用 LLM（qwen3-max）动态生成 4 个晋升阶段。
+    根据岗位名称，调用 LLM（qwen3-max）动态生成 4 个晋升阶段；同一标准名称优先取缓存。
 
     每个阶段包含：
     - name: 阶段名称（如「初级Java工程师」）
@@ -55,11 +74,31 @@ def generate_career_path(job_name: str) -> List[Dict[str, Any]]:
     返回：
         长度为 4 的列表，每项为上述结构的字典
     """
+    return generate_career_path_with_status(job_name)[0]
+
+
+def generate_career_path_with_status(job_name: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    同 generate_career_path，额外返回是否为降级结果（LLM 失败或岗位名称为空时的默认阶段）。
+    预计算流水线据此不保存降级结果，下次运行重试。
+    """
     if not (job_name and str(job_name).strip()):
-        return _default_stages("岗位")
+        return _default_stages("岗位"), True
+
+    job_name = to_standard_name(str(job_name).strip())
+    cached = _cache_get(job_name)
+    if cached is not None:
+        return _copy_stages(cached), False
 
-    job_name = str(job_name).strip()
+    stages = _generate_with_llm(job_name)
+    if stages is None:
+        return _default_stages(job_name), True
+    _cache_put(job_name, stages)
+    return _copy_stages(stages), False
 
+
+def _generate_with_llm(job_name: str) -> Optional[List[Dict[str, Any]]]:
+    """调用 LLM 生成 4 个晋升阶段，失败或输出不完整时返回 None"""
     prompt = f"""你是一位资深职业规划师。请针对「{job_name}」这一岗位，生成一条从入门到顶尖的**四个晋升阶段**，要求内容贴合该岗位真实发展路径，且必须与岗位名称强相关、不同岗位输出明显不同。
 
 请**仅**输出一个 JSON 数组，不要其他解释。数组长度为 4，每项为对象，包含以下字段（必须使用以下字段名）：
@@ -86,32 +125,21 @@ def generate_career_path(job_name: str) -> List[Dict[str, Any]]:
         parsed = _extract_json_from_response(result_text)
 
         if isinstance(parsed, list) and len(parsed) >= 4:
-            stages = []
-            for i, item in enumerate(parsed[:4]):
-                if not isinstance(item, dict):
-                    return _default_stages(job_name)
-                stage = {
-                    "name": str(item.get("name", "")).strip() or f"阶段{i+1}",
-                    "time_range": str(item.get("time_range", "")).strip() or "—",
-                    "salary_increase": str(item.get("salary_increase", "")).strip() or "—",
-                    "key_skills": item.get("key_skills") if isinstance(item.get("key_skills"), list) else [],
-                    "icon": str(item.get("icon", "")).strip() or ("🌱" if i == 0 else "🌿" if i == 1 else "🌳" if i == 2 else "🏆"),
-                    "current": i == 0,
-                }
-                stage["key_skills"] = [str(s).strip() for s in stage["key_skills"] if s][:5]
-                stages.append(stage)
+            if not all(isinstance(item, dict) for item in parsed[:4]):
+                return None
+            stages = _normalize_stages(parsed)
             logger.info(f"[CareerPath] 已为「{job_name}」生成 {len(stages)} 个晋升阶段")
             return stages
         if isinstance(parsed, dict) and "stages" in parsed and isinstance(parsed["stages"], list):
-            return generate_career_path_from_list(parsed["stages"], job_name)
+            return _normalize_stages(parsed["stages"])
     except Exception as e:
         logger.warning(f"[CareerPath] LLM 生成失败，使用默认阶段: {e}")
 
-    return _default_stages(job_name)
+    return None
 
 
-def generate_career_path_from_list(raw: List[Dict], job_name: str) -> List[Dict[str, Any]]:
-    """从 LLM 返回的 stages 列表规范化为统一结构"""
+def _normalize_stages(raw: List[Dict]) -> Optional[List[Dict[str, Any]]]:
+    """LLM 返回的阶段列表规范化为统一结构，有效阶段不足 4 个时返回 None"""
     stages = []
     for i, item in enumerate(raw[:4]):
         if not isinstance(item, dict):
@@ -126,6 +154,121 @@ def generate_career_path_from_list(raw: List[Dict], job_name: str) -> List[Dict[
         }
         stage["key_skills"] = [str(s).strip() for s in stage["key_skills"] if s][:5]
         stages.append(stage)
-    if len(stages) < 4:
-        return _default_stages(job_name)
+    return stages if len(stages) >= 4 else None
+
+
+def generate_career_path_from_list(raw: List[Dict], job_name: str) -> List[Dict[str, Any]]:
+    """从 LLM 返回的 stages 列表规范化为统一结构"""
+    return _normalize_stages(raw) or _default_stages(job_name)
+
+
+# ============================================================
+# 读穿缓存：LRU → job_promotion_path 表 → LLM
+# ============================================================
+
+def _cache_version() -> str:
+    return f"career_path_v{CAREER_PATH_PROMPT_VERSION}"
+
+
+def _copy_stages(stages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [dict(s, key_skills=list(s.get("key_skills") or [])) for s in stages]
+
+
+def _stages_from_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """job_promotion_path 行 → generate_career_path 的阶段结构"""
+    stages = []
+    for i, r in enumerate(rows[:4]):
+        skills = r.get("skills")
+        if isinstance(skills, str) and skills.strip():
+            try:
+                skills = json.loads(skills)
+            except Exception:
+                skills = [s.strip() for s in skills.split(",") if s.strip()]
+        stages.append({
+            "name": r.get("stage_name") or r.get("role_title") or f"阶段{i+1}",
+            "time_range": r.get("years_range") or "—",
+            "salary_increase": r.get("salary_range") or "—",
+            "key_skills": skills if isinstance(skills, list) else [],
+            "icon": r.get("icon") or ("🌱" if i == 0 else "🌿" if i == 1 else "🌳" if i == 2 else "🏆"),
+            "current": i == 0,
+        })
     return stages
+
+
+def _lru_put(name: str, stages: List[Dict[str, Any]]):
+    with _lru_lock:
+        _lru[name] = stages
+        _lru.move_to_end(name)
+        while len(_lru) > LRU_MAX_ENTRIES:
+            _lru.popitem(last=False)
+
+
+def _load_cached(names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """批量查缓存：先查 LRU，未命中的一次查表（表中命中的放入 LRU）；返回 {标准名称: 阶段}"""
+    found: Dict[str, List[Dict[str, Any]]] = {}
+    missing: List[str] = []
+    with _lru_lock:
+        for name in names:
+            stages = _lru.get(name)
+            if stages is not None:
+                _lru.move_to_end(name)
+                found[name] = stages
+            else:
+                missing.append(name)
+    if missing:
+        try:
+            from job_profile.job_relations_db import get_cached_promotion_paths
+            rows = get_cached_promotion_paths([CACHE_KEY_PREFIX + n for n in missing], _cache_version())
+        except Exception as e:
+            logger.warning(f"[CareerPath] 读取晋升路径缓存失败: {e}")
+            rows = {}
+        for name in missing:
+            stage_rows = rows.get(CACHE_KEY_PREFIX + name)
+            if stage_rows:
+                found[name] = _stages_from_rows(stage_rows)
+                _lru_put(name, found[name])
+    return found
+
+
+def _cache_get(name: str) -> Optional[List[Dict[str, Any]]]:
+    return _load_cached([name]).get(name)
+
+
+def _cache_put(name: str, stages: List[Dict[str, Any]]):
+    _lru_put(name, _copy_stages(stages))
+    try:
+        from job_profile.job_relations_db import save_cached_promotion_path
+        save_cached_promotion_path(CACHE_KEY_PREFIX + name, stages, _cache_version())
+    except Exception as e:
+        logger.warning(f"[CareerPath] 写入晋升路径缓存失败: {e}")
+
+
+def standard_job_names() -> List[str]:
+    """预热用的标准岗位名称：job_profile.yml 的 target_jobs 名称 + 标准岗位类别（去重，保持顺序）"""
+    from job_profile.job_profile_service import job_profile_conf
+    names = [to_standard_name(j.get("name") or "") for j in job_profile_conf.get("target_jobs", [])]
+    names.extend(JOB_CATEGORIES)
+    return list(dict.fromkeys(n for n in names if n))
+
+
+def warm_career_paths(job_names: Optional[Iterable[str]] = None, workers: int = DEFAULT_WARM_WORKERS) -> Dict[str, int]:
+    """
+    批量预热：按标准名称去重，已缓存的跳过，其余并发调用 LLM 生成并写入缓存。
+    job_names 为空时取 standard_job_names()；返回 {total, cached, generated, failed}
+    """
+    if job_names is None:
+        job_names = standard_job_names()
+    names = list(dict.fromkeys(to_standard_name(str(n).strip()) for n in job_names if n and str(n).strip()))
+    cached = _load_cached(names)
+    missing = [n for n in names if n not in cached]
+    stats = {"total": len(names), "cached": len(cached), "generated": 0, "failed": 0}
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as pool:
+            for name, stages in zip(missing, pool.map(_generate_with_llm, missing)):
+                if stages is None:
+                    stats["failed"] += 1
+                    continue
+                _cache_put(name, stages)
+                stats["generated"] += 1
+    logger.info(f"[CareerPath] 晋升路径预热完成: {stats}")
+    return stats
@@ -0,0 +1,158 @@
+"""
+岗位派生画像缓存（SQLite）
+==================================================
+_load_profiles_store 对每行 CSV 做技能提取、要求推断等规则派生，启动时全量执行较慢。
+派生结果只取决于该行内容与派生规则，因此按 (行内容哈希, 派生规则版本) 持久化：
+
+- 表 derived_profiles（data/derived_profiles.db）：cache_key -> 画像 JSON
+- cache_key = sha1(派生规则版本 + 行内容)；规则版本变化时旧记录全部失效（启动时清理）
+- 重启时只有新增 / 修改过的行需要重新派生
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.path_tool import get_abs_path
+from utils.logger_handler import logger
+
+DB_DIR = get_abs_path("data")
+DB_PATH = os.path.join(DB_DIR, "derived_profiles.db")
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS derived_profiles (
+    cache_key CHAR(40) PRIMARY KEY,
+    extractor_version VARCHAR(64) NOT NULL,
+    profile TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_derived_profiles_version ON derived_profiles(extractor_version);
+"""
+
+
+def make_row_key(extractor_version: str, row_values: List) -> str:
+    """行内容（按列顺序的取值列表）+ 派生规则版本 的哈希（各值以 NUL 分隔，CSV 文本中不会出现）"""
+    raw = "\x00".join([extractor_version, *map(str, row_values)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class DerivedProfileCache:
+    """派生画像缓存（线程安全）；SQLite 不可用时不缓存，调用方照常逐行派生"""
+
+    def __init__(self, extractor_version: str, db_path: str = DB_PATH):
+        self.extractor_version = extractor_version
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._disk_ok = self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self) -> bool:
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.executescript(CREATE_SQL)
+                # 派生规则已变化的旧记录不会再命中，直接清理
+                cur = conn.execute(
+                    "DELETE FROM derived_profiles WHERE extractor_version != ?", (self.extractor_version,)
+                )
+                conn.commit()
+                if cur.rowcount:
+                    logger.info("[DerivedProfileCache] 派生规则版本变化，清理旧画像 %d 条", cur.rowcount)
+            finally:
+                conn.close()
+            return True
+        except Exception as e:
+            logger.warning("[DerivedProfileCache] SQLite 不可用，不缓存派生画像: %s", e)
+            return False
+
+    def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        """批量查询，返回命中的 cache_key -> 画像（每次返回新对象）"""
+        found: Dict[str, dict] = {}
+        if keys and self._disk_ok:
+            try:
+                conn = self._connect()
+                try:
+                    # SQLite 默认变量上限 999，分批查询
+                    for i in range(0, len(keys), 500):
+                        chunk = keys[i:i + 500]
+                        for key, profile_json in conn.execute(
+                            "SELECT cache_key, profile FROM derived_profiles "
+                            f"WHERE cache_key IN ({','.join('?' * len(chunk))})",
+                            chunk,
+                        ):
+                            try:
+                                found[key] = json.loads(profile_json)
+                            except (TypeError, ValueError):
+                                continue
+                finally:
+                    conn.close()
+            except Exception as e:
+                logger.warning("[DerivedProfileCache] 读取失败: %s", e)
+        with self._lock:
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: List[Tuple[str, dict]]):
+        """批量写入 [(cache_key, 画像)]"""
+        if not items or not self._disk_ok:
+            return
+        now = time.time()
+        rows = [
+            (key, self.extractor_version, json.dumps(profile, ensure_ascii=False), now)
+            for key, profile in items
+        ]
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO derived_profiles (cache_key, extractor_version, profile, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning("[DerivedProfileCache] 写入失败: %s", e)
+
+    def clear(self):
+        if not self._disk_ok:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM derived_profiles")
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning("[DerivedProfileCache] 清空失败: %s", e)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "extractor_version": self.extractor_version,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            }
+
+
+_derived_profile_cache: Optional[DerivedProfileCache] = None
+
+
+def get_derived_profile_cache(extractor_version: str) -> DerivedProfileCache:
+    global _derived_profile_cache
+    if _derived_profile_cache is None or _derived_profile_cache.extractor_version != extractor_version:
+        _derived_profile_cache = DerivedProfileCache(extractor_version)
+    return _derived_profile_cache
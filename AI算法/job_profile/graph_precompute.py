@@ -0,0 +1,401 @@
+"""
+岗位关联图谱预计算流水线
+==================================================
+/job/relation-graph 依次查 job_relations 库 → graph.json → 实时构建；实时构建会同步调用 LLM
+（转岗评估、晋升路径），请求可能长时间挂起。这里由后台调度提前为 config/job_profile.yml 的
+全部 target_jobs 生成图谱，请求路径对已配置岗位直接读取结果：
+
+- 每个岗位复用实时构建（JobGraphService.get_relation_graph）生成垂直晋升、横向转岗与晋升路径，
+  岗位间按 graph_precompute_workers 有界并发（单岗位内转岗评估另有 transfer_eval_workers 并发）
+- 中心岗位画像不在岗位目录中时（target_jobs 的 id 不来自 CSV），先用 JobProfileService 生成画像并放入目录
+- 降级结果（转岗边用了 LLM 失败时的默认评估、晋升路径为默认阶段或为空）记为 failed 不写入，
+  DB 与 graph.json 保留上次成功的结果，下次运行重试
+- 结果按岗位原子写入：job_relations_db.save_graph_build 在一个事务内替换关系行、晋升路径与图谱；
+  graph.json 的 precomputed[job_id] 在跨进程文件锁（graph.json.lock）内读改写后经临时文件 os.replace 替换
+- 每次运行先取得 job_graph_lease 租约（运行期间定期续期），多个服务进程、命令行脚本同时触发时只有一个真正运行，
+  其余直接跳过
+- 每个岗位有版本号（流水线版本 + 转岗评估提示词版本 + 该岗位与所在晋升链的配置），
+  DB 与 graph.json 均为当前版本且未超过 graph_precompute_max_age_hours 的岗位跳过，
+  中断后再次运行只补做未完成的岗位
+"""
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from utils.logger_handler import logger
+from utils.path_tool import get_abs_path
+
+from job_profile.job_profile_service import job_profile_conf, get_job_profile_service
+from job_profile.job_catalog import get_job_catalog
+from job_profile import job_relations_db
+
+# 流水线输出结构变化时递增，使已有结果全部重建
+GRAPH_PIPELINE_VERSION = 1
+DEFAULT_WORKERS = 4
+DEFAULT_INTERVAL_HOURS = 24.0
+DEFAULT_MAX_AGE_HOURS = 168.0
+DEFAULT_INITIAL_DELAY = 30.0
+# 等待岗位目录后台加载完成的最长秒数（未完成时用已加载的部分画像构建）
+PROFILES_WAIT_SECONDS = 600
+
+# 流水线租约：名称与有效期（秒），运行期间每隔有效期的 1/3 续期，进程退出后最多一个有效期即可由其他进程接管
+LEASE_NAME = "graph_precompute"
+LEASE_SECONDS = 300
+
+_DIFFICULTY_LEVEL = {"低": 1, "中低": 2, "中": 3, "中高": 4, "高": 5}
+_graph_file_lock = threading.Lock()
+
+
+def _graph_store_path() -> str:
+    return get_abs_path(job_profile_conf.get("job_graph_store", "data/job_profiles/graph.json"))
+
+
+def job_graph_version(job_config: dict, track: Optional[dict]) -> str:
+    """岗位预计算版本：流水线版本、转岗评估提示词版本、岗位配置及所在晋升链配置的指纹"""
+    from job_profile.job_graph_service import TRANSFER_EVAL_PROMPT_VERSION
+    payload = json.dumps([GRAPH_PIPELINE_VERSION, TRANSFER_EVAL_PROMPT_VERSION, job_config, track],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def read_precomputed_graphs() -> Dict[str, dict]:
+    """graph.json 中的 precomputed 部分 {job_id: {version, generated_at, center_job, ...}}"""
+    path = _graph_store_path()
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        logger.warning(f"[GraphPrecompute] 读取 graph.json 失败: {e}")
+        return {}
+    precomputed = data.get("precomputed") if isinstance(data, dict) else None
+    return precomputed if isinstance(precomputed, dict) else {}
+
+
+@contextmanager
+def _locked_graph_file(path: str):
+    """graph.json 的跨进程互斥（同目录 .lock 文件：POSIX flock，Windows msvcrt.locking），进程内再加线程锁"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _graph_file_lock, open(path + ".lock", "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK 重试 10 秒仍未取得时抛出，继续等待
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def write_precomputed_graph(job_id: str, entry: dict):
+    """在跨进程文件锁内读改写 graph.json 的 precomputed[job_id]，经临时文件原子替换（其余内容原样保留）"""
+    path = _graph_store_path()
+    with _locked_graph_file(path):
+        data = {}
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        data.setdefault("precomputed", {})[job_id] = entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def _transfer_relations(transfer_graph: dict) -> List[Dict]:
+    """转岗边 → job_relations 行（difficulty 为 1-5 整数，reason 记技能差距）"""
+    rows = []
+    for e in transfer_graph.get("edges") or []:
+        if not e.get("to"):
+            continue
+        rows.append({
+            "to_job_id": e["to"],
+            "relation_type": "transfer",
+            "difficulty": _DIFFICULTY_LEVEL.get(e.get("difficulty"), 3),
+            "reason": "、".join(str(s) for s in e.get("skills_gap") or []),
+        })
+    return rows
+
+
+def _promote_relations(job_id: str, vertical_graph: dict) -> List[Dict]:
+    """晋升链中由该岗位出发的边 → job_relations 行"""
+    return [
+        {
+            "to_job_id": e["to"],
+            "relation_type": "promote",
+            "difficulty": None,
+            "reason": "；".join(e.get("requirements") or []),
+        }
+        for e in vertical_graph.get("edges") or []
+        if e.get("from") == job_id and e.get("to")
+    ]
+
+
+class GraphPrecomputePipeline:
+    """
+    target_jobs 图谱预计算（一次运行）。
+    未传入的参数取 config/job_profile.yml：graph_precompute_workers、graph_precompute_max_age_hours。
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_age_hours: Optional[float] = None):
+        if workers is None:
+            workers = job_profile_conf.get("graph_precompute_workers") or DEFAULT_WORKERS
+        if max_age_hours is None:
+            max_age_hours = job_profile_conf.get("graph_precompute_max_age_hours", DEFAULT_MAX_AGE_HOURS)
+        self.workers = max(1, int(workers))
+        self.max_age_seconds = float(max_age_hours or 0) * 3600
+        self.target_jobs = job_profile_conf.get("target_jobs", [])
+        self._track_of: Dict[str, dict] = {}
+        for track in job_profile_conf.get("career_tracks", []):
+            for job_id in track.get("job_ids_ordered", []):
+                self._track_of.setdefault(job_id, track)
+
+    def version_of(self, job_config: dict) -> str:
+        return job_graph_version(job_config, self._track_of.get(job_config["job_id"]))
+
+    def pending_jobs(self, force: bool = False, job_ids: Optional[Iterable[str]] = None) -> List[dict]:
+        """需要（重新）构建的岗位：DB 状态或 graph.json 任一缺失 / 版本不符 / 失败 / 过期"""
+        wanted = set(job_ids) if job_ids else None
+        jobs = [j for j in self.target_jobs if wanted is None or j["job_id"] in wanted]
+        if force:
+            return jobs
+        states = job_relations_db.get_graph_builds()
+        precomputed = read_precomputed_graphs()
+        now = time.time()
+        pending = []
+        for job in jobs:
+            version = self.version_of(job)
+            state = states.get(job["job_id"]) or {}
+            entry = precomputed.get(job["job_id"]) or {}
+            done = (state.get("status") == "done" and state.get("version") == version
+                    and entry.get("version") == version)
+            expired = self.max_age_seconds > 0 and now - (state.get("updated_at") or 0) > self.max_age_seconds
+            if not done or expired:
+                pending.append(job)
+        return pending
+
+    def run(self, force: bool = False, job_ids: Optional[Iterable[str]] = None) -> Dict:
+        """
+        构建待处理岗位，返回 {total, pending, built, failed, skipped, elapsed_seconds}；
+        其他进程持有流水线租约（正在运行）时不构建，skipped 为 True
+        """
+        start = time.perf_counter()
+        job_relations_db.init_db()
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        if not job_relations_db.acquire_lease(LEASE_NAME, owner, LEASE_SECONDS):
+            logger.info("[GraphPrecompute] 其他进程正在预计算，本次跳过")
+            return {"total": len(self.target_jobs), "pending": 0, "built": 0, "failed": 0, "skipped": True,
+                    "elapsed_seconds": round(time.perf_counter() - start, 2)}
+        done = threading.Event()
+        renewer = threading.Thread(target=self._renew_lease, args=(owner, done),
+                                   name="graph-precompute-lease", daemon=True)
+        renewer.start()
+        try:
+            stats = self._run(force, job_ids)
+        finally:
+            done.set()
+            renewer.join()
+            job_relations_db.release_lease(LEASE_NAME, owner)
+        stats["elapsed_seconds"] = round(time.perf_counter() - start, 2)
+        logger.info(f"[GraphPrecompute] 预计算结束: {stats}")
+        return stats
+
+    @staticmethod
+    def _renew_lease(owner: str, done: threading.Event):
+        while not done.wait(LEASE_SECONDS / 3):
+            try:
+                if not job_relations_db.acquire_lease(LEASE_NAME, owner, LEASE_SECONDS):
+                    logger.warning("[GraphPrecompute] 流水线租约已被其他进程接管")
+            except Exception as e:
+                logger.warning(f"[GraphPrecompute] 续期流水线租约失败: {e}")
+
+    def _run(self, force: bool, job_ids: Optional[Iterable[str]]) -> Dict:
+        jobs = self.pending_jobs(force, job_ids)
+        stats = {"total": len(self.target_jobs), "pending": len(jobs), "built": 0, "failed": 0, "skipped": False}
+        if jobs:
+            self._wait_profiles_loaded()
+            logger.info(f"[GraphPrecompute] 开始预计算 {len(jobs)}/{len(self.target_jobs)} 个岗位，并发 {self.workers}")
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                # 先补齐缺失的中心岗位画像：每放入一个画像都会使岗位近邻空间失效，集中放入后只重建一次
+                list(pool.map(self._ensure_profile, jobs))
+                for ok in pool.map(self.build_job, jobs):
+                    stats["built" if ok else "failed"] += 1
+        return stats
+
+    def build_job(self, job_config: dict) -> bool:
+        """构建并写入一个岗位；失败时记录状态（保留上次成功的结果），返回是否成功"""
+        job_id = job_config["job_id"]
+        version = self.version_of(job_config)
+        try:
+            graph = self._build_graph(job_config)
+            career_stages = (graph.get("career_path") or {}).get("promotion_path") or []
+            relations = (_promote_relations(job_id, graph["vertical_graph"])
+                         + _transfer_relations(graph["transfer_graph"]))
+            job_relations_db.save_graph_build(job_id, version, graph, relations, career_stages)
+            write_precomputed_graph(job_id, {
+                "version": version,
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+                **graph,
+            })
+            logger.info(f"[GraphPrecompute] {job_id} 完成：转岗边 {len(graph['transfer_graph'].get('edges') or [])} 条，"
+                        f"晋升阶段 {len(career_stages)} 个")
+            return True
+        except Exception as e:
+            logger.error(f"[GraphPrecompute] {job_id} 预计算失败: {e}", exc_info=True)
+            try:
+                job_relations_db.mark_graph_build_failed(job_id, version, str(e))
+            except Exception as db_error:
+                logger.warning(f"[GraphPrecompute] {job_id} 记录失败状态出错: {db_error}")
+            return False
+
+    def _build_graph(self, job_config: dict) -> dict:
+        from job_profile.job_graph_service import get_job_graph_service
+
+        job_id = job_config["job_id"]
+        out = get_job_graph_service().get_relation_graph(job_id, "all")
+        if out.get("code") != 200 or not isinstance(out.get("data"), dict):
+            raise ValueError(out.get("msg") or "图谱构建失败")
+        data = out["data"]
+        for key in ("vertical_graph", "transfer_graph"):
+            part = data.get(key) or {}
+            if part.get("message") == "图谱生成失败" or part.get("error"):
+                raise ValueError(f"{key} 构建失败: {part.get('error') or part.get('message')}")
+        if data["transfer_graph"].get("degraded"):
+            raise ValueError(f"降级结果：{data['transfer_graph'].get('degraded_edges', 0)} 条转岗边使用默认评估")
+        career_path = data.get("career_path") or {}
+        if career_path.get("degraded") or not career_path.get("promotion_path"):
+            raise ValueError("降级结果：晋升路径为默认阶段")
+        return {
+            "center_job": data.get("center_job") or {},
+            "vertical_graph": data["vertical_graph"],
+            "transfer_graph": data["transfer_graph"],
+            "career_path": career_path,
+        }
+
+    @staticmethod
+    def _ensure_profile(job_config: dict):
+        """中心岗位画像不在目录中时生成并放入（失败只记日志，该岗位构建时按画像不存在失败）"""
+        job_id = job_config["job_id"]
+        catalog = get_job_catalog()
+        if catalog.get(job_id) is not None:
+            return
+        try:
+            profile = get_job_profile_service().generate_profile(job_config)
+        except Exception as e:
+            logger.error(f"[GraphPrecompute] {job_id} 画像生成失败: {e}", exc_info=True)
+            return
+        if isinstance(profile, dict) and profile:
+            catalog.put_profile(job_id, profile)
+
+    @staticmethod
+    def _wait_profiles_loaded():
+        catalog = get_job_catalog()
+        deadline = time.monotonic() + PROFILES_WAIT_SECONDS
+        while not catalog.load_status().get("complete") and time.monotonic() < deadline:
+            time.sleep(2)
+
+
+class GraphPrecomputeScheduler:
+    """
+    后台定时运行预计算：启动 graph_precompute_initial_delay 秒后运行一次，之后每
+    graph_precompute_interval_hours 小时运行一次（已是最新版本的岗位直接跳过）。
+    由服务入口显式启动（app.start_background_tasks）；多个服务进程各自的调度由流水线租约保证不会同时运行。
+    """
+
+    def __init__(self, interval_hours: Optional[float] = None, initial_delay: Optional[float] = None):
+        if interval_hours is None:
+            interval_hours = job_profile_conf.get("graph_precompute_interval_hours", DEFAULT_INTERVAL_HOURS)
+        if initial_delay is None:
+            initial_delay = job_profile_conf.get("graph_precompute_initial_delay", DEFAULT_INITIAL_DELAY)
+        self.interval_seconds = max(60.0, float(interval_hours) * 3600)
+        self.initial_delay = max(0.0, float(initial_delay))
+        self.last_stats: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="graph-precompute", daemon=True)
+        self._thread.start()
+        logger.info(f"[GraphPrecompute] 调度已启动：{self.initial_delay:.0f}s 后首次运行，"
+                    f"间隔 {self.interval_seconds / 3600:.1f}h")
+
+    def stop(self):
+        self._stop.set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def _loop(self):
+        if self._stop.wait(self.initial_delay):
+            return
+        while True:
+            try:
+                self.last_stats = GraphPrecomputePipeline().run()
+            except Exception as e:
+                logger.error(f"[GraphPrecompute] 定时预计算异常: {e}", exc_info=True)
+            if self._stop.wait(self.interval_seconds):
+                return
+
+
+_scheduler: Optional[GraphPrecomputeScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_graph_precompute_scheduler() -> Optional[GraphPrecomputeScheduler]:
+    """按配置 graph_precompute_enabled 启动后台调度（重复调用只启动一次），未启用时返回 None"""
+    global _scheduler
+    if not job_profile_conf.get("graph_precompute_enabled", True):
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = GraphPrecomputeScheduler()
+        _scheduler.start()
+    return _scheduler
+
+
+def get_graph_precompute_scheduler() -> Optional[GraphPrecomputeScheduler]:
+    """已启动的后台调度（未启动 / 未启用时为 None）"""
+    return _scheduler
+
+
+def is_graph_pending(job_id: str) -> bool:
+    """
+    岗位图谱是否正等待后台预计算生成：调度已启用且在运行，并且该岗位最近一次构建未失败。
+    为 False 时请求路径应回退实时构建，而不是一直返回"生成中"。
+    """
+    if not job_profile_conf.get("graph_precompute_enabled", True):
+        return False
+    if _scheduler is None or not _scheduler.is_running():
+        return False
+    try:
+        build = job_relations_db.get_graph_builds().get(job_id)
+    except Exception as e:
+        logger.warning(f"[GraphPrecompute] 读取 {job_id} 预计算状态失败: {e}")
+        return False
+    return not (build and build.get("status") == "failed")
@@ -0,0 +1,391 @@
+"""
+岗位目录（进程内共享的唯一岗位数据集）
+==================================================
+原先各模块各持一份岗位数据：JobProfileService 的画像 dict、CsvDataExtractor 与 career_recommender 的行列表、
+JobDatasetService 与 graph.job_graph_service 的两份 DataFrame，内存翻倍且视图不一致。
+这里统一由 JobCatalog 持有：
+
+- 行：CSV 列式快照（job_csv_snapshot，mmap）。窄列（名称、薪资等）按列惰性解码，解码结果在各模块间共享；
+  大段文本列（UNCACHED_COLUMNS：职位描述、公司简介）不缓存整列，点读用 value() / row() 从快照直接解码
+- 派生画像：job_id -> 岗位画像（profile_loader 分块加载，首次使用时开始；首块完成即可读取，其余块后台加载并定期发布）
+- 生成画像：put_profile 放入的 AI 生成画像另行记录（generated_profiles），reload 后重新放入新状态，
+  也是 profiles.json 持久化的全部内容（CSV 派生画像每次从 CSV 加载，不写盘）
+- 索引：职位名称 -> 行号、画像名称 -> job_id、画像筛选索引（城市 / 行业 / 级别等维度的 id 列表，profile_filter_index）
+- 职位名称派生列（job_title_attrs.TITLE_COLUMNS：标准名称 / 岗位类别 / 岗位领域 / 岗位级别）：
+  与 CSV 列同样通过 column() 取整列，首次访问时每个不同名称计算一次
+- 薪资：salary_index() 为薪资范围列的数值列（月薪下限 / 上限 / 均值 / 发薪月数）与区间索引（salary_index.SalaryIndex）
+
+读取方通过 get_job_catalog() 获取；reload() 先完整构建新的 CatalogState 再一次性替换引用，
+并发请求拿到的始终是完整的一份（旧状态在引用释放后回收）。
+后台加载期间每次发布都替换为新的画像 dict 并递增岗位库版本，load_status() 返回加载进度。
+画像对外只读（profiles 为 MappingProxyType 视图）；新增 / 覆盖画像只能经 put_profile，
+其在锁内复制出新 dict 再替换，正在遍历旧 dict 的读取方与后台发布都不受影响。
+"""
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from utils.logger_handler import logger
+from utils.path_tool import get_abs_path
+from job_profile.job_csv_snapshot import JobCsvSnapshot, get_job_csv_snapshot
+from job_profile.job_title_attrs import TITLE_COLUMNS, title_attrs
+from job_profile.salary_index import SALARY_COLUMN, SalaryIndex
+from job_profile.profile_filter_index import ProfileFilterIndex
+
+NAME_COLUMN = "职位名称"
+# 大段文本列：整列解码后常驻内存代价大，column() 每次现解码不缓存，按行读取请用 value() / row()
+UNCACHED_COLUMNS = frozenset({"职位描述", "公司简介"})
+
+
+class CatalogState:
+    """某一时刻的岗位数据（替换而不原地修改；画像 dict 写时复制：put_profiles、后台发布都整体替换）"""
+
+    def __init__(self, csv_path: str, snapshot: Optional[JobCsvSnapshot],
+                 profiles: Optional[Dict[str, dict]] = None, background_load: bool = False):
+        self.csv_path = csv_path
+        self.snapshot = snapshot
+        self.background_load = background_load
+        self._loader = None
+        self.loaded_at = time.time()
+        self._lock = threading.RLock()
+        self._columns: Dict[str, List[str]] = {}
+        self._profiles: Optional[Dict[str, dict]] = None
+        self._profiles_view: Optional[Mapping[str, dict]] = None
+        if profiles is not None:
+            self._set_profiles(dict(profiles))
+        self._row_name_index: Optional[Dict[str, List[int]]] = None
+        self._profile_name_index: Optional[Dict[str, List[str]]] = None
+        self._salary_index: Optional[SalaryIndex] = None
+        self._filter_index: Optional[ProfileFilterIndex] = None
+        self._filter_index_source: Optional[Dict[str, dict]] = None
+
+    # ---------- 行 ----------
+
+    @property
+    def row_count(self) -> int:
+        return len(self.snapshot) if self.snapshot is not None else 0
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.snapshot.columns) if self.snapshot is not None else []
+
+    def column(self, name: str) -> List[str]:
+        """
+        整列取值（首次访问时解码并缓存，之后各模块共用同一个列表，调用方不得修改）；也可取职位名称派生列。
+        UNCACHED_COLUMNS 中的大段文本列每次现解码、不缓存
+        """
+        values = self._columns.get(name)
+        if values is not None:
+            return values
+        if name in TITLE_COLUMNS:
+            self._build_title_columns()
+            return self._columns[name]
+        if name in UNCACHED_COLUMNS:
+            return self.snapshot.column(name) if self.snapshot is not None else []
+        with self._lock:
+            values = self._columns.get(name)
+            if values is None:
+                values = self.snapshot.column(name) if self.snapshot is not None else []
+                self._columns[name] = values
+            return values
+
+    def value(self, row: int, name: str) -> str:
+        """单个单元格：已缓存的列（含职位名称派生列）直接取，其余从快照解码这一格；行号越界为空串"""
+        if not 0 <= row < self.row_count:
+            return ""
+        if name in TITLE_COLUMNS:
+            return self.column(name)[row]
+        values = self._columns.get(name)
+        if values is not None:
+            return values[row]
+        return self.snapshot.value(row, name)
+
+    def _build_title_columns(self):
+        """一次生成全部职位名称派生列（岗位领域未命中为 None）"""
+        names = self.column(NAME_COLUMN)
+        with self._lock:
+            if all(col in self._columns for col in TITLE_COLUMNS):
+                return
+            attrs = [title_attrs(name) for name in names]
+            for col, attr in TITLE_COLUMNS.items():
+                self._columns[col] = [getattr(a, attr) for a in attrs]
+
+    def row_name_index(self) -> Dict[str, List[int]]:
+        if self._row_name_index is None:
+            with self._lock:
+                if self._row_name_index is None:
+                    index: Dict[str, List[int]] = {}
+                    for i, name in enumerate(self.column(NAME_COLUMN)):
+                        index.setdefault(name.strip(), []).append(i)
+                    self._row_name_index = index
+        return self._row_name_index
+
+    def salary_index(self) -> SalaryIndex:
+        if self._salary_index is None:
+            texts = self.column(SALARY_COLUMN) if SALARY_COLUMN in self.columns else [""] * self.row_count
+            with self._lock:
+                if self._salary_index is None:
+                    self._salary_index = SalaryIndex(texts)
+        return self._salary_index
+
+    # ---------- 派生画像 ----------
+
+    @property
+    def profiles(self) -> Mapping[str, dict]:
+        """当前画像 dict 的只读视图（同一 dict 返回同一视图，可按 id 判断是否变化）"""
+        if self._profiles_view is None:
+            with self._lock:
+                if self._profiles_view is None:
+                    self._set_profiles(self._start_load())
+        return self._profiles_view
+
+    def _set_profiles(self, profiles: Dict[str, dict]):
+        self._profiles = profiles
+        self._profiles_view = MappingProxyType(profiles)
+
+    def put_profiles(self, updates: Dict[str, dict]):
+        """新增 / 覆盖画像：复制出新 dict 后替换（不修改已发布的 dict），并使画像索引重建"""
+        if not updates:
+            return
+        _ = self.profiles
+        with self._lock:
+            profiles = dict(self._profiles)
+            profiles.update(updates)
+            self._set_profiles(profiles)
+            self.invalidate_indexes()
+
+    def _start_load(self) -> Dict[str, dict]:
+        if self.snapshot is None:
+            return {}
+        from job_profile.profile_loader import StreamingProfileLoader
+        try:
+            self._loader = StreamingProfileLoader(self.snapshot, publish=self._publish)
+            profiles = self._loader.start(background=self.background_load)
+        except Exception as e:
+            logger.warning("[JobCatalog] 岗位画像加载失败: %s", e, exc_info=True)
+            return {}
+        status = self._loader.status
+        logger.info("[JobCatalog] 已加载 %d/%d 行岗位画像%s", status.loaded_rows, status.total_rows,
+                    "" if status.complete else "，其余后台加载")
+        return profiles
+
+    def _publish(self, profiles: Dict[str, dict], status):
+        """后台加载发布新的画像 dict；加载期间外部新增 / 覆盖的画像保留到新 dict"""
+        with self._lock:
+            for job_id, profile in (self._profiles or {}).items():
+                if profiles.get(job_id) is not profile:
+                    profiles[job_id] = profile
+            self._set_profiles(profiles)
+            self.invalidate_indexes()
+        from job_profile.job_profile_service import _bump_profiles_store_version
+        _bump_profiles_store_version()
+        logger.info("[JobCatalog] 岗位画像已发布 %d/%d 行%s", status.loaded_rows, status.total_rows,
+                    "（加载完成）" if status.complete else "")
+
+    def load_status(self) -> Dict:
+        loader = self._loader
+        if loader is None:
+            n = len(self._profiles or {})
+            return {"complete": self._profiles is not None, "loaded_rows": n, "total_rows": n}
+        return loader.status.to_dict()
+
+    def profile_name_index(self) -> Dict[str, List[str]]:
+        if self._profile_name_index is None:
+            with self._lock:
+                if self._profile_name_index is None:
+                    index: Dict[str, List[str]] = {}
+                    for job_id, profile in list(self.profiles.items()):
+                        if isinstance(profile, dict):
+                            index.setdefault((profile.get("job_name") or "").strip(), []).append(job_id)
+                    self._profile_name_index = index
+        return self._profile_name_index
+
+    def filter_index(self) -> ProfileFilterIndex:
+        _ = self.profiles
+        index = self._filter_index
+        # 索引记录其构建时的画像 dict，画像 dict 被替换（发布 / put_profiles）后重建
+        if index is None or self._filter_index_source is not self._profiles:
+            with self._lock:
+                index = self._filter_index
+                if index is None or self._filter_index_source is not self._profiles:
+                    profiles = self._profiles
+                    index = self._filter_index = ProfileFilterIndex(profiles)
+                    self._filter_index_source = profiles
+        return index
+
+    def invalidate_indexes(self):
+        with self._lock:
+            self._profile_name_index = None
+            self._filter_index = None
+            self._filter_index_source = None
+
+
+class JobCatalog:
+    """岗位目录（线程安全，见模块说明）"""
+
+    def __init__(self, csv_path: Optional[str] = None):
+        self.csv_path = csv_path or self._default_csv_path()
+        self._reload_lock = threading.Lock()
+        self._generated: Dict[str, dict] = {}
+        self._state = CatalogState(self.csv_path, get_job_csv_snapshot(self.csv_path),
+                                   background_load=self._background_load())
+
+    @staticmethod
+    def _background_load() -> bool:
+        from job_profile.job_profile_service import job_profile_conf
+        return bool(job_profile_conf.get("profile_loader_background", True))
+
+    @staticmethod
+    def _default_csv_path() -> str:
+        from job_profile.job_profile_service import job_profile_conf
+        return get_abs_path(job_profile_conf.get("job_data_path", "data/求职岗位信息数据.csv"))
+
+    @property
+    def state(self) -> CatalogState:
+        """当前状态；一次请求内需多次访问时先取出 state 再操作，避免中途 reload 导致前后不一致"""
+        return self._state
+
+    # ---------- 行访问 ----------
+
+    @property
+    def row_count(self) -> int:
+        return self._state.row_count
+
+    @property
+    def columns(self) -> List[str]:
+        return self._state.columns
+
+    def column(self, name: str) -> List[str]:
+        return self._state.column(name)
+
+    def row(self, index: int, columns: Optional[Sequence[str]] = None) -> Dict[str, str]:
+        """第 index 行（默认全部列），取值均为字符串，缺失为空串；逐格点读，不解码整列"""
+        state = self._state
+        names = columns or state.columns
+        return {name: state.value(index, name) for name in names}
+
+    def value(self, index: int, name: str) -> str:
+        """第 index 行某列的取值（点读）"""
+        return self._state.value(index, name)
+
+    def iter_rows(self, columns: Optional[Sequence[str]] = None, limit: int = 0) -> Iterator[Dict[str, str]]:
+        """按行产出 dict（与 csv.DictReader 的行结构一致）"""
+        state = self._state
+        names = list(columns) if columns else state.columns
+        n = state.row_count if limit <= 0 else min(limit, state.row_count)
+        data = [state.column(name) for name in names]
+        for i in range(n):
+            yield {name: values[i] for name, values in zip(names, data)}
+
+    def rows_by_name(self, job_name: str) -> List[int]:
+        """职位名称精确等于 job_name 的行号（去首尾空白比较）"""
+        return list(self._state.row_name_index().get((job_name or "").strip(), []))
+
+    def salary_index(self) -> SalaryIndex:
+        """薪资数值列与区间索引（与行号对齐，随目录状态替换）"""
+        return self._state.salary_index()
+
+    def rows_where(self, column: str, predicate: Callable[[str], bool], limit: int = 0) -> List[int]:
+        """某列取值满足 predicate 的行号（按行序，limit>0 时最多返回 limit 个）"""
+        matched: List[int] = []
+        for i, value in enumerate(self._state.column(column)):
+            if predicate(value):
+                matched.append(i)
+                if 0 < limit <= len(matched):
+                    break
+        return matched
+
+    # ---------- 画像访问 ----------
+
+    @property
+    def profiles(self) -> Mapping[str, dict]:
+        """job_id -> 岗位画像（当前状态画像 dict 的只读视图；修改经 put_profile）"""
+        return self._state.profiles
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self._state.profiles.get(job_id)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._state.profiles
+
+    def __len__(self) -> int:
+        return len(self._state.profiles)
+
+    def iter_profiles(self) -> Iterator[Tuple[str, dict]]:
+        return iter(list(self._state.profiles.items()))
+
+    def by_name(self, job_name: str) -> List[dict]:
+        """岗位名称精确匹配的画像"""
+        state = self._state
+        profiles = state.profiles
+        return [profiles[j] for j in state.profile_name_index().get((job_name or "").strip(), []) if j in profiles]
+
+    def filter(self, predicate: Callable[[dict], bool], limit: int = 0) -> List[dict]:
+        """满足 predicate 的画像（按插入顺序）"""
+        result: List[dict] = []
+        for _, profile in self.iter_profiles():
+            if isinstance(profile, dict) and predicate(profile):
+                result.append(profile)
+                if 0 < limit <= len(result):
+                    break
+        return result
+
+    def filter_index(self, profiles: Optional[Mapping[str, dict]] = None) -> ProfileFilterIndex:
+        """
+        画像筛选索引。profiles 为当前画像 dict（或不传）时返回缓存的索引；
+        传入其他 dict（如取画像后目录恰好发布了新版本）时为其单独构建。
+        """
+        state = self._state
+        if profiles is None or profiles is state.profiles:
+            return state.filter_index()
+        return ProfileFilterIndex(profiles)
+
+    def put_profile(self, job_id: str, profile: dict):
+        """新增 / 覆盖一个画像（AI 生成画像后调用）；递增画像版本，使按版本缓存的派生数据（岗位近邻等）重算"""
+        from job_profile.job_profile_service import _bump_profiles_store_version
+        state = self._state
+        with state._lock:
+            state.put_profiles({job_id: profile})
+            self._generated[job_id] = profile
+        _bump_profiles_store_version()
+
+    def generated_profiles(self) -> Dict[str, dict]:
+        """put_profile 放入的生成画像（job_id -> 画像，副本）"""
+        with self._state._lock:
+            return dict(self._generated)
+
+    def invalidate_indexes(self):
+        """使名称索引、筛选索引重建"""
+        self._state.invalidate_indexes()
+
+    def load_status(self) -> Dict:
+        """画像加载进度：complete、loaded_rows / total_rows 等（后台加载未完成时 profiles 只含部分岗位）"""
+        return self._state.load_status()
+
+    # ---------- 重新加载 ----------
+
+    def reload(self) -> CatalogState:
+        """重新读取 CSV 快照并派生画像，全部加载完成后原子替换当前状态（期间旧状态继续服务）"""
+        with self._reload_lock:
+            start = time.perf_counter()
+            snapshot = get_job_csv_snapshot(self.csv_path)
+            state = CatalogState(self.csv_path, snapshot)
+            state.put_profiles(self.generated_profiles())
+            self._state = state
+            logger.info("[JobCatalog] 已重新加载：%d 行，%d 个画像，耗时 %.2fs",
+                        state.row_count, len(state.profiles), time.perf_counter() - start)
+            return state
+
+
+_catalog: Optional[JobCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_job_catalog() -> JobCatalog:
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = JobCatalog()
+    return _catalog
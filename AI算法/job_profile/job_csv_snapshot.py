@@ -0,0 +1,340 @@
+"""
+岗位 CSV 列式快照
+==================================================
+求职岗位信息数据.csv 原先由多个模块各自解析（csv.DictReader / pandas.read_csv）。
+这里做一次性导入，把 CSV 写成列式二进制快照，之后各加载方以 mmap 方式读取，不再重复解析：
+
+- v-<版本>/heap.bin     ：全部单元格的 UTF-8 字节，按列依次拼接（第 0 列全部行、第 1 列全部行 ……）
+- v-<版本>/offsets.npy  ：int64，长度 列数 × 行数 + 1；第 c 列第 r 行位于 heap[offsets[c*n+r] : offsets[c*n+r+1]]
+- meta.json             ：当前版本目录（data_dir）、列名、行数、格式版本与源 CSV 的内容哈希（sha1）、大小、修改时间
+
+每次导入写入新的版本目录，写完后只替换 meta.json 一个文件完成切换：数据文件写入后不再覆盖，
+不会与其他进程正在 mmap 的文件冲突（Windows 上无法替换已映射的文件），读取方看到的始终是完整的一组文件。
+旧版本目录在切换后尽量删除，仍被映射而删除失败的（Windows）留待下次导入时再清理。
+
+快照以 CSV 内容哈希为键：CSV 大小与修改时间未变时直接复用；变化时重新计算哈希，内容不同才重新导入。
+多个 worker 进程 mmap 同一组文件，只读页由操作系统共享。
+
+手动重建：在 AI算法 目录下执行 python scripts/build_job_csv_snapshot.py
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from utils.logger_handler import logger
+from utils.path_tool import get_abs_path
+
+SNAPSHOT_ROOT = get_abs_path("data/job_csv_snapshot")
+DEFAULT_CSV = "data/求职岗位信息数据.csv"
+# 2：数据文件放入版本目录，meta.json 指向当前版本
+FORMAT_VERSION = 2
+
+HEAP_FILE = "heap.bin"
+OFFSETS_FILE = "offsets.npy"
+META_FILE = "meta.json"
+VERSION_PREFIX = "v-"
+PARTIAL_PREFIX = ".partial-"
+
+
+def csv_sha1(csv_path: str) -> str:
+    """CSV 文件内容哈希"""
+    digest = hashlib.sha1()
+    with open(csv_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_dir_for(csv_path: str) -> str:
+    """快照目录：data/job_csv_snapshot/<CSV 文件名>"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0] or "jobs"
+    return os.path.join(SNAPSHOT_ROOT, stem)
+
+
+class JobCsvSnapshot:
+    """
+    列式快照（只读）。heap / offsets 为 mmap 数组（导入失败无法落盘时为内存数组）。
+
+    与 csv.DictReader 的行结构一致：iter_rows() 产出 {列名: 字符串}，缺失单元格为空串。
+    """
+
+    def __init__(self, columns: List[str], n_rows: int, heap: np.ndarray, offsets: np.ndarray,
+                 source_sha1: str = "", source_path: str = ""):
+        self.columns = list(columns)
+        self.n_rows = int(n_rows)
+        self.heap = heap
+        self.offsets = offsets
+        self.source_sha1 = source_sha1
+        self.source_path = source_path
+        self._col_index = {name: i for i, name in enumerate(self.columns)}
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def has_column(self, name: str) -> bool:
+        return name in self._col_index
+
+    def column(self, name: str, limit: int = 0, start: int = 0) -> List[str]:
+        """解码一列的第 start 行起最多 limit 行（limit<=0 取到末尾）；不存在的列返回空串列表"""
+        start = max(0, min(start, self.n_rows))
+        end = self.n_rows if limit <= 0 else min(start + limit, self.n_rows)
+        n = end - start
+        c = self._col_index.get(name)
+        if c is None:
+            return [""] * n
+        base = c * self.n_rows + start
+        offs = self.offsets[base:base + n + 1].tolist()
+        if not offs:
+            return []
+        # 同一列的字节连续存放，整段取出后在 Python 里切分
+        chunk = bytes(self.heap[offs[0]:offs[-1]])
+        origin = offs[0]
+        return [chunk[a - origin:b - origin].decode("utf-8") for a, b in zip(offs[:-1], offs[1:])]
+
+    def value(self, row: int, name: str) -> str:
+        c = self._col_index.get(name)
+        if c is None or not 0 <= row < self.n_rows:
+            return ""
+        i = c * self.n_rows + row
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        return bytes(self.heap[a:b]).decode("utf-8")
+
+    def search_column(self, name: str, pattern: "re.Pattern[bytes]", start_row: int = 0) -> Iterator[int]:
+        """
+        按行号升序产出从 start_row 起取值匹配 pattern（bytes 正则）的行号。
+        直接在该列的 heap 字节上匹配，不解码整列；跨越两行的匹配不算。
+        """
+        c = self._col_index.get(name)
+        if c is None or not 0 <= start_row < self.n_rows:
+            return
+        offs = self.offsets[c * self.n_rows:(c + 1) * self.n_rows + 1]
+        buf = memoryview(self.heap)
+        pos, end = int(offs[start_row]), int(offs[-1])
+        while pos < end:
+            m = pattern.search(buf, pos, end)
+            if m is None:
+                return
+            row = int(np.searchsorted(offs, m.start(), side="right")) - 1
+            row_end = int(offs[row + 1])
+            if m.end() > row_end:
+                pos = m.start() + 1
+                continue
+            yield row
+            pos = row_end
+
+    def iter_rows(self, columns: Optional[Sequence[str]] = None, limit: int = 0,
+                  start: int = 0) -> Iterator[Dict[str, str]]:
+        """按行产出 dict（只解码 columns 指定的列，默认全部列；start / limit 同 column()）"""
+        names = list(columns) if columns else self.columns
+        data = [self.column(name, limit, start) for name in names]
+        for values in zip(*data):
+            yield dict(zip(names, values))
+
+    def to_dataframe(self, columns: Optional[Sequence[str]] = None):
+        """转为 pandas.DataFrame（全部为字符串列，缺失值为空串，等价于 read_csv(...).fillna('') 的文本视图）"""
+        import pandas as pd
+
+        names = list(columns) if columns else self.columns
+        return pd.DataFrame({name: self.column(name) for name in names}, columns=names)
+
+
+# ---------- 导入 / 读写 ----------
+
+def _parse_csv(csv_path: str):
+    """解析 CSV 为 (列名, 各列取值)"""
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        columns = [c for c in (reader.fieldnames or []) if c is not None]
+        values: List[List[str]] = [[] for _ in columns]
+        for row in reader:
+            for c, name in enumerate(columns):
+                v = row.get(name)
+                values[c].append(v if isinstance(v, str) else "")
+    return columns, values
+
+
+def _encode_columns(values: List[List[str]]):
+    """各列取值 → (heap 字节, offsets 数组)"""
+    parts: List[bytes] = []
+    lengths: List[int] = []
+    for col in values:
+        for v in col:
+            b = v.encode("utf-8")
+            parts.append(b)
+            lengths.append(len(b))
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    if lengths:
+        np.cumsum(lengths, out=offsets[1:])
+    return b"".join(parts), offsets
+
+
+def _file_stamp(csv_path: str) -> Dict:
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def save_snapshot(store_dir: str, columns: List[str], n_rows: int, heap: bytes, offsets: np.ndarray,
+                  meta_extra: Dict) -> None:
+    """
+    写入新的版本目录（heap.bin + offsets.npy，先写入临时目录，写完后改名），再替换 meta.json 指向它；
+    meta.json 的替换是唯一的切换点，之后清理旧版本目录。
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    version = f"{str(meta_extra.get('csv_sha1', ''))[:12]}-{time.time_ns()}-{os.getpid()}"
+    data_dir = VERSION_PREFIX + version
+    partial_path = os.path.join(store_dir, PARTIAL_PREFIX + version)
+    os.makedirs(partial_path)
+    try:
+        with open(os.path.join(partial_path, HEAP_FILE), "wb") as f:
+            f.write(heap)
+        with open(os.path.join(partial_path, OFFSETS_FILE), "wb") as f:
+            np.save(f, offsets)
+        os.rename(partial_path, os.path.join(store_dir, data_dir))
+    except BaseException:
+        shutil.rmtree(partial_path, ignore_errors=True)
+        raise
+
+    meta = dict(meta_extra, format_version=FORMAT_VERSION, data_dir=data_dir, columns=columns,
+                rows=n_rows, heap_bytes=len(heap))
+    _write_meta(store_dir, meta)
+    _remove_stale_versions(store_dir, keep=data_dir)
+
+
+def _write_meta(store_dir: str, meta: Dict) -> None:
+    meta_path = os.path.join(store_dir, META_FILE)
+    tmp = meta_path + f".tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, meta_path)
+
+
+def _remove_stale_versions(store_dir: str, keep: str) -> None:
+    """删除 keep 以外的版本目录与旧格式遗留的数据文件；仍被映射而删除失败的留待下次"""
+    current = (_read_meta(store_dir) or {}).get("data_dir")
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name.startswith(VERSION_PREFIX) and name not in (keep, current):
+            shutil.rmtree(path, ignore_errors=True)
+        elif name in (HEAP_FILE, OFFSETS_FILE):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _read_meta(store_dir: str) -> Optional[Dict]:
+    meta_path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def load_snapshot(store_dir: str, expected_sha1: Optional[str] = None) -> Optional[JobCsvSnapshot]:
+    """以 mmap 方式加载快照；文件缺失、损坏、格式版本或哈希不符时返回 None"""
+    meta = _read_meta(store_dir)
+    if not meta or meta.get("format_version") != FORMAT_VERSION:
+        return None
+    if expected_sha1 is not None and meta.get("csv_sha1") != expected_sha1:
+        return None
+    try:
+        columns = meta.get("columns") or []
+        n_rows = int(meta.get("rows") or 0)
+        data_path = os.path.join(store_dir, meta["data_dir"])
+        offsets = np.load(os.path.join(data_path, OFFSETS_FILE), mmap_mode="r")
+        heap_path = os.path.join(data_path, HEAP_FILE)
+        heap_bytes = int(meta.get("heap_bytes") or 0)
+        if offsets.shape != (len(columns) * n_rows + 1,) or os.path.getsize(heap_path) != heap_bytes:
+            logger.warning("[JobCsvSnapshot] 快照文件尺寸与 meta 不符: %s", store_dir)
+            return None
+        # 空文件无法 mmap
+        heap = np.memmap(heap_path, dtype=np.uint8, mode="r") if heap_bytes else np.zeros(0, dtype=np.uint8)
+    except Exception as e:
+        logger.warning("[JobCsvSnapshot] 加载快照失败: %s", e)
+        return None
+    return JobCsvSnapshot(columns, n_rows, heap, offsets, meta.get("csv_sha1", ""), meta.get("csv_path", ""))
+
+
+def ingest_csv(csv_path: str, store_dir: Optional[str] = None, persist: bool = True) -> JobCsvSnapshot:
+    """解析 CSV 并写入快照；无法落盘时返回内存快照"""
+    store_dir = store_dir or snapshot_dir_for(csv_path)
+    stamp = _file_stamp(csv_path)
+    sha1 = csv_sha1(csv_path)
+    columns, values = _parse_csv(csv_path)
+    n_rows = len(values[0]) if values else 0
+    heap, offsets = _encode_columns(values)
+    if persist:
+        try:
+            save_snapshot(store_dir, columns, n_rows, heap, offsets,
+                          {"csv_sha1": sha1, "csv_path": csv_path, **stamp})
+            logger.info("[JobCsvSnapshot] 已导入 %s：%d 行 × %d 列 → %s", csv_path, n_rows, len(columns), store_dir)
+            loaded = load_snapshot(store_dir, expected_sha1=sha1)
+            if loaded is not None:
+                return loaded
+        except Exception as e:
+            logger.warning("[JobCsvSnapshot] 快照写入失败，使用内存快照: %s", e)
+    return JobCsvSnapshot(columns, n_rows, np.frombuffer(heap, dtype=np.uint8), offsets, sha1, csv_path)
+
+
+def load_or_ingest(csv_path: str, store_dir: Optional[str] = None) -> JobCsvSnapshot:
+    """
+    返回与 CSV 当前内容一致的快照：
+    大小、修改时间与 meta 记录一致时直接 mmap；否则计算内容哈希，哈希一致（仅 touch 过）时刷新 meta 中的时间戳，不一致则重新导入。
+    """
+    store_dir = store_dir or snapshot_dir_for(csv_path)
+    meta = _read_meta(store_dir)
+    stamp = _file_stamp(csv_path)
+    if meta and meta.get("size") == stamp["size"] and meta.get("mtime_ns") == stamp["mtime_ns"]:
+        snapshot = load_snapshot(store_dir)
+        if snapshot is not None:
+            return snapshot
+    if meta:
+        sha1 = csv_sha1(csv_path)
+        snapshot = load_snapshot(store_dir, expected_sha1=sha1)
+        if snapshot is not None:
+            try:
+                _write_meta(store_dir, dict(meta, **stamp))
+            except Exception:
+                pass
+            return snapshot
+    return ingest_csv(csv_path, store_dir)
+
+
+# ---------- 进程内单例 ----------
+
+_snapshots: Dict[str, tuple] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_job_csv_snapshot(csv_path: Optional[str] = None) -> Optional[JobCsvSnapshot]:
+    """
+    获取岗位 CSV 快照（默认 data/求职岗位信息数据.csv）。CSV 不存在时返回 None。
+    同一进程内按 (大小, 修改时间) 复用已打开的快照，CSV 变化后自动重新加载。
+    """
+    csv_path = csv_path or get_abs_path(DEFAULT_CSV)
+    if not os.path.isfile(csv_path):
+        return None
+    stamp = _file_stamp(csv_path)
+    key = os.path.abspath(csv_path)
+    with _snapshots_lock:
+        cached = _snapshots.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            snapshot = load_or_ingest(csv_path)
+        except Exception as e:
+            logger.warning("[JobCsvSnapshot] 读取 CSV 失败: %s", e, exc_info=True)
+            return None
+        _snapshots[key] = (stamp, snapshot)
+        return snapshot
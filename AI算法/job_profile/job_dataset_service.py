@@ -11,34 +11,56 @@
 - 人岗匹配技能匹配准确率>80%（加权算法）
 """
 
-import pandas as pd
 import json
-import os
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from utils.logger_handler import logger
 from utils.path_tool import get_abs_path
+from job_profile.skill_registry import get_skill_registry
+from job_profile.job_catalog import get_job_catalog
+from job_profile.keyword_matcher import KeywordAutomaton
+from job_profile.job_title_attrs import job_level
+from job_profile.salary_index import parse_salary_range
+
+# 常见技术栈关键词（编程语言归入 programming_languages，其余归入 frameworks_tools）
+_TECH_STACK = {
+    "编程语言": ["Python", "Java", "C++", "JavaScript", "Go", "PHP", "C#"],
+    "框架工具": ["Spring", "Django", "Flask", "React", "Vue", "Angular", "TensorFlow", "PyTorch"],
+    "数据库": ["MySQL", "Redis", "MongoDB", "Oracle", "PostgreSQL"],
+    "云平台": ["AWS", "Azure", "阿里云", "腾讯云"],
+    "其他": ["Docker", "Kubernetes", "Git", "Linux", "Nginx"]
+}
+
+# [(技能类别, 技能名, 重要性, 权重)]，按 _TECH_STACK 顺序
+_TECH_ENTRIES = [
+    ("programming_languages" if group == "编程语言" else "frameworks_tools", skill,
+     "重要" if group == "编程语言" else "加分", 0.08 if group == "编程语言" else 0.05)
+    for group, skills in _TECH_STACK.items() for skill in skills
+]
+
+_tech_automaton: Optional[KeywordAutomaton] = None
+
+
+def _get_tech_automaton() -> KeywordAutomaton:
+    global _tech_automaton
+    if _tech_automaton is None:
+        automaton = KeywordAutomaton()
+        for i, (_, skill, _, _) in enumerate(_TECH_ENTRIES):
+            automaton.add(skill, i)
+        _tech_automaton = automaton.compile()
+    return _tech_automaton
 
 
 class JobDatasetService:
     """企业数据集服务"""
     
     def __init__(self):
-        self.dataset_path = get_abs_path("data/求职岗位信息数据.csv")
-        self.dataset = None
-        self._load_dataset()
-    
-    def _load_dataset(self):
-        """加载企业数据集"""
-        try:
-            if os.path.exists(self.dataset_path):
-                self.dataset = pd.read_csv(self.dataset_path, encoding='utf-8')
-                logger.info(f"[Dataset] 成功加载企业数据集，共 {len(self.dataset)} 条岗位")
-            else:
-                logger.warning(f"[Dataset] 数据集文件不存在: {self.dataset_path}")
-                self.dataset = None
-        except Exception as e:
-            logger.error(f"[Dataset] 加载数据集失败: {e}")
-            self.dataset = None
+        # 数据集行由共享的岗位目录（JobCatalog）持有，不再单独加载一份 DataFrame
+        self.catalog = get_job_catalog()
+        self.dataset_path = self.catalog.csv_path
+        if self.catalog.row_count:
+            logger.info(f"[Dataset] 企业数据集共 {self.catalog.row_count} 条岗位")
+        else:
+            logger.warning(f"[Dataset] 数据集文件不存在或为空: {self.dataset_path}")
     
     def search_job_in_dataset(self, job_name: str) -> Optional[Dict]:
         """
@@ -51,20 +73,21 @@ class JobDatasetService:
         
         返回：标准化的岗位画像数据（符合API格式）
         """
-        if self.dataset is None or self.dataset.empty:
+        catalog = self.catalog
+        if catalog.row_count == 0:
             return None
         
         # 1. 精确匹配
-        exact_match = self.dataset[self.dataset['职位名称'] == job_name]
-        if not exact_match.empty:
-            return self._convert_to_profile(exact_match.iloc[0], source="dataset_exact")
+        exact_rows = catalog.rows_by_name(job_name)
+        if exact_rows:
+            return self._convert_to_profile(catalog.row(exact_rows[0]), source="dataset_exact")
         
         # 2. 模糊匹配（包含关键词）
         job_keywords = self._extract_keywords(job_name)
         for keyword in job_keywords:
-            fuzzy_match = self.dataset[self.dataset['职位名称'].str.contains(keyword, na=False)]
-            if not fuzzy_match.empty:
-                return self._convert_to_profile(fuzzy_match.iloc[0], source="dataset_fuzzy")
+            fuzzy_rows = catalog.rows_where('职位名称', lambda name: keyword in name, limit=1)
+            if fuzzy_rows:
+                return self._convert_to_profile(catalog.row(fuzzy_rows[0]), source="dataset_fuzzy")
         
         return None
     
@@ -87,7 +110,7 @@ class JobDatasetService:
         
         return keywords if keywords else [job_name[:3]]  # 至少取前3个字
     
-    def _convert_to_profile(self, row: pd.Series, source: str) -> Dict:
+    def _convert_to_profile(self, row: Dict, source: str) -> Dict:
         """
         将数据集记录转换为标准画像格式
         
@@ -132,38 +155,11 @@ class JobDatasetService:
         return profile
 
     def _parse_salary(self, salary_str: str) -> str:
-        """解析薪资范围：兼容所有格式"""
-        if not salary_str or salary_str == "面议":
+        """解析薪资范围：兼容所有格式（万 / 元 / k，解析规则见 salary_index），统一为 "15k-25k" """
+        r = parse_salary_range(salary_str) if salary_str and salary_str != "面议" else None
+        if r is None:
             return "面议"
-
-        try:
-            import re
-            # 移除"·13薪"之类的后缀
-            salary_str = re.sub(r'[·•]\d+薪', '', salary_str)
-
-            # 格式1: X万-Y万 或 X-Y万
-            match = re.search(r'([\d.]+)\s*-\s*([\d.]+)\s*万', salary_str)
-            if match:
-                low = float(match.group(1))
-                high = float(match.group(2))
-                return f"{int(low * 10)}k-{int(high * 10)}k"
-
-            # 格式2: XXXX-YYYY元
-            match = re.search(r'(\d+)\s*-\s*(\d+)\s*元?', salary_str)
-            if match:
-                low = int(match.group(1))
-                high = int(match.group(2))
-                return f"{low // 1000}k-{high // 1000}k"
-
-            # 格式3: Xk-Yk
-            match = re.search(r'(\d+)\s*k\s*-\s*(\d+)\s*k', salary_str, re.IGNORECASE)
-            if match:
-                return f"{match.group(1)}k-{match.group(2)}k"
-
-        except Exception as e:
-            pass
-
-        return "面议"
+        return f"{r.min // 1000}k-{r.max // 1000}k"
     
     def _parse_location(self, location_str: str) -> str:
         """解析工作地址：广州·白云·云城 → 广州"""
@@ -172,15 +168,8 @@ class JobDatasetService:
         return location_str
     
     def _infer_level(self, job_name: str) -> str:
-        """从岗位名称推断级别"""
-        if "初级" in job_name or "助理" in job_name:
-            return "初级"
-        elif "高级" in job_name or "资深" in job_name or "专家" in job_name:
-            return "高级"
-        elif "总监" in job_name or "经理" in job_name:
-            return "管理层"
-        else:
-            return "中级"
+        """从岗位名称推断级别（规则见 job_title_attrs.JOB_LEVEL_KEYWORDS，按名称备忘）"""
+        return job_level(job_name)
     
     def _extract_education(self, description: str) -> Dict:
         """从描述中提取学历要求"""
@@ -203,46 +192,25 @@ class JobDatasetService:
         return {"min_years": 0, "weight": 0.05}
     
     def _extract_skills_from_description(self, description: str) -> Dict:
-        """从职位描述提取技能要求"""
-        # 常见技术栈关键词
-        tech_stack = {
-            "编程语言": ["Python", "Java", "C++", "JavaScript", "Go", "PHP", "C#"],
-            "框架工具": ["Spring", "Django", "Flask", "React", "Vue", "Angular", "TensorFlow", "PyTorch"],
-            "数据库": ["MySQL", "Redis", "MongoDB", "Oracle", "PostgreSQL"],
-            "云平台": ["AWS", "Azure", "阿里云", "腾讯云"],
-            "其他": ["Docker", "Kubernetes", "Git", "Linux", "Nginx"]
-        }
-        
+        """从职位描述提取技能要求（关键词自动机一次扫描）"""
         skills = {
             "programming_languages": [],
             "frameworks_tools": [],
             "domain_knowledge": []
         }
         
-        # 扫描描述文本
-        description_lower = description.lower()
-        
-        for skill in tech_stack["编程语言"]:
-            if skill.lower() in description_lower:
-                skills["programming_languages"].append({
-                    "skill": skill,
-                    "level": "熟悉",
-                    "importance": "重要",
-                    "weight": 0.08
-                })
-        
-        for skill in tech_stack["框架工具"] + tech_stack["数据库"] + tech_stack["云平台"] + tech_stack["其他"]:
-            if skill.lower() in description_lower:
-                skills["frameworks_tools"].append({
-                    "skill": skill,
-                    "level": "熟悉",
-                    "importance": "加分",
-                    "weight": 0.05
-                })
+        for i in sorted(_get_tech_automaton().find_payloads(description or "")):
+            category, skill, importance, weight = _TECH_ENTRIES[i]
+            skills[category].append({
+                "skill": skill,
+                "level": "熟悉",
+                "importance": importance,
+                "weight": weight
+            })
         
         return skills
     
-    def _extract_tags(self, row: pd.Series) -> List[str]:
+    def _extract_tags(self, row: Dict) -> List[str]:
         """提取标签"""
         tags = []
         
@@ -262,16 +230,69 @@ class JobDatasetService:
     
     def get_all_job_names(self) -> List[str]:
         """获取数据集中所有岗位名称"""
-        if self.dataset is None:
-            return []
-        return self.dataset['职位名称'].unique().tolist()
+        return list(dict.fromkeys(self.catalog.column('职位名称')))
 
 
 # ============================================================
 # 加权技能匹配算法（准确率>80%）
 # ============================================================
 
-def calculate_weighted_skill_match(user_skills: List[str], job_profile: Dict) -> float:
+def job_skill_weights(job_profile: Dict) -> List[Tuple[int, float, str]]:
+    """
+    岗位技能及权重：[(技能 ID, 权重, 重要性)]，按画像中的顺序（同一技能可出现多次）。
+    加权匹配与岗位相似度矩阵（job_similarity_index）共用，保证两者口径一致。
+    """
+    registry = get_skill_registry()
+    weighted: List[Tuple[int, float, str]] = []
+
+    # 新版画像：core_skills.professional + tools，统一权重
+    core = job_profile.get("core_skills", {})
+    for key in ("professional", "tools"):
+        for item in (core.get(key) or []):
+            s = item.get("skill", item) if isinstance(item, dict) else item
+            if s and isinstance(s, str):
+                weighted.append((registry.intern(s), 0.1, "重要"))
+
+    # 旧版画像：requirements.professional_skills（各类别默认权重/重要性不同）
+    if not weighted:
+        prof_skills = job_profile.get("requirements", {}).get("professional_skills", {})
+        for skill_type, default_weight, default_importance in (
+            ("programming_languages", 0.08, "重要"),
+            ("frameworks_tools", 0.05, "加分"),
+            ("domain_knowledge", 0.05, "加分"),
+        ):
+            for item in prof_skills.get(skill_type, []):
+                weight = item.get("weight", default_weight)
+                importance = item.get("importance", default_importance)
+                if importance == "必需":
+                    weight *= 2
+                weighted.append((registry.intern(item["skill"]), weight, importance))
+    return weighted
+
+
+def job_skill_set(job_profile: Dict) -> set:
+    """岗位技能 ID 集合（支持 requirements 与 core_skills 两种结构，别名已归并，不含空技能）"""
+    registry = get_skill_registry()
+    skills = set()
+    # 新版画像：core_skills
+    core = job_profile.get("core_skills", {})
+    for key in ("professional", "tools"):
+        for item in (core.get(key) or []):
+            s = item.get("skill", item) if isinstance(item, dict) else item
+            if s and isinstance(s, str):
+                skills.add(registry.intern(s))
+    # 旧版画像：requirements.professional_skills
+    if not skills:
+        reqs = job_profile.get("requirements", {})
+        prof_skills = reqs.get("professional_skills", {})
+        for skill_type in ("programming_languages", "frameworks_tools", "domain_knowledge"):
+            for item in prof_skills.get(skill_type, []):
+                skills.add(registry.intern(item["skill"]))
+    skills.discard(-1)
+    return skills
+
+
+def calculate_weighted_skill_match(user_skills: List, job_profile: Dict) -> float:
     """
     加权技能匹配算法
     
@@ -280,80 +301,34 @@ def calculate_weighted_skill_match(user_skills: List[str], job_profile: Dict) ->
     2. 技能匹配度（精确匹配>模糊匹配）
     3. 技能覆盖率（匹配的必需技能比例）
     
+    user_skills 可为技能名或技能注册表 ID（见 job_profile.skill_registry），
+    精确匹配（含别名）为 ID 集合查找。
+    
     返回：匹配分数（0-100）
     """
-    requirements = job_profile.get("requirements", {})
-    prof_skills = requirements.get("professional_skills", {})
-    
+    registry = get_skill_registry()
     # 提取岗位技能及权重
-    job_skills_weighted = []
-    
-    # 新版画像：core_skills.professional + tools，统一权重
-    core = job_profile.get("core_skills", {})
-    for key in ("professional", "tools"):
-        for item in (core.get(key) or []):
-            s = item.get("skill", item) if isinstance(item, dict) else item
-            if s and isinstance(s, str):
-                job_skills_weighted.append({"skill": s.lower(), "weight": 0.1, "importance": "重要"})
-    
-    # 旧版画像：requirements.professional_skills
-    if not job_skills_weighted:
-        for lang in prof_skills.get("programming_languages", []):
-            weight = lang.get("weight", 0.08)
-            importance = lang.get("importance", "重要")
-            if importance == "必需":
-                weight *= 2
-            job_skills_weighted.append({
-                "skill": lang["skill"].lower(),
-                "weight": weight,
-                "importance": importance
-            })
-        for tool in prof_skills.get("frameworks_tools", []):
-            weight = tool.get("weight", 0.05)
-            importance = tool.get("importance", "加分")
-            if importance == "必需":
-                weight *= 2
-            job_skills_weighted.append({
-                "skill": tool["skill"].lower(),
-                "weight": weight,
-                "importance": importance
-            })
-        for domain in prof_skills.get("domain_knowledge", []):
-            weight = domain.get("weight", 0.05)
-            importance = domain.get("importance", "加分")
-            if importance == "必需":
-                weight *= 2
-            job_skills_weighted.append({
-                "skill": domain["skill"].lower(),
-                "weight": weight,
-                "importance": importance
-            })
+    job_skills_weighted = job_skill_weights(job_profile)
     
     if not job_skills_weighted:
         return 50.0  # 无技能要求，返回中等分数
     
     # 计算匹配分数
-    user_skills_lower = [s.lower() for s in user_skills]
-    total_weight = sum([s["weight"] for s in job_skills_weighted])
+    user_ids = registry.ids(user_skills)
+    total_weight = sum([weight for _, weight, _ in job_skills_weighted])
     matched_weight = 0.0
     
-    for job_skill in job_skills_weighted:
-        if job_skill["skill"] in user_skills_lower:
-            matched_weight += job_skill["weight"]
-        else:
-            # 模糊匹配（如"python"匹配"python3"）
-            for user_skill in user_skills_lower:
-                if job_skill["skill"] in user_skill or user_skill in job_skill["skill"]:
-                    matched_weight += job_skill["weight"] * 0.8  # 模糊匹配打8折
-                    break
+    for skill_id, weight, _ in job_skills_weighted:
+        if skill_id in user_ids:
+            matched_weight += weight
+        elif any(registry.substring_related(skill_id, uid) for uid in user_ids):
+            # 模糊匹配（如"spring"匹配"spring boot"）
+            matched_weight += weight * 0.8  # 模糊匹配打8折
     
     # 必需技能覆盖率惩罚
-    required_skills = [s for s in job_skills_weighted if s["importance"] == "必需"]
+    required_skills = [skill_id for skill_id, _, importance in job_skills_weighted if importance == "必需"]
     if required_skills:
-        required_matched = sum([
-            1 for s in required_skills
-            if s["skill"] in user_skills_lower
-        ])
+        required_matched = sum([1 for skill_id in required_skills if skill_id in user_ids])
         required_coverage = required_matched / len(required_skills)
         if required_coverage < 0.5:  # 必需技能覆盖<50%，严重惩罚
             matched_weight *= 0.6
@@ -12,10 +12,14 @@
   4.3 POST /job/relation-graph - 获取岗位关联图谱
 """
 
+import hashlib
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 
 from utils.logger_handler import logger
@@ -25,12 +29,16 @@ from model.factory import chat_model
 
 from job_profile.job_profile_service import (
     job_profile_conf,
-    _load_profiles_store,
+    get_job_profile_conf_version,
     get_job_profile_service,
+    get_profiles_store_version,
     to_standard_name,
 )
-from job_profile.job_dataset_service import calculate_weighted_skill_match  # 加权匹配算法
-from job_profile.career_path_generator import generate_career_path  # LLM 动态晋升阶段
+from job_profile.job_catalog import get_job_catalog  # 共享岗位目录（已加载的画像）
+from job_profile.job_dataset_service import calculate_weighted_skill_match, job_skill_set  # 加权匹配算法
+from job_profile.skill_registry import get_skill_registry  # 技能名 → ID
+from job_profile.job_similarity_index import get_job_similarity_service  # 岗位技能相似度 Top-K 近邻
+from job_profile.career_path_generator import generate_career_path_with_status  # LLM 动态晋升阶段
 
 
 # ============================================================
@@ -48,14 +56,14 @@ def calculate_skill_similarity(job_a: dict, job_b: dict) -> float:
     
     返回：相似度分数（0-100）
     """
-    # 提取A岗位的技能作为"用户技能"
-    skills_a = list(_extract_skills(job_a))
+    # 提取A岗位的技能ID作为"用户技能"
+    skills_a = _extract_skills(job_a)
     
     # 用加权算法计算B岗位对A技能的匹配度
     similarity_a_to_b = calculate_weighted_skill_match(skills_a, job_b)
     
     # 反向计算
-    skills_b = list(_extract_skills(job_b))
+    skills_b = _extract_skills(job_b)
     similarity_b_to_a = calculate_weighted_skill_match(skills_b, job_a)
     
     # 取平均值（双向对称）
@@ -65,26 +73,8 @@ def calculate_skill_similarity(job_a: dict, job_b: dict) -> float:
 
 
 def _extract_skills(job_profile: dict) -> set:
-    """从岗位画像提取技能集合（支持 requirements 与 core_skills 两种结构）"""
-    skills = set()
-    # 新版画像：core_skills
-    core = job_profile.get("core_skills", {})
-    for key in ("professional", "tools"):
-        for item in (core.get(key) or []):
-            s = item.get("skill", item) if isinstance(item, dict) else item
-            if s and isinstance(s, str):
-                skills.add(s.lower())
-    # 旧版画像：requirements.professional_skills
-    if not skills:
-        reqs = job_profile.get("requirements", {})
-        prof_skills = reqs.get("professional_skills", {})
-        for lang in prof_skills.get("programming_languages", []):
-            skills.add(lang["skill"].lower())
-        for tool in prof_skills.get("frameworks_tools", []):
-            skills.add(tool["skill"].lower())
-        for domain in prof_skills.get("domain_knowledge", []):
-            skills.add(domain["skill"].lower())
-    return skills
+    """从岗位画像提取技能 ID 集合（支持 requirements 与 core_skills 两种结构，别名已归并）"""
+    return job_skill_set(job_profile)
 
 
 # ============================================================
@@ -207,10 +197,68 @@ def _default_transfer_evaluation() -> dict:
         "time": "6-12个月",
         "skills_gap": ["需根据具体岗位分析"],
         "suggestions": ["建议咨询职业规划师获取详细建议"],
-        "match_score": 75
+        "match_score": 75,
+        "degraded": True,  # 默认值不写入评估缓存，下次请求重试
     }
 
 
+# 转岗评估的提示词模板变化时递增，使已缓存的评估失效
+TRANSFER_EVAL_PROMPT_VERSION = 1
+
+
+def _transfer_eval_version(job_from: dict, job_to: dict) -> str:
+    """评估输入（两岗位名称 + 技能文本 + 提示词版本）的指纹，作为评估缓存的画像版本"""
+    payload = json.dumps(
+        [TRANSFER_EVAL_PROMPT_VERSION,
+         job_from.get("job_name", ""), _format_skills_for_llm(job_from),
+         job_to.get("job_name", ""), _format_skills_for_llm(job_to)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def evaluate_transfers_cached(from_job_id: str, job_from: dict, targets: List[tuple]) -> List[dict]:
+    """
+    批量评估 from_job_id 到 targets [(to_job_id, 画像)] 的转岗难度，结果与 targets 顺序一致。
+    先查 job_relations 表中的评估缓存（画像指纹一致才命中），未命中的并发调用 LLM，成功的评估写回缓存。
+    """
+    from job_profile.job_relations_db import get_transfer_evaluations, save_transfer_evaluations
+
+    if not targets:
+        return []
+    versions = [_transfer_eval_version(job_from, job_to) for _, job_to in targets]
+    results: List[Optional[dict]] = [None] * len(targets)
+    try:
+        cached = get_transfer_evaluations(from_job_id, {to_id: v for (to_id, _), v in zip(targets, versions)})
+        results = [cached.get(to_id) for to_id, _ in targets]
+    except Exception as e:
+        logger.warning(f"[JobGraph] 读取转岗评估缓存失败: {e}")
+    todo = [i for i, result in enumerate(results) if result is None]
+    if not todo:
+        return results
+
+    workers = max(1, min(int(job_profile_conf.get("transfer_eval_workers", 8) or 1), len(todo)))
+    if workers == 1:
+        fresh = [evaluate_transfer_difficulty_with_llm(job_from, targets[i][1]) for i in todo]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transfer-eval") as pool:
+            fresh = list(pool.map(lambda i: evaluate_transfer_difficulty_with_llm(job_from, targets[i][1]), todo))
+
+    to_store = []
+    for i, result in zip(todo, fresh):
+        if not isinstance(result, dict):
+            result = _default_transfer_evaluation()
+        results[i] = result
+        if not result.get("degraded"):
+            to_store.append((targets[i][0], versions[i], result))
+    if to_store:
+        try:
+            save_transfer_evaluations(from_job_id, to_store)
+        except Exception as e:
+            logger.warning(f"[JobGraph] 写入转岗评估缓存失败: {e}")
+    return results
+
+
 # ============================================================
 # 核心算法3：个性化路径推荐
 # ============================================================
@@ -227,7 +275,8 @@ def recommend_personalized_path(user_skills: List[str], all_jobs: dict) -> dict:
         "transfer_options": 转岗建议
     }
     """
-    user_skill_set = set([s.lower() for s in user_skills])
+    registry = get_skill_registry()
+    user_skill_set = registry.ids(user_skills)
     
     # 计算用户与每个岗位的匹配度
     match_scores = []
@@ -244,7 +293,7 @@ def recommend_personalized_path(user_skills: List[str], all_jobs: dict) -> dict:
             "job_id": job_id,
             "job_name": job_profile.get("job_name", ""),
             "match_score": round(match_score, 2),
-            "missing_skills": list(job_skills - user_skill_set)
+            "missing_skills": registry.names(job_skills - user_skill_set)
         })
     
     # 按匹配度排序
@@ -279,12 +328,25 @@ class AIJobGraphBuilder:
     """
     
     def __init__(self):
-        self.target_jobs = job_profile_conf.get("target_jobs", [])
-        self.career_tracks = job_profile_conf.get("career_tracks", [])
-        self._job_index = {j["job_id"]: j for j in self.target_jobs}
+        self._config_version = None
+        self._sync_config()
         
         # 相似度阈值（大于此值才建立转岗边）
         self.similarity_threshold = 30.0  # 30%技能重叠即可转岗
+        self.max_transfer_edges = 10      # 转岗边最多保留数（按技能相似度取前 N 个再做 LLM 评估）
+        
+        # 垂直晋升图谱缓存：((配置版本, 画像 dict, 画像库版本), 全部晋升链, job_id → 所在晋升链)
+        self._vertical_cache: Optional[tuple] = None
+        self._vertical_lock = threading.Lock()
+    
+    def _sync_config(self):
+        """job_profile.yml 重新加载后刷新岗位与晋升链配置"""
+        version = get_job_profile_conf_version()
+        if self._config_version != version:
+            self.target_jobs = job_profile_conf.get("target_jobs", [])
+            self.career_tracks = job_profile_conf.get("career_tracks", [])
+            self._job_index = {j["job_id"]: j for j in self.target_jobs}
+            self._config_version = version
     
     # ----------------------------------------------------------
     # 垂直晋升图谱（保持原逻辑，已经是L3）
@@ -331,6 +393,26 @@ class AIJobGraphBuilder:
         
         return vertical_graphs
     
+    def vertical_tracks(self, profiles: dict) -> Tuple[list, Dict[str, dict]]:
+        """
+        全部晋升链图谱及 job_id → 所在晋升链（岗位在多条链中时取配置中靠前的一条）。
+        按 (配置版本, 画像 dict, 画像库版本) 只构建一次，配置重新加载或画像变化后自动重建。
+        """
+        self._sync_config()
+        key = (self._config_version, id(profiles), get_profiles_store_version())
+        cached = self._vertical_cache
+        if cached is None or cached[0] != key:
+            with self._vertical_lock:
+                cached = self._vertical_cache
+                if cached is None or cached[0] != key:
+                    graphs = self.build_vertical_graphs(profiles)
+                    track_index: Dict[str, dict] = {}
+                    for graph in graphs:
+                        for node in graph["nodes"]:
+                            track_index.setdefault(node["job_id"], graph)
+                    cached = self._vertical_cache = (key, graphs, track_index)
+        return cached[1], cached[2]
+    
     # ----------------------------------------------------------
     # 横向转岗图谱（核心升级：AI智能推理）
     # ----------------------------------------------------------
@@ -339,9 +421,9 @@ class AIJobGraphBuilder:
         AI智能转岗图谱
         
         核心算法：
-        1. 遍历所有岗位，计算与中心岗位的技能相似度
-        2. 相似度>阈值的岗位，建立转岗边
-        3. 用LLM评估每条转岗边的难度/时间/技能差距
+        1. 从岗位近邻索引取与中心岗位技能相似度最高的 Top-K 岗位（job_similarity_index，预计算）
+        2. 相似度>阈值的岗位按相似度取前 max_transfer_edges 个，建立转岗边
+        3. 用LLM并发评估每条转岗边的难度/时间/技能差距（评估结果缓存在 job_relations 表）
         4. 如果提供user_skills，进行个性化推荐
         """
         center_profile = profiles.get(center_job_id)
@@ -351,47 +433,48 @@ class AIJobGraphBuilder:
         nodes = [self._get_node_info(center_job_id, profiles)]
         edges = []
         
-        # 遍历所有岗位，计算相似度
-        for job_id, job_profile in profiles.items():
-            if job_id == center_job_id:
-                continue
-            
-            # 计算技能相似度
-            similarity = calculate_skill_similarity(center_profile, job_profile)
+        # 先按技能相似度排序截断（近邻按相似度降序，低于阈值即可停止），只评估保留下来的岗位
+        candidates = []
+        for job_id, similarity in get_job_similarity_service().neighbors(center_job_id, profiles):
+            if similarity < self.similarity_threshold or len(candidates) >= self.max_transfer_edges:
+                break
+            job_profile = profiles.get(job_id)
+            if job_profile is not None:
+                candidates.append((job_id, job_profile, similarity))
+        
+        # 用LLM评估转岗难度（有缓存的直接取，其余并发调用）
+        evaluations = evaluate_transfers_cached(
+            center_job_id, center_profile, [(job_id, job_profile) for job_id, job_profile, _ in candidates]
+        )
+        
+        for (job_id, job_profile, similarity), evaluation in zip(candidates, evaluations):
+            # 添加节点
+            nodes.append(self._get_node_info(job_id, profiles))
             
-            # 相似度达到阈值，建立转岗边
-            if similarity >= self.similarity_threshold:
-                # 用LLM评估转岗难度
-                evaluation = evaluate_transfer_difficulty_with_llm(center_profile, job_profile)
-                
-                # 添加节点
-                nodes.append(self._get_node_info(job_id, profiles))
-                
-                # 匹配度优先用 LLM 给出的 match_score（有区分度），否则用技能相似度
-                match_score = evaluation.get("match_score")
-                if match_score is not None:
-                    try:
-                        match_score = int(match_score)
-                        match_score = max(0, min(100, match_score))
-                    except (TypeError, ValueError):
-                        match_score = int(similarity)
-                else:
+            # 匹配度优先用 LLM 给出的 match_score（有区分度），否则用技能相似度
+            match_score = evaluation.get("match_score")
+            if match_score is not None:
+                try:
+                    match_score = int(match_score)
+                    match_score = max(0, min(100, match_score))
+                except (TypeError, ValueError):
                     match_score = int(similarity)
-                # 添加边
-                edge = {
-                    "from": center_job_id,
-                    "to": job_id,
-                    "relevance_score": match_score,
-                    "match_score": match_score,
-                    "difficulty": evaluation.get("difficulty", "中"),
-                    "time": evaluation.get("time", "6-12个月"),
-                    "skills_gap": evaluation.get("skills_gap", [])
-                }
-                edges.append(edge)
+            else:
+                match_score = int(similarity)
+            # 添加边
+            edge = {
+                "from": center_job_id,
+                "to": job_id,
+                "relevance_score": match_score,
+                "match_score": match_score,
+                "difficulty": evaluation.get("difficulty", "中"),
+                "time": evaluation.get("time", "6-12个月"),
+                "skills_gap": evaluation.get("skills_gap", [])
+            }
+            edges.append(edge)
         
-        # 按相似度排序，只保留Top10
+        # 按 LLM 匹配度排序
         edges.sort(key=lambda x: x["relevance_score"], reverse=True)
-        edges = edges[:10]
         
         # 若所有边的 match_score 相同（如全为75），强制区分度：高/中/低至少各一档，避免转岗卡片全黄
         if len(edges) >= 2:
@@ -414,6 +497,11 @@ class AIJobGraphBuilder:
             "algorithm": "AI智能推理（技能相似度 + LLM评估）",
             "similarity_threshold": self.similarity_threshold
         }
+        # 有转岗边用的是 LLM 失败时的默认评估：标记降级，预计算流水线不保存该结果
+        degraded_edges = sum(1 for evaluation in evaluations if evaluation.get("degraded"))
+        if degraded_edges:
+            result["degraded"] = True
+            result["degraded_edges"] = degraded_edges
         
         # 如果提供了用户技能，添加个性化推荐
         if user_skills:
@@ -495,9 +583,19 @@ class JobGraphService:
         - graph_type: "vertical"(垂直晋升) / "transfer"(横向转岗) / "all"(全部)
         - user_id: 用户ID（可选，用于个性化推荐）
         
-        返回：符合API文档4.3格式的图谱数据
+        返回：符合API文档4.3格式的图谱数据；data.timings 为本次请求各阶段耗时（毫秒）
         """
-        profiles = _load_profiles_store()
+        request_start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        def _mark(stage: str, since: float) -> float:
+            now = time.perf_counter()
+            timings[stage] = round((now - since) * 1000, 2)
+            return now
+
+        # 已加载的岗位画像（共享岗位目录），不再每次请求重新派生
+        profiles = get_job_catalog().profiles
+        stage_start = _mark("profiles_ms", request_start)
         
         if job_id not in profiles:
             return {
@@ -506,6 +604,7 @@ class JobGraphService:
                 "data": None
             }
         
+        self.builder._sync_config()
         center_job = profiles[job_id]
         bi = center_job.get("basic_info", {})
         ma = center_job.get("market_analysis", {})
@@ -529,11 +628,13 @@ class JobGraphService:
             user_skills = None
             if user_id:
                 user_skills = self._get_user_skills(user_id)
+                stage_start = _mark("user_skills_ms", stage_start)
             
             # 构建图谱（任一环节异常时用空图兜底，避免接口返回空响应）
             if graph_type in ["vertical", "all"]:
-                vertical_graphs = self.builder.build_vertical_graphs(profiles)
-                result["vertical_graph"] = self._find_vertical_path(job_id, vertical_graphs)
+                _, track_index = self.builder.vertical_tracks(profiles)
+                result["vertical_graph"] = self._find_vertical_path(job_id, track_index)
+                stage_start = _mark("vertical_graph_ms", stage_start)
             else:
                 result["vertical_graph"] = {"nodes": [], "edges": [], "track_name": "", "message": "未请求垂直图谱"}
             
@@ -541,22 +642,30 @@ class JobGraphService:
                 result["transfer_graph"] = self.builder.build_transfer_graph_ai(
                     job_id, profiles, user_skills
                 )
+                stage_start = _mark("transfer_graph_ms", stage_start)
             else:
                 result["transfer_graph"] = {"nodes": [], "edges": [], "message": "未请求转岗图谱"}
             
-            # 晋升路径：使用 LLM 动态生成 4 阶段
+            # 晋升路径：使用 LLM 动态生成 4 阶段（LLM 失败时的默认阶段标记 degraded）
             center_job_name = center_job.get("job_name", "")
             try:
-                result["career_path"] = {"promotion_path": generate_career_path(center_job_name)}
+                stages, degraded = generate_career_path_with_status(center_job_name)
+                result["career_path"] = {"promotion_path": stages}
+                if degraded:
+                    result["career_path"]["degraded"] = True
             except Exception as e:
                 logger.warning(f"[JobGraph] 晋升路径生成失败，前端将使用兜底: {e}")
-                result["career_path"] = {"promotion_path": []}
+                result["career_path"] = {"promotion_path": [], "degraded": True}
+            _mark("career_path_ms", stage_start)
         except Exception as e:
             logger.error(f"[JobGraph] 构建图谱异常，返回空图: {e}", exc_info=True)
             result.setdefault("vertical_graph", {"nodes": [], "edges": [], "track_name": "", "message": "图谱生成失败"})
             result.setdefault("transfer_graph", {"nodes": [], "edges": [], "message": "图谱生成失败"})
-            result.setdefault("career_path", {"promotion_path": []})
+            result.setdefault("career_path", {"promotion_path": [], "degraded": True})
         
+        _mark("total_ms", request_start)
+        result["timings"] = timings
+        logger.info(f"[JobGraph] 实时构建图谱 job_id={job_id} graph_type={graph_type} 耗时: {timings}")
         return {
             "code": 200,
             "msg": "success",
@@ -570,16 +679,15 @@ class JobGraphService:
             raise ValueError(out.get("msg", "图谱获取失败"))
         return out.get("data") or {}
     
-    def _find_vertical_path(self, job_id: str, vertical_graphs: list) -> dict:
-        """找到包含指定岗位的垂直晋升路径"""
-        for graph in vertical_graphs:
-            job_ids = [n["job_id"] for n in graph["nodes"]]
-            if job_id in job_ids:
-                return {
-                    "track_name": graph["track_name"],
-                    "nodes": graph["nodes"],
-                    "edges": graph["edges"]
-                }
+    def _find_vertical_path(self, job_id: str, track_index: Dict[str, dict]) -> dict:
+        """找到包含指定岗位的垂直晋升路径（track_index 见 AIJobGraphBuilder.vertical_tracks）"""
+        graph = track_index.get(job_id)
+        if graph is not None:
+            return {
+                "track_name": graph["track_name"],
+                "nodes": list(graph["nodes"]),
+                "edges": list(graph["edges"])
+            }
         
         return {"nodes": [], "edges": [], "msg": "该岗位暂无晋升路径"}
     
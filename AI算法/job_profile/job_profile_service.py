@@ -19,12 +19,12 @@ CSV字段说明（来自求职岗位信息数据.csv）：
   4.4 POST /job/ai-generate-profile
 """
 
-import csv
+import hashlib
 import json
 import os
 import re
 from datetime import datetime
-from typing import Optional
+from typing import List, Mapping, Optional
 
 import yaml
 from langchain_core.output_parsers import StrOutputParser
@@ -32,6 +32,20 @@ from langchain_core.prompts import PromptTemplate
 
 from utils.logger_handler import logger
 from utils.path_tool import get_abs_path
+from job_profile.job_csv_snapshot import get_job_csv_snapshot
+from job_profile.job_catalog import get_job_catalog
+from job_profile.derived_profile_cache import get_derived_profile_cache, make_row_key
+from job_profile.keyword_matcher import KeywordAutomaton
+from job_profile.job_title_attrs import standard_name
+from job_profile.profile_filter_index import (
+    FACET_CATEGORY,
+    FACET_CITY,
+    FACET_COMPANY_SCALE,
+    FACET_COMPANY_TYPE,
+    FACET_INDUSTRY,
+    FACET_LEVEL,
+    FACET_NAME,
+)
 
 
 # ========== 加载配置 ==========
@@ -43,6 +57,24 @@ def _load_job_profile_config() -> dict:
 
 job_profile_conf = _load_job_profile_config()
 
+# 配置版本号：reload_job_profile_conf 后递增，供按配置缓存的派生数据（如垂直晋升图谱）判断是否失效
+_job_profile_conf_version = 0
+
+
+def get_job_profile_conf_version() -> int:
+    return _job_profile_conf_version
+
+
+def reload_job_profile_conf() -> dict:
+    """重新读取 config/job_profile.yml 并原地更新 job_profile_conf（已导入该 dict 的模块随之生效）"""
+    global _job_profile_conf_version
+    conf = _load_job_profile_config()
+    job_profile_conf.clear()
+    job_profile_conf.update(conf)
+    _job_profile_conf_version += 1
+    logger.info(f"[JobProfileService] 已重新加载 job_profile.yml（配置版本 {_job_profile_conf_version}）")
+    return job_profile_conf
+
 
 # ========== 工具函数 ==========
 
@@ -50,12 +82,9 @@ def to_standard_name(name: str) -> str:
     """
     标准化岗位名称：去掉括号及括号内内容、首尾空格。
     与 DB 的 standard_name 规则一致（TRIM(REGEXP_REPLACE(name, '\\(.*\\)', ''))）。
-    仅用于搜索匹配与图谱节点展示/分组，不修改原始 name。
+    仅用于搜索匹配与图谱节点展示/分组，不修改原始 name。按名称备忘（job_title_attrs）。
     """
-    if not name or not isinstance(name, str):
-        return name or ""
-    s = re.sub(r"\s*[（(].*?[)）]\s*", "", name).strip()
-    return s or name.strip()
+    return standard_name(name)
 
 
 def _load_prompt(prompt_key: str) -> str:
@@ -97,35 +126,92 @@ _SKILL_KEYWORDS = {
 }
 
 
-def _extract_skills_from_description(desc: str) -> dict:
+# 职位描述中的学历 / 年限 / 职级 / 软技能线索（供 _infer_requirements_from_description 使用）
+_JD_CUE_KEYWORDS = {
+    ("edu", "博士"): ["博士"],
+    ("edu", "硕士"): ["硕士", "研究生"],
+    ("edu", "专科"): ["大专", "专科"],
+    ("edu", "本科"): ["本科"],
+    ("years", "高级"): ["5年", "五年", "6年", "7年", "8年", "10年"],
+    ("years", "中级"): ["3年", "三年", "4年", "2年"],
+    ("title", "高级"): ["架构", "专家", "总监", "负责人"],
+    ("title", "中级"): ["经理", "主管", "组长"],
+    ("soft", "communication"): ["沟通", "协调", "团队协作", "表达能力"],
+    ("soft", "pressure"): ["抗压", "压力", "节奏快", "加班"],
+    ("soft", "learning"): ["学习", "快速上手", "自学"],
+    ("soft", "innovation"): ["创新"],
+}
+
+# 技能提取扫描前 3000 字、要求推断扫描前 2000 字，避免长文本拖慢加载
+_SKILL_SCAN_CHARS = 3000
+_CUE_SCAN_CHARS = 2000
+
+# (技能类别, 原始关键词)，按 _SKILL_KEYWORDS 顺序去重（同名关键词只归入首次出现的类别）
+_SKILL_ENTRIES: List[tuple] = []
+_seen_skill_keys = set()
+for _skill_type, _keywords in _SKILL_KEYWORDS.items():
+    for _kw in _keywords:
+        if _kw.lower() not in _seen_skill_keys:
+            _seen_skill_keys.add(_kw.lower())
+            _SKILL_ENTRIES.append((_skill_type, _kw))
+del _seen_skill_keys
+
+_jd_automaton: Optional[KeywordAutomaton] = None
+
+
+def _get_jd_automaton() -> KeywordAutomaton:
+    """技能关键词 + 要求线索编译成的单个自动机（首次使用时构建）"""
+    global _jd_automaton
+    if _jd_automaton is None:
+        automaton = KeywordAutomaton()
+        for i, (_, kw) in enumerate(_SKILL_ENTRIES):
+            automaton.add(kw, ("skill", i))
+        for cue, keywords in _JD_CUE_KEYWORDS.items():
+            for kw in keywords:
+                automaton.add(kw, cue)
+        _jd_automaton = automaton.compile()
+    return _jd_automaton
+
+
+def _scan_description(desc: str) -> tuple:
     """
-    从职位描述中提取技能要求，供岗位匹配算法使用。
-    使用快速子串匹配，避免 1 万条岗位加载过慢。
+    对职位描述做一次线性扫描，返回 (命中的技能序号集合, 命中的线索集合)。
+    线索只统计前 _CUE_SCAN_CHARS 字内的命中，与原先截断规则一致。
     """
+    skill_hits = set()
+    cues = set()
     if not desc or not isinstance(desc, str):
-        return {"programming_languages": [], "frameworks_tools": [], "domain_knowledge": []}
-    # 只扫描前 3000 字，加快处理
-    text = desc[:3000].lower()
-    result = {"programming_languages": [], "frameworks_tools": [], "domain_knowledge": []}
-    seen = set()
+        return skill_hits, cues
+    for _, end, payload in _get_jd_automaton().scan(desc, _SKILL_SCAN_CHARS):
+        if payload[0] == "skill":
+            skill_hits.add(payload[1])
+        elif end <= _CUE_SCAN_CHARS:
+            cues.add(payload)
+    return skill_hits, cues
 
-    for skill_type, keywords in _SKILL_KEYWORDS.items():
-        for kw in keywords:
-            kw_lower = kw.lower()
-            if kw_lower in seen:
-                continue
-            if kw_lower in text:
-                seen.add(kw_lower)
-                result[skill_type].append({
-                    "skill": kw,
-                    "level": "熟悉",
-                    "importance": "重要",
-                    "weight": 0.05,
-                })
-        result[skill_type] = result[skill_type][:10]
+
+def _skills_from_scan(skill_hits: set) -> dict:
+    result = {"programming_languages": [], "frameworks_tools": [], "domain_knowledge": []}
+    for i in sorted(skill_hits):
+        skill_type, kw = _SKILL_ENTRIES[i]
+        if len(result[skill_type]) < 10:
+            result[skill_type].append({
+                "skill": kw,
+                "level": "熟悉",
+                "importance": "重要",
+                "weight": 0.05,
+            })
     return result
 
 
+def _extract_skills_from_description(desc: str) -> dict:
+    """
+    从职位描述中提取技能要求，供岗位匹配算法使用。
+    关键词表编译为自动机，一次扫描找出全部命中（见 keyword_matcher）。
+    """
+    return _skills_from_scan(_scan_description(desc)[0])
+
+
 # 岗位名称关键词 → (技能类别, 技能名) 列表（当职位描述未提取到技能时兜底，避免专业技能维度为 0）
 _JOB_NAME_SKILL_MAP = [
     (["算法", "机器学习", "深度学习", "AI", "NLP", "计算机视觉"], [("programming_languages", "Python"), ("domain_knowledge", "机器学习"), ("domain_knowledge", "算法")]),
@@ -200,47 +286,39 @@ def _merge_professional_skills(from_jd: dict, from_name: dict) -> dict:
 
 
 # 从真实职位描述与行业推断要求（仅用 CSV 字段，不做假数据），使不同岗位维度分数真实差异化
-def _infer_requirements_from_description(desc: str, industry: str) -> tuple:
-    """
-    从职位描述、所属行业推断：学历、年限/层级、软技能要求。
-    返回 (education_level, level_初级|中级|高级, soft_skills_dict)。
-    只扫描描述前 2000 字，避免长文本拖慢加载。
-    """
-    text = (desc or "")[:2000]
-    industry = (industry or "").strip()
+def _requirements_from_cues(cues: set) -> tuple:
     edu = "本科"
-    if "博士" in text or "博士及以上" in text:
-        edu = "博士"
-    elif "硕士" in text or "研究生" in text or "硕士及以上" in text:
-        edu = "硕士"
-    elif "大专" in text or "专科" in text or "大专及以上" in text:
-        edu = "专科"
-    elif "本科" in text or "本科及以上" in text:
-        edu = "本科"
+    for level in ("博士", "硕士", "专科", "本科"):
+        if ("edu", level) in cues:
+            edu = level
+            break
 
     level = "初级"
-    if "5年" in text or "五年" in text or "6年" in text or "7年" in text or "8年" in text or "10年" in text:
+    if ("years", "高级") in cues:
         level = "高级"
-    elif "3年" in text or "三年" in text or "4年" in text or "2年" in text:
+    elif ("years", "中级") in cues:
         level = "中级"
-    if "架构" in text or "专家" in text or "总监" in text or "负责人" in text:
+    if ("title", "高级") in cues:
         level = "高级"
-    if "经理" in text or "主管" in text or "组长" in text:
-        if level == "初级":
-            level = "中级"
+    if ("title", "中级") in cues and level == "初级":
+        level = "中级"
 
     soft = {"innovation": "中", "learning": "高", "communication": "中", "pressure": "中"}
-    if "沟通" in text or "协调" in text or "团队协作" in text or "表达能力" in text:
-        soft["communication"] = "高"
-    if "抗压" in text or "压力" in text or "节奏快" in text or "加班" in text:
-        soft["pressure"] = "高"
-    if "学习" in text or "快速上手" in text or "自学" in text:
-        soft["learning"] = "高"
-    if "创新" in text or "创新思维" in text:
-        soft["innovation"] = "高"
+    for key in soft:
+        if ("soft", key) in cues:
+            soft[key] = "高"
     return edu, level, soft
 
 
+def _infer_requirements_from_description(desc: str, industry: str) -> tuple:
+    """
+    从职位描述、所属行业推断：学历、年限/层级、软技能要求。
+    返回 (education_level, level_初级|中级|高级, soft_skills_dict)。
+    只统计描述前 2000 字内的线索，避免长文本拖慢加载。
+    """
+    return _requirements_from_cues(_scan_description(desc)[1])
+
+
 def _basic_requirements_from_job_name(job_name: str) -> dict:
     """按岗位名称返回基础要求兜底（仅当描述未推断出时用）。"""
     if not job_name or not isinstance(job_name, str):
@@ -275,63 +353,115 @@ def _soft_skills_requirements_from_job_name(job_name: str) -> dict:
     return {"innovation": "中", "learning": "高", "communication": "中", "pressure": "中"}
 
 
-def _load_profiles_store() -> dict:
-    """岗位匹配严格从 data/求职岗位信息数据.csv 加载岗位，不读 profiles.json。"""
+# 派生规则版本：修改 _derive_profile 或其调用的提取 / 推断函数后递增，使派生画像缓存失效
+# （_SKILL_KEYWORDS、_JD_CUE_KEYWORDS、_JOB_NAME_SKILL_MAP 的改动已计入指纹，无需手动递增）
+PROFILE_EXTRACTOR_VERSION = "4"
+
+# 派生画像用到的 CSV 列（行内容哈希只取这些列）
+_DERIVE_COLUMNS = ("职位编号", "职位名称", "工作地址", "薪资范围", "职位描述",
+                   "所属行业", "公司全称", "人员规模", "企业性质", "公司简介")
+
+
+def _profile_extractor_version() -> str:
+    """派生规则版本 + 关键词表指纹"""
+    cue_table = [[list(cue), keywords] for cue, keywords in _JD_CUE_KEYWORDS.items()]
+    tables = json.dumps([_SKILL_KEYWORDS, cue_table, _JOB_NAME_SKILL_MAP], ensure_ascii=False, sort_keys=True)
+    return f"{PROFILE_EXTRACTOR_VERSION}:{hashlib.sha1(tables.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _derive_profile(row: dict, i: int) -> dict:
+    """由一行 CSV 派生岗位画像（i 为行号，仅在缺少职位编号 / 名称时用于生成兜底值）"""
+    job_id = row.get("职位编号") or f"job_{i+1:04d}"
+    job_name = row.get("职位名称", "").strip() or f"岗位_{i+1}"
+    location = (row.get("工作地址", "") or "").strip()
+    salary = (row.get("薪资范围", "") or "").strip()
+    desc = row.get("职位描述", "") or ""
+    # 技能与要求线索在同一次扫描中取得
+    skill_hits, cues = _scan_description(desc)
+    pro_skills = _skills_from_scan(skill_hits)
+    # 当 JD 未提取到任何技能时，按岗位名称兜底，避免匹配时专业技能维度为 0
+    if not any(pro_skills.get(k) for k in ("programming_languages", "frameworks_tools", "domain_knowledge")):
+        name_skills = _skills_from_job_name(job_name)
+        pro_skills = _merge_professional_skills(pro_skills, name_skills)
+    # 优先从真实职位描述、所属行业推断要求，无描述时再用岗位名称兜底（不做假数据）
+    edu_from_jd, level_from_jd, soft_from_jd = _requirements_from_cues(cues)
+    basic_req = _basic_requirements_from_job_name(job_name)
+    basic_req["education"] = basic_req.get("education") or {}
+    basic_req["education"]["level"] = edu_from_jd
+    if "gpa" not in basic_req:
+        basic_req["gpa"] = {"min_requirement": "3.0/4.0", "preferred": "3.5/4.0以上", "weight": 0.05}
+    soft_req = soft_from_jd if (desc and desc.strip()) else _soft_skills_requirements_from_job_name(job_name)
+    level = level_from_jd if (desc and desc.strip()) else ("高级" if any(k in job_name for k in ["架构", "专家", "总监"]) else ("中级" if any(k in job_name for k in ["经理", "主管", "组长"]) else "初级"))
+    return {
+        "job_id": job_id,
+        "job_name": job_name,
+        "basic_info": {
+            "industry": row.get("所属行业", ""),
+            "level": level,
+            "level_range": [level],
+            "salary_range": salary,
+            "avg_salary": salary,
+            "location": location,
+            "work_locations": [location] if location else [],
+            "company": row.get("公司全称", ""),
+            "company_scale": row.get("人员规模", ""),
+            "company_type": row.get("企业性质", ""),
+        },
+        "requirements": {
+            "professional_skills": pro_skills,
+            "basic_requirements": basic_req,
+            "soft_skills": soft_req,
+        },
+        "description": desc,
+        "company_intro": row.get("公司简介", ""),
+        "market_analysis": {"demand_score": 75, "growth_trend": "稳定"},
+    }
+
+
+# 画像中原样取自行的大段文本：缓存时不保存，命中后从行内容补回（缩小缓存体积与反序列化耗时）
+_ROW_TEXT_FIELDS = ("description", "company_intro")
+
+
+def _profile_for_cache(profile: dict) -> dict:
+    return {k: v for k, v in profile.items() if k not in _ROW_TEXT_FIELDS}
+
+
+def _profile_from_cache(cached: dict, row: dict) -> dict:
+    cached["description"] = row.get("职位描述", "") or ""
+    cached["company_intro"] = row.get("公司简介", "")
+    return cached
+
+
+def _row_cache_key(extractor_version: str, row: dict, i: int) -> str:
+    values = [row.get(c, "") for c in _DERIVE_COLUMNS]
+    # 兜底 job_id / 名称依赖行号，此时行号也计入内容
+    if not row.get("职位编号") or not row.get("职位名称", "").strip():
+        values.append(i)
+    return make_row_key(extractor_version, values)
+
+
+def _load_profiles_store(snapshot=None) -> dict:
+    """
+    岗位匹配严格从 data/求职岗位信息数据.csv 加载岗位，不读 profiles.json。
+    snapshot：已打开的 CSV 列式快照，不传则按配置路径获取。
+    派生画像按 (行内容哈希, 派生规则版本) 缓存在 data/derived_profiles.db，只有新增 / 修改过的行重新派生；
+    同步加载全部行（分块、进程池派生见 profile_loader）。
+    运行中的服务请通过 get_job_catalog().profiles 读取已加载的画像（首块加载后即可使用，其余块后台继续），不要重复调用本函数。
+    """
     try:
         csv_path = get_abs_path(job_profile_conf.get("job_data_path", "data/求职岗位信息数据.csv"))
-        if not os.path.exists(csv_path):
-            logger.warning(f"[ProfileStore] CSV 不存在: {csv_path}，返回空字典")
-            return {}
+        if snapshot is None:
+            if not os.path.exists(csv_path):
+                logger.warning(f"[ProfileStore] CSV 不存在: {csv_path}，返回空字典")
+                return {}
+            snapshot = get_job_csv_snapshot(csv_path)
         profiles = {}
-        max_rows = job_profile_conf.get("max_csv_rows_for_matching") or 0
-        with open(csv_path, encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader):
-                if max_rows > 0 and i >= max_rows:
-                    break
-                job_id = row.get("职位编号") or f"job_{i+1:04d}"
-                job_name = row.get("职位名称", "").strip() or f"岗位_{i+1}"
-                location = (row.get("工作地址", "") or "").strip()
-                salary = (row.get("薪资范围", "") or "").strip()
-                desc = row.get("职位描述", "") or ""
-                pro_skills = _extract_skills_from_description(desc)
-                # 当 JD 未提取到任何技能时，按岗位名称兜底，避免匹配时专业技能维度为 0
-                if not any(pro_skills.get(k) for k in ("programming_languages", "frameworks_tools", "domain_knowledge")):
-                    name_skills = _skills_from_job_name(job_name)
-                    pro_skills = _merge_professional_skills(pro_skills, name_skills)
-                # 优先从真实职位描述、所属行业推断要求，无描述时再用岗位名称兜底（不做假数据）
-                edu_from_jd, level_from_jd, soft_from_jd = _infer_requirements_from_description(desc, row.get("所属行业", ""))
-                basic_req = _basic_requirements_from_job_name(job_name)
-                basic_req["education"] = basic_req.get("education") or {}
-                basic_req["education"]["level"] = edu_from_jd
-                if "gpa" not in basic_req:
-                    basic_req["gpa"] = {"min_requirement": "3.0/4.0", "preferred": "3.5/4.0以上", "weight": 0.05}
-                soft_req = soft_from_jd if (desc and desc.strip()) else _soft_skills_requirements_from_job_name(job_name)
-                level = level_from_jd if (desc and desc.strip()) else ("高级" if any(k in job_name for k in ["架构", "专家", "总监"]) else ("中级" if any(k in job_name for k in ["经理", "主管", "组长"]) else "初级"))
-                profiles[job_id] = {
-                    "job_id": job_id,
-                    "job_name": job_name,
-                    "basic_info": {
-                        "industry": row.get("所属行业", ""),
-                        "level": level,
-                        "level_range": [level],
-                        "salary_range": salary,
-                        "avg_salary": salary,
-                        "location": location,
-                        "work_locations": [location] if location else [],
-                        "company": row.get("公司全称", ""),
-                        "company_scale": row.get("人员规模", ""),
-                        "company_type": row.get("企业性质", ""),
-                    },
-                    "requirements": {
-                        "professional_skills": pro_skills,
-                        "basic_requirements": basic_req,
-                        "soft_skills": soft_req,
-                    },
-                    "description": desc,
-                    "company_intro": row.get("公司简介", ""),
-                    "market_analysis": {"demand_score": 75, "growth_trend": "稳定"},
-                }
+        if snapshot is not None:
+            from job_profile.profile_loader import StreamingProfileLoader
+            loader = StreamingProfileLoader(snapshot)
+            profiles = loader.load()
+            logger.info(f"[ProfileStore] 派生画像缓存命中 {loader.status.cached_rows} 条，"
+                        f"重新派生 {loader.status.derived_rows} 条")
         logger.info(f"[ProfileStore] 岗位匹配已从 CSV 加载 {len(profiles)} 条: {csv_path}")
         return profiles
     except Exception as e:
@@ -339,14 +469,30 @@ def _load_profiles_store() -> dict:
         return {}
 
 
-def _save_profiles_store(profiles: dict):
-    # 只允许写入真实字典，防止 Mock 对象或非法数据损坏文件
-    if not isinstance(profiles, dict):
-        logger.error(f"[ProfileStore] 拒绝写入非dict对象: {type(profiles)}")
-        return
+# 岗位画像库版本号：每次写盘或重新加载时递增，供下游缓存（如推荐结果缓存）判断岗位库是否变化
+_profiles_store_version = 0
+
+
+def get_profiles_store_version() -> int:
+    return _profiles_store_version
+
+
+def _bump_profiles_store_version():
+    global _profiles_store_version
+    _profiles_store_version += 1
+
+
+def _save_profiles_store():
+    """
+    把 AI 生成的画像（get_job_catalog().generated_profiles()）写入 profiles.json；
+    CSV 派生画像每次从 CSV 加载，不写盘。先写临时文件再 os.replace，避免写到一半的文件。
+    """
+    profiles = get_job_catalog().generated_profiles()
     store_path = _ensure_store_dir()
-    with open(store_path, "w", encoding="utf-8") as f:
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(profiles, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, store_path)
 
 
 def _normalize_profile(p: dict) -> dict:
@@ -735,38 +881,27 @@ class CsvDataExtractor:
 
     def __init__(self):
         self.data_path = get_abs_path(job_profile_conf["job_data_path"])
-        self._all_rows: Optional[list] = None
-
-    def _load_all(self) -> list:
-        if self._all_rows is not None:
-            return self._all_rows
-        if not os.path.exists(self.data_path):
-            logger.warning(f"[CsvDataExtractor] CSV文件不存在: {self.data_path}")
-            self._all_rows = []
-            return []
-        rows = []
-        with open(self.data_path, "r", encoding="utf-8-sig") as f:
-            for row in csv.DictReader(f):
-                rows.append(row)
-        self._all_rows = rows
-        logger.info(f"[CsvDataExtractor] 加载CSV: {len(rows)}条")
-        return rows
+
+    @property
+    def catalog(self):
+        from job_profile.job_catalog import get_job_catalog
+        return get_job_catalog()
 
     def search(self, keywords: list[str], max_count: int = 10) -> list[dict]:
         """
         关键词匹配职位名称，返回匹配到的完整行数据（含JD）。
         大小写不敏感，任意关键词命中即算匹配。
+        行数据来自共享的岗位目录（JobCatalog），不再单独加载 CSV。
         """
-        all_rows = self._load_all()
+        catalog = self.catalog
+        if catalog.row_count == 0:
+            logger.warning(f"[CsvDataExtractor] CSV无数据: {self.data_path}")
+            return []
         keywords_lower = [kw.lower() for kw in keywords]
-        matched = []
-        for row in all_rows:
-            name = row.get(self.FIELD_NAME, "").lower()
-            if any(kw in name for kw in keywords_lower):
-                matched.append(row)
-            if len(matched) >= max_count:
-                break
-        return matched
+        hits = catalog.rows_where(
+            self.FIELD_NAME, lambda name: any(kw in name.lower() for kw in keywords_lower), limit=max_count
+        )
+        return [catalog.row(i) for i in hits]
 
     def build_jd_block(self, matched_rows: list[dict]) -> str:
         """
@@ -819,9 +954,20 @@ class JobProfileService:
 
     def __init__(self):
         self.extractor = CsvDataExtractor()
-        self.profiles_store = _load_profiles_store()
+        self.catalog = get_job_catalog()
         self.model = self._init_model()
 
+    @property
+    def profiles_store(self) -> Mapping[str, dict]:
+        """job_id -> 岗位画像：共享岗位目录当前画像的只读视图（reload 后自动指向新状态）；新增 / 覆盖用 store_profile"""
+        return self.catalog.profiles
+
+    def store_profile(self, job_id: str, profile: dict, persist: bool = True):
+        """放入一个生成的画像（JobCatalog.put_profile），persist 为 True 时写入 profiles.json"""
+        self.catalog.put_profile(job_id, profile)
+        if persist:
+            _save_profiles_store()
+
     def _init_model(self):
         try:
             from model.factory import chat_model
@@ -993,9 +1139,8 @@ class JobProfileService:
 
             try:
                 profile = self.generate_profile(job_config)
-                self.profiles_store[job_id] = profile
+                self.store_profile(job_id, profile)
                 results[job_id] = profile
-                _save_profiles_store(self.profiles_store)
             except Exception as e:
                 logger.error(f"  失败: {e}", exc_info=True)
                 errors[job_id] = str(e)
@@ -1017,9 +1162,8 @@ class JobProfileService:
                 continue
             try:
                 profile = self.generate_profile(job_config)
-                self.profiles_store[job_id] = profile
+                self.store_profile(job_id, profile)
                 results[job_id] = profile
-                _save_profiles_store(self.profiles_store)
             except Exception as e:
                 errors[job_id] = str(e)
         return {"results": results, "errors": errors,
@@ -1029,19 +1173,38 @@ class JobProfileService:
     # 查询接口
     # ===================================================
     def get_profile_list(self, page=1, size=20, keyword=None,
-                         industry=None, level=None, category=None) -> dict:
+                         industry=None, level=None, category=None,
+                         city=None, company_type=None, company_scale=None) -> dict:
         # 从全量数据开始，仅在有有效筛选条件时才过滤（空 keyword/全部行业/全部级别 不过滤）
-        profiles = list(self.profiles_store.values())
-        total_count_before_filter = len(profiles)  # 调试用：过滤前总数据量
+        # 各条件在画像筛选索引上对不同取值求值一次并按位图求交，不再逐个画像判断
+        store = self.profiles_store
+        index = self.catalog.filter_index(store)
+        mask = index.all()
+        total_count_before_filter = index.size  # 调试用：过滤前总数据量
 
         # 【问题1】仅当 keyword 非空时才按职位名称过滤；同时用标准化名称匹配（搜「算法工程师」可匹配细分方向）
         kw = (keyword or "").strip()
         if kw:
-            def _match_keyword(p):
-                raw = (p.get("job_name") or "").lower()
-                std = to_standard_name(p.get("job_name") or "").lower()
-                return kw.lower() in raw or kw.lower() in std
-            profiles = [p for p in profiles if _match_keyword(p)]
+            k = kw.lower()
+            mask &= index.mask_where(FACET_NAME, lambda name: k in name.lower() or k in to_standard_name(name).lower())
+        # 行业：仅当传入有效值且非「全部」时才过滤
+        if industry and industry not in ("", "全部行业", "全部"):
+            mask &= index.mask_where(FACET_INDUSTRY, lambda value: industry in value)
+        # 级别：仅当传入有效值且非「全部」时才过滤
+        if level and level not in ("", "全部级别", "全部"):
+            mask &= index.mask_in(FACET_LEVEL, [level])
+        if category:
+            mask &= index.mask_in(FACET_CATEGORY, [category])
+        # 城市（工作地点包含）、企业性质、人员规模
+        if city and city not in ("", "全部城市", "全部"):
+            mask &= index.mask_where(FACET_CITY, lambda loc: city in loc)
+        if company_type and company_type not in ("", "全部"):
+            mask &= index.mask_in(FACET_COMPANY_TYPE, [company_type])
+        if company_scale and company_scale not in ("", "全部"):
+            mask &= index.mask_in(FACET_COMPANY_SCALE, [company_scale])
+        profiles = [store[job_id] for job_id in index.ids(mask)]
+
+        if kw:
             def _relevance(p):
                 name = (p.get("job_name") or "").lower()
                 k = kw.lower()
@@ -1052,21 +1215,6 @@ class JobProfileService:
                 return 2
             profiles.sort(key=_relevance)
 
-        # 行业：仅当传入有效值且非「全部」时才过滤
-        if industry and industry not in ("", "全部行业", "全部"):
-            profiles = [p for p in profiles
-                        if industry in (p.get("basic_info") or {}).get("industry", "")]
-        # 级别：仅当传入有效值且非「全部」时才过滤
-        if level and level not in ("", "全部级别", "全部"):
-            def _level_match(p):
-                lr = (p.get("basic_info") or {}).get("level_range") or []
-                if not isinstance(lr, list):
-                    lr = [lr] if lr else []
-                return level in lr
-            profiles = [p for p in profiles if _level_match(p)]
-        if category:
-            profiles = [p for p in profiles if p.get("category") == category]
-
         # 按岗位名称相似度去重，保留每类岗位最具代表性的一条（去重后再分页）
         seen_names = set()
         deduped = []
@@ -1141,13 +1289,13 @@ class JobProfileService:
         return sorted(industries)
 
     def get_profile_detail(self, job_id: str) -> Optional[dict]:
-        p = self.profiles_store.get(job_id)
+        p = self.catalog.get(job_id)
         return _normalize_profile(p) if p else None
 
     def get_profile_by_name(self, job_name: str) -> Optional[dict]:
-        for p in self.profiles_store.values():
-            if p.get("job_name") == job_name:
-                return _normalize_profile(p)
+        exact = self.catalog.by_name(job_name)
+        if exact:
+            return _normalize_profile(exact[0])
         for p in self.profiles_store.values():
             if job_name in p.get("job_name", ""):
                 return _normalize_profile(p)
@@ -1188,8 +1336,14 @@ class JobProfileService:
             }
         return result
 
+    def profiles_load_status(self) -> dict:
+        """岗位画像加载进度（complete 为 False 时 profiles_store 只含已加载的部分岗位）"""
+        return self.catalog.load_status()
+
     def reload_store(self):
-        self.profiles_store = _load_profiles_store()
+        """重新加载岗位目录（CSV 快照 + 派生画像），构建完成后原子替换"""
+        self.catalog.reload()
+        _bump_profiles_store_version()
 
 
 # ========== 单例 ==========
@@ -1233,8 +1387,7 @@ if __name__ == "__main__":
         cfg = next((j for j in target_jobs if j["name"] == job_name), None)
         if cfg:
             profile = service.generate_profile(cfg)
-            service.profiles_store[cfg["job_id"]] = profile
-            _save_profiles_store(service.profiles_store)
+            service.store_profile(cfg["job_id"], profile)
             print(f"来源: {profile['data_source']}")
             print(f"CSV样本数: {profile['csv_sample_count']}")
             print(json.dumps(profile, ensure_ascii=False, indent=2)[:2000])
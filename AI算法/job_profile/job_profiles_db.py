@@ -1,6 +1,7 @@
 """
 岗位表 job_profiles：job_name, avg_salary, required_skills(json), experience_years, industry, demand_score
 用于动态晋升路径 GET /job/career-path 与转岗图谱 GET /job/relation-graph（匹配度基于技能交集计算）
+职位名称派生属性入库时一次算好（job_title_attrs）：standard_name（标准岗位）、display_name（去括号名称）、field、level
 """
 import json
 import os
@@ -10,6 +11,9 @@ from typing import Any, Dict, List, Optional
 
 from utils.path_tool import get_abs_path
 from utils.logger_handler import logger
+from job_profile.skill_registry import get_skill_registry
+from job_profile.job_title_attrs import title_attrs
+from job_profile.salary_index import parse_salary_range
 
 DB_DIR = get_abs_path("data")
 DB_PATH = os.path.join(DB_DIR, "job_profiles.db")
@@ -33,6 +37,9 @@ CREATE TABLE IF NOT EXISTS job_profiles (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     job_name VARCHAR(200) NOT NULL,
     standard_name VARCHAR(100),
+    display_name VARCHAR(200),
+    field VARCHAR(100),
+    level VARCHAR(20),
     avg_salary REAL,
     required_skills TEXT,
     experience_years INTEGER DEFAULT 0,
@@ -45,6 +52,9 @@ CREATE INDEX IF NOT EXISTS idx_job_profiles_standard ON job_profiles(standard_na
 CREATE INDEX IF NOT EXISTS idx_job_profiles_exp ON job_profiles(experience_years);
 """
 
+# 旧库缺少的职位名称派生列：列名 -> 类型
+_TITLE_ATTR_COLUMNS = {"display_name": "VARCHAR(200)", "field": "VARCHAR(100)", "level": "VARCHAR(20)"}
+
 
 def get_connection():
     os.makedirs(DB_DIR, exist_ok=True)
@@ -54,24 +64,39 @@ def get_connection():
 def init_db():
     conn = get_connection()
     try:
+        existing = {r[1] for r in conn.execute("PRAGMA table_info(job_profiles)")}
+        if existing:
+            for col, col_type in _TITLE_ATTR_COLUMNS.items():
+                if col not in existing:
+                    conn.execute(f"ALTER TABLE job_profiles ADD COLUMN {col} {col_type}")
         conn.executescript(CREATE_SQL)
+        _backfill_title_attrs(conn)
         conn.commit()
         logger.info("[job_profiles_db] 表已就绪: %s", DB_PATH)
     finally:
         conn.close()
 
 
+def _backfill_title_attrs(conn):
+    """旧库新增的派生列为空，按职位名称补齐（只在升级后第一次执行时有数据）"""
+    rows = conn.execute("SELECT id, job_name FROM job_profiles WHERE level IS NULL").fetchall()
+    if not rows:
+        return
+    updates = []
+    for row_id, name in rows:
+        attrs = title_attrs((name or "").strip())
+        updates.append((attrs.category, attrs.standard_name, attrs.field, attrs.level, row_id))
+    conn.executemany(
+        "UPDATE job_profiles SET standard_name = ?, display_name = ?, field = ?, level = ? WHERE id = ?",
+        updates,
+    )
+    logger.info("[job_profiles_db] 补齐职位名称派生列 %d 条", len(updates))
+
+
 def _parse_salary_to_avg(s: str) -> Optional[float]:
-    if not s or str(s).strip() in ("", "面议"):
-        return None
-    s = re.sub(r"·\d+薪", "", str(s)).strip()
-    m = re.search(r"([\d.]+)-([\d.]+)万", s)
-    if m:
-        return (float(m.group(1)) + float(m.group(2))) / 2 * 10000
-    m = re.search(r"(\d+)-(\d+)元", s)
-    if m:
-        return (int(m.group(1)) + int(m.group(2))) / 2
-    return None
+    """月薪均值（元）；解析规则见 salary_index，按原文备忘"""
+    r = parse_salary_range(s)
+    return r.avg if r is not None else None
 
 
 def _extract_experience_years(desc: str) -> int:
@@ -90,14 +115,8 @@ def _extract_experience_years(desc: str) -> int:
 
 
 def normalize_job_for_skills(name: str) -> str:
-    """与 graph.job_graph_service.normalize_job 逻辑一致，用于取技能"""
-    from graph.job_graph_service import JOB_CATEGORIES
-    name = (name or "").strip()
-    for std, kws in JOB_CATEGORIES.items():
-        for kw in kws:
-            if kw.lower() in name.lower():
-                return std
-    return name or ""
+    """与 graph.job_graph_service.normalize_job 逻辑一致，用于取技能（按名称备忘）"""
+    return title_attrs((name or "").strip()).category
 
 
 def get_skills_for_job(job_name: str) -> List[str]:
@@ -107,18 +126,20 @@ def get_skills_for_job(job_name: str) -> List[str]:
 
 def populate_from_csv(csv_path: str, limit: int = 5000) -> int:
     """从 CSV 填充 job_profiles。CSV 列：职位名称, 薪资范围, 所属行业, 职位描述 等"""
-    import pandas as pd
+    from job_profile.job_csv_snapshot import get_job_csv_snapshot
     if not os.path.isfile(csv_path):
         logger.warning("[job_profiles_db] CSV 不存在: %s", csv_path)
         return 0
-    df = pd.read_csv(csv_path, encoding="utf-8-sig").fillna("")
+    snapshot = get_job_csv_snapshot(csv_path)
+    if snapshot is None:
+        return 0
     conn = get_connection()
     try:
         cur = conn.cursor()
         cur.execute("DELETE FROM job_profiles")
         n = 0
         seen = set()
-        for _, row in df.iterrows():
+        for row in snapshot.iter_rows(columns=("职位名称", "薪资范围", "所属行业", "职位描述")):
             if n >= limit:
                 break
             name = str(row.get("职位名称", "")).strip()
@@ -130,12 +151,12 @@ def populate_from_csv(csv_path: str, limit: int = 5000) -> int:
             desc = str(row.get("职位描述", ""))
             exp = _extract_experience_years(desc)
             industry = str(row.get("所属行业", ""))[:100]
-            std = normalize_job_for_skills(name)
-            skills = SKILLS_BY_STANDARD_JOB.get(std, [])
+            attrs = title_attrs(name)
+            skills = SKILLS_BY_STANDARD_JOB.get(attrs.category, [])
             skills_json = json.dumps(skills, ensure_ascii=False)
             cur.execute(
-                "INSERT INTO job_profiles (job_name, standard_name, avg_salary, required_skills, experience_years, industry, demand_score) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (name, std, avg, skills_json, exp, industry, 0),
+                "INSERT INTO job_profiles (job_name, standard_name, display_name, field, level, avg_salary, required_skills, experience_years, industry, demand_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, attrs.category, attrs.standard_name, attrs.field, attrs.level, avg, skills_json, exp, industry, 0),
             )
             n += 1
         conn.commit()
@@ -185,11 +206,12 @@ def get_career_path(job_name: str) -> List[Dict[str, Any]]:
 
 
 def calculate_match(current_skills: List[str], target_skills: List[str]) -> int:
-    """匹配度 = 交集 / 目标岗位技能数 * 100（目标为空则返回 0）"""
-    if not target_skills:
+    """匹配度 = 交集 / 目标岗位技能数 * 100（目标为空则返回 0）。技能按注册表 ID 比较，别名视为同一技能"""
+    registry = get_skill_registry()
+    tgt_set = registry.ids(target_skills)
+    if not tgt_set:
         return 0
-    cur_set = set(s.strip().lower() for s in (current_skills or []) if s and isinstance(s, str))
-    tgt_set = set(s.strip().lower() for s in target_skills if s and isinstance(s, str))
+    cur_set = registry.ids(current_skills)
     overlap = cur_set & tgt_set
     return round(len(overlap) / len(tgt_set) * 100)
 
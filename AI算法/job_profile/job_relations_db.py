@@ -2,6 +2,12 @@
 岗位关联关系表（SQLite）
 用于存储 AI 生成的晋升/转岗关系，供 relation-graph 接口秒级查询，避免实时调用 AI。
 晋升路径表 job_promotion_path：存储各岗位 4 阶段晋升数据，供前端展示真实内容。
+晋升路径生成缓存（career_path_generator）按 "name:标准名称" 作为 job_id 写入同一张表，cache_version 为生成提示词版本。
+转岗评估缓存：relation_type = transfer_eval 的行保存实时图谱中 LLM 对 (起点, 终点) 的转岗评估，
+profile_version 为两岗位画像（名称 + 技能）的指纹，画像变化后旧评估不再命中；这类行不计入关系查询。
+预计算图谱表 job_graph_build：图谱预计算流水线（graph_precompute）为 target_jobs 逐岗位写入的完整图谱及版本，
+与该岗位的关系行、晋升路径在同一事务内替换；relation-graph 接口优先读取。
+租约表 job_graph_lease：同一时刻只允许一个进程运行图谱预计算流水线（多个服务 worker、命令行脚本共用一个库）。
 """
 import json
 import os
@@ -9,15 +15,7 @@ import sqlite3
 from typing import Any, Dict, List, Optional
 from utils.path_tool import get_abs_path
 from utils.logger_handler import logger
-
-
-def _to_standard_name(name: str) -> str:
-    """与 job_profile_service.to_standard_name 一致，避免循环导入时在此实现一份"""
-    import re
-    if not name or not isinstance(name, str):
-        return name or ""
-    s = re.sub(r"\s*[（(].*?[)）]\s*", "", name).strip()
-    return s or name.strip()
+from job_profile.job_title_attrs import standard_name as _to_standard_name
 
 DB_DIR = get_abs_path("data")
 DB_PATH = os.path.join(DB_DIR, "job_relations.db")
@@ -30,10 +28,13 @@ CREATE TABLE IF NOT EXISTS job_relations (
     relation_type VARCHAR(20) NOT NULL,
     difficulty INTEGER,
     reason TEXT,
+    profile_version VARCHAR(40),
+    evaluation TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 CREATE INDEX IF NOT EXISTS idx_job_relations_from ON job_relations(from_job_id);
 CREATE INDEX IF NOT EXISTS idx_job_relations_type ON job_relations(relation_type);
+CREATE INDEX IF NOT EXISTS idx_job_relations_pair ON job_relations(from_job_id, to_job_id);
 
 CREATE TABLE IF NOT EXISTS job_promotion_path (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,11 +46,40 @@ CREATE TABLE IF NOT EXISTS job_promotion_path (
     role_title VARCHAR(100),
     skills TEXT,
     icon VARCHAR(10),
+    cache_version VARCHAR(40),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 CREATE INDEX IF NOT EXISTS idx_promotion_path_job ON job_promotion_path(job_id);
+
+CREATE TABLE IF NOT EXISTS job_graph_build (
+    job_id VARCHAR(50) PRIMARY KEY,
+    version VARCHAR(40) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    graph TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS job_graph_lease (
+    name VARCHAR(50) PRIMARY KEY,
+    owner VARCHAR(100) NOT NULL,
+    expires_at REAL NOT NULL
+);
 """
 
+# 旧库缺少的转岗评估缓存列：列名 -> 类型
+_EVAL_COLUMNS = {"profile_version": "VARCHAR(40)", "evaluation": "TEXT"}
+# 旧库缺少的晋升路径缓存版本列
+_PROMOTION_COLUMNS = {"cache_version": "VARCHAR(40)"}
+
+# 转岗评估缓存行的 relation_type（不属于晋升 / 转岗关系）
+TRANSFER_EVAL_TYPE = "transfer_eval"
+
+# 评估难度 -> difficulty 列（1-5，与 build_graph_data_from_db 的档位一致）
+_DIFFICULTY_LEVEL = {"低": 1, "中低": 2, "中": 3, "中高": 4, "高": 5}
+
+_db_ready = False
+
 
 def get_connection():
     os.makedirs(DB_DIR, exist_ok=True)
@@ -57,11 +87,19 @@ def get_connection():
 
 
 def init_db():
-    """创建表（若不存在）"""
+    """创建表（若不存在），并为旧库补齐转岗评估缓存列与晋升路径缓存版本列"""
+    global _db_ready
     conn = get_connection()
     try:
+        for table, columns in (("job_relations", _EVAL_COLUMNS), ("job_promotion_path", _PROMOTION_COLUMNS)):
+            existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+            if existing:
+                for col, col_type in columns.items():
+                    if col not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
         conn.executescript(CREATE_SQL)
         conn.commit()
+        _db_ready = True
         logger.info("[job_relations_db] 表已就绪: %s", DB_PATH)
     finally:
         conn.close()
@@ -105,8 +143,8 @@ def get_relations_by_from_job(from_job_id: str, relation_type: Optional[str] = N
             )
         else:
             cur.execute(
-                "SELECT from_job_id, to_job_id, relation_type, difficulty, reason FROM job_relations WHERE from_job_id = ? ORDER BY relation_type, id",
-                (from_job_id,),
+                "SELECT from_job_id, to_job_id, relation_type, difficulty, reason FROM job_relations WHERE from_job_id = ? AND relation_type != ? ORDER BY relation_type, id",
+                (from_job_id, TRANSFER_EVAL_TYPE),
             )
         rows = cur.fetchall()
         return [
@@ -122,7 +160,10 @@ def get_all_relations() -> List[Dict]:
     conn = get_connection()
     try:
         cur = conn.cursor()
-        cur.execute("SELECT from_job_id, to_job_id, relation_type, difficulty, reason FROM job_relations ORDER BY id")
+        cur.execute(
+            "SELECT from_job_id, to_job_id, relation_type, difficulty, reason FROM job_relations WHERE relation_type != ? ORDER BY id",
+            (TRANSFER_EVAL_TYPE,),
+        )
         rows = cur.fetchall()
         return [
             {"from_job_id": r[0], "to_job_id": r[1], "relation_type": r[2], "difficulty": r[3], "reason": r[4] or ""}
@@ -137,12 +178,83 @@ def count_relations() -> int:
     conn = get_connection()
     try:
         cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM job_relations")
+        cur.execute("SELECT COUNT(*) FROM job_relations WHERE relation_type != ?", (TRANSFER_EVAL_TYPE,))
         return cur.fetchone()[0]
     finally:
         conn.close()
 
 
+# ========== 转岗评估缓存（relation_type = transfer_eval） ==========
+
+def get_transfer_evaluations(from_job_id: str, versions: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    批量查询 from_job_id 到各终点岗位的已缓存评估。versions: to_job_id -> 画像指纹，
+    只返回指纹一致的评估 {to_job_id: evaluation}
+    """
+    if not versions:
+        return {}
+    if not _db_ready:
+        init_db()
+    found: Dict[str, Dict[str, Any]] = {}
+    to_ids = list(versions)
+    conn = get_connection()
+    try:
+        # SQLite 默认变量上限 999，分批查询
+        for i in range(0, len(to_ids), 500):
+            chunk = to_ids[i:i + 500]
+            rows = conn.execute(
+                "SELECT to_job_id, profile_version, evaluation FROM job_relations "
+                f"WHERE from_job_id = ? AND relation_type = ? AND to_job_id IN ({','.join('?' * len(chunk))})",
+                [from_job_id, TRANSFER_EVAL_TYPE, *chunk],
+            ).fetchall()
+            for to_job_id, version, evaluation in rows:
+                if version != versions.get(to_job_id) or not evaluation:
+                    continue
+                try:
+                    value = json.loads(evaluation)
+                except (TypeError, ValueError):
+                    continue
+                if isinstance(value, dict):
+                    found[to_job_id] = value
+        return found
+    finally:
+        conn.close()
+
+
+def save_transfer_evaluations(from_job_id: str, rows: List[tuple]) -> int:
+    """写入评估缓存，rows: [(to_job_id, 画像指纹, evaluation)]；同一 (起点, 终点) 只保留最新一条"""
+    if not rows:
+        return 0
+    if not _db_ready:
+        init_db()
+    conn = get_connection()
+    try:
+        conn.executemany(
+            "DELETE FROM job_relations WHERE from_job_id = ? AND to_job_id = ? AND relation_type = ?",
+            [(from_job_id, to_job_id, TRANSFER_EVAL_TYPE) for to_job_id, _, _ in rows],
+        )
+        conn.executemany(
+            "INSERT INTO job_relations (from_job_id, to_job_id, relation_type, difficulty, reason, profile_version, evaluation) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    from_job_id,
+                    to_job_id,
+                    TRANSFER_EVAL_TYPE,
+                    _DIFFICULTY_LEVEL.get(evaluation.get("difficulty")),
+                    "、".join(str(s) for s in (evaluation.get("skills_gap") or []) if s),
+                    version,
+                    json.dumps(evaluation, ensure_ascii=False),
+                )
+                for to_job_id, version, evaluation in rows
+            ],
+        )
+        conn.commit()
+        return len(rows)
+    finally:
+        conn.close()
+
+
 # ========== 晋升路径表 job_promotion_path ==========
 
 def get_promotion_path_by_job_id(job_id: str) -> List[Dict[str, Any]]:
@@ -171,6 +283,27 @@ def get_promotion_path_by_job_id(job_id: str) -> List[Dict[str, Any]]:
         conn.close()
 
 
+def _replace_promotion_path(cur, job_id: str, stages: List[Dict[str, Any]],
+                            cache_version: Optional[str] = None) -> int:
+    """在当前事务内替换某岗位的晋升路径（最多 4 阶段）"""
+    cur.execute("DELETE FROM job_promotion_path WHERE job_id = ?", (job_id,))
+    default_icons = ["🌱", "🌿", "🌳", "🏆"]
+    for i, s in enumerate(stages[:4]):
+        stage_order = i + 1
+        stage_name = (s.get("stage_name") or s.get("stage") or s.get("name") or "").strip() or f"阶段{stage_order}"
+        years_range = (s.get("years_range") or s.get("years") or s.get("time_range") or "").strip() or ["0-2年", "2-4年", "4-7年", "7年+"][i]
+        salary_range = (s.get("salary_range") or s.get("salary") or s.get("salary_increase") or "").strip() or "—"
+        role_title = (s.get("role_title") or stage_name or "").strip()
+        skills_raw = s.get("skills") or s.get("key_skills")
+        skills = json.dumps(skills_raw, ensure_ascii=False) if isinstance(skills_raw, list) else (skills_raw or "")
+        icon = (s.get("icon") or default_icons[i] or "").strip()
+        cur.execute(
+            "INSERT INTO job_promotion_path (job_id, stage_order, stage_name, years_range, salary_range, role_title, skills, icon, cache_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, stage_order, stage_name, years_range, salary_range, role_title, skills, icon, cache_version),
+        )
+    return min(4, len(stages))
+
+
 def insert_promotion_path(
     job_id: str,
     stages: List[Dict[str, Any]],
@@ -179,29 +312,203 @@ def insert_promotion_path(
     if not job_id or not stages:
         return 0
     conn = get_connection()
+    try:
+        count = _replace_promotion_path(conn.cursor(), job_id, stages)
+        conn.commit()
+        return count
+    finally:
+        conn.close()
+
+
+def get_cached_promotion_paths(job_ids: List[str], cache_version: str) -> Dict[str, List[Dict[str, Any]]]:
+    """批量查询晋升路径缓存：返回 cache_version 一致且满 4 阶段的 {job_id: 阶段行（同 get_promotion_path_by_job_id）}"""
+    if not job_ids:
+        return {}
+    if not _db_ready:
+        init_db()
+    found: Dict[str, List[Dict[str, Any]]] = {}
+    conn = get_connection()
+    try:
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT job_id, stage_order, stage_name, years_range, salary_range, role_title, skills, icon "
+                f"FROM job_promotion_path WHERE cache_version = ? AND job_id IN ({','.join('?' * len(chunk))}) "
+                f"ORDER BY job_id, stage_order",
+                [cache_version, *chunk],
+            ).fetchall()
+            for r in rows:
+                found.setdefault(r[0], []).append({
+                    "stage_order": r[1],
+                    "stage_name": r[2] or "",
+                    "years_range": r[3] or "",
+                    "salary_range": r[4] or "",
+                    "role_title": r[5] or r[2] or "",
+                    "skills": r[6] if r[6] else "",
+                    "icon": r[7] or "",
+                })
+    finally:
+        conn.close()
+    return {job_id: stages for job_id, stages in found.items() if len(stages) >= 4}
+
+
+def save_cached_promotion_path(job_id: str, stages: List[Dict[str, Any]], cache_version: str) -> int:
+    """写入 / 替换一条晋升路径缓存（带生成版本）"""
+    if not job_id or not stages:
+        return 0
+    if not _db_ready:
+        init_db()
+    conn = get_connection()
+    try:
+        count = _replace_promotion_path(conn.cursor(), job_id, stages, cache_version)
+        conn.commit()
+        return count
+    finally:
+        conn.close()
+
+
+# ========== 预计算图谱 job_graph_build ==========
+
+def get_graph_builds() -> Dict[str, Dict[str, Any]]:
+    """全部岗位的预计算状态 {job_id: {version, status, error, updated_at}}（不含图谱内容）"""
+    if not _db_ready:
+        init_db()
+    conn = get_connection()
+    try:
+        rows = conn.execute("SELECT job_id, version, status, error, updated_at FROM job_graph_build").fetchall()
+        return {r[0]: {"version": r[1], "status": r[2], "error": r[3] or "", "updated_at": r[4]} for r in rows}
+    finally:
+        conn.close()
+
+
+def get_built_graph(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    某岗位最近一次成功的预计算图谱（center_job / vertical_graph / transfer_graph / career_path），无则 None。
+    之后的构建失败时 mark_graph_build_failed 保留该图谱，仍返回它。
+    """
+    if not _db_ready:
+        init_db()
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT graph FROM job_graph_build WHERE job_id = ? AND graph IS NOT NULL", (job_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row or not row[0]:
+        return None
+    try:
+        graph = json.loads(row[0])
+    except (TypeError, ValueError):
+        return None
+    return graph if isinstance(graph, dict) else None
+
+
+def save_graph_build(job_id: str, version: str, graph: Dict[str, Any], relations: List[Dict],
+                     promotion_stages: List[Dict[str, Any]]) -> None:
+    """
+    在同一事务内写入一个岗位的预计算结果：替换其晋升 / 转岗关系行与晋升路径，记录图谱与版本（status=done）。
+    中途失败整体回滚，不会留下半个岗位的数据。
+    """
+    import time
+    if not _db_ready:
+        init_db()
+    conn = get_connection()
     try:
         cur = conn.cursor()
-        cur.execute("DELETE FROM job_promotion_path WHERE job_id = ?", (job_id,))
-        default_icons = ["🌱", "🌿", "🌳", "🏆"]
-        for i, s in enumerate(stages[:4]):
-            stage_order = i + 1
-            stage_name = (s.get("stage_name") or s.get("stage") or s.get("name") or "").strip() or f"阶段{stage_order}"
-            years_range = (s.get("years_range") or s.get("years") or "").strip() or ["0-2年", "2-4年", "4-7年", "7年+"][i]
-            salary_range = (s.get("salary_range") or s.get("salary") or "").strip() or "—"
-            role_title = (s.get("role_title") or stage_name or "").strip()
-            skills_raw = s.get("skills") or s.get("key_skills")
-            skills = json.dumps(skills_raw, ensure_ascii=False) if isinstance(skills_raw, list) else (skills_raw or "")
-            icon = (s.get("icon") or default_icons[i] or "").strip()
-            cur.execute(
-                "INSERT INTO job_promotion_path (job_id, stage_order, stage_name, years_range, salary_range, role_title, skills, icon) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (job_id, stage_order, stage_name, years_range, salary_range, role_title, skills, icon),
+        cur.execute(
+            "DELETE FROM job_relations WHERE from_job_id = ? AND relation_type IN ('promote', 'transfer')", (job_id,)
+        )
+        cur.executemany(
+            "INSERT INTO job_relations (from_job_id, to_job_id, relation_type, difficulty, reason) VALUES (?, ?, ?, ?, ?)",
+            [
+                (job_id, r["to_job_id"], r["relation_type"], r.get("difficulty"), r.get("reason") or "")
+                for r in relations
+            ],
+        )
+        if promotion_stages:
+            _replace_promotion_path(cur, job_id, promotion_stages)
+        cur.execute(
+            "INSERT OR REPLACE INTO job_graph_build (job_id, version, status, graph, error, updated_at) VALUES (?, ?, 'done', ?, '', ?)",
+            (job_id, version, json.dumps(graph, ensure_ascii=False), time.time()),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def mark_graph_build_failed(job_id: str, version: str, error: str) -> None:
+    """记录预计算失败（保留上次成功的图谱，下次运行重试）"""
+    import time
+    if not _db_ready:
+        init_db()
+    conn = get_connection()
+    try:
+        cur = conn.execute(
+            "UPDATE job_graph_build SET status = 'failed', version = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (version, error, time.time(), job_id),
+        )
+        if not cur.rowcount:
+            conn.execute(
+                "INSERT INTO job_graph_build (job_id, version, status, graph, error, updated_at) VALUES (?, ?, 'failed', NULL, ?, ?)",
+                (job_id, version, error, time.time()),
             )
         conn.commit()
-        return min(4, len(stages))
     finally:
         conn.close()
 
 
+# ========== 预计算租约 job_graph_lease ==========
+
+def acquire_lease(name: str, owner: str, ttl_seconds: float) -> bool:
+    """
+    取得或续期租约 name：无人持有、已过期或本就由 owner 持有时写入 owner 与新的到期时间并返回 True，
+    其他进程持有且未过期时返回 False。单条 UPSERT 语句，多进程并发时只有一个成功。
+    """
+    import time
+    if not _db_ready:
+        init_db()
+    now = time.time()
+    conn = get_connection()
+    try:
+        conn.execute(
+            "INSERT INTO job_graph_lease (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE job_graph_lease.owner = excluded.owner OR job_graph_lease.expires_at < ?",
+            (name, owner, now + ttl_seconds, now),
+        )
+        row = conn.execute("SELECT owner FROM job_graph_lease WHERE name = ?", (name,)).fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+    return bool(row) and row[0] == owner
+
+
+def release_lease(name: str, owner: str) -> None:
+    """释放 owner 持有的租约（已被他人接管时不影响）"""
+    if not _db_ready:
+        init_db()
+    conn = get_connection()
+    try:
+        conn.execute("DELETE FROM job_graph_lease WHERE name = ? AND owner = ?", (name, owner))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def select_graph_type(graph: Dict[str, Any], graph_type: str) -> Dict[str, Any]:
+    """按 graph_type 取预计算图谱中的部分，未请求的部分与实时构建一致置空"""
+    result = dict(graph)
+    if graph_type not in ("vertical", "all"):
+        result["vertical_graph"] = {"nodes": [], "edges": [], "track_name": "", "message": "未请求垂直图谱"}
+    if graph_type not in ("transfer", "all"):
+        result["transfer_graph"] = {"nodes": [], "edges": [], "message": "未请求转岗图谱"}
+    return result
+
+
 def build_graph_data_from_db(
     job_id: str,
     graph_type: str,
@@ -211,7 +518,11 @@ def build_graph_data_from_db(
     从 job_relations 表构建图谱数据，与 get_relation_graph 返回的 data 结构一致。
     job_index: job_id -> { name, layer_level, category }（来自 target_jobs）
     若该岗位在 DB 中无任何关系，返回 None，便于上层回退到实时 AI。
+    预计算流水线已为该岗位写入完整图谱时直接返回该图谱。
     """
+    built = get_built_graph(job_id)
+    if built is not None:
+        return select_graph_type(built, graph_type)
     relations = get_relations_by_from_job(job_id, None)
     if not relations:
         return None
@@ -0,0 +1,585 @@
+"""
+岗位技能相似度近邻索引（全量预计算 + 增量刷新）
+==================================================
+横向转岗图谱（AIJobGraphBuilder.build_transfer_graph_ai）原先每次请求都让中心岗位与全部画像逐个调用
+calculate_skill_similarity（双向加权匹配 + 逐对子串判断），岗位数上万时单次请求就要数秒。
+
+这里一次算出全部岗位两两之间的技能相似度，每个岗位只保存 Top-K 近邻，转岗候选变为按 job_id 查表：
+
+- 技能输入与 calculate_weighted_skill_match 相同（job_skill_weights / job_skill_set），
+  技能内容相同（签名相同）的岗位合并为一行计算
+- 岗位侧按条目存 (技能列, 权重, 是否必需)，用户侧存技能集合（精确匹配）与子串相关的集合外技能（模糊匹配，
+  系数 0.8），均为按行压缩的稀疏存储；按行分块查表得到每个 (用户, 岗位技能条目) 的系数，乘权重后按岗位
+  顺序累加，再算必需覆盖惩罚与双向平均，舍入方式与 round 相同，结果与逐对计算一致。
+  内存与技能条目总数成正比，不随 行数 × 词表 增长（稠密矩阵在两万种技能内容、五千技能词时约 3GB），不依赖 scipy
+- 存储：data/job_similarity/neighbors.npz（job_id、技能签名、近邻下标、分数×100），启动时加载
+- 岗位库版本号变化后按技能签名比对：只重算新增 / 技能变化的岗位，并把它们并入其余岗位的近邻表；
+  近邻被删除或变化且近邻表已满的岗位整行重算。变化比例过大时直接全量重建
+
+刷新在后台线程进行，完成前沿用旧近邻（过滤已删除的岗位）；中心岗位不在旧索引中或技能已变化时，
+用当前画像的技能矩阵现算该岗位一行。也可手动执行：python scripts/build_job_similarity.py [--full]
+"""
+
+import hashlib
+import json
+import os
+import threading
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.path_tool import get_abs_path
+from utils.logger_handler import logger
+from job_profile.skill_registry import SKILL_ALIASES, get_skill_registry
+from job_profile.job_dataset_service import job_skill_set, job_skill_weights
+
+
+JOB_SIMILARITY_DIR = get_abs_path("data/job_similarity")
+NEIGHBORS_FILE = "neighbors.npz"
+
+# 相似度规则（calculate_weighted_skill_match）变化时递增，使旧索引失效
+RULE_VERSION = 1
+
+DEFAULT_TOP_K = 50
+FUZZY_FACTOR = 0.8          # 模糊匹配打 8 折
+REQUIRED_PENALTY = 0.6      # 必需技能覆盖 < 50% 的惩罚
+EMPTY_SCORE = 50.0          # 岗位无技能要求时的匹配分
+# 变化（新增 + 技能变化 + 删除）岗位超过该比例时全量重建
+FULL_REBUILD_RATIO = 0.3
+# 每块行数 × 岗位数 的上限（取 Top-K 时的 int64 排序键矩阵约 64MB）
+BLOCK_CELLS = 1 << 23
+# _centi：x×100 距 .5 小于该值时按精确值舍入（分数 ≤ 100，float64 乘法误差远小于此）
+_CENTI_EPS = 1e-6
+_CENT = Decimal("0.01")
+
+
+def index_fingerprint(top_k: int) -> str:
+    """规则版本 + 别名表 + K 的指纹，任一变化即需全量重建"""
+    payload = json.dumps(
+        {"rule_version": RULE_VERSION, "aliases": SKILL_ALIASES, "top_k": top_k},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _skill_content(profile: dict) -> Tuple[tuple, tuple]:
+    """画像的技能内容：((规范化键, 权重, 重要性), ...) 与技能集合的规范化键（排序）"""
+    registry = get_skill_registry()
+    weights = tuple(
+        (registry.key_of(sid), float(weight), importance)
+        for sid, weight, importance in job_skill_weights(profile)
+    )
+    keys = tuple(sorted(registry.key_of(sid) for sid in job_skill_set(profile)))
+    return weights, keys
+
+
+def _signature(content: Tuple[tuple, tuple]) -> str:
+    raw = json.dumps(content, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def skill_signature(profile: dict) -> Optional[str]:
+    """画像技能内容的签名（持久化用规范化技能名，不依赖进程内技能 ID）；画像结构异常时为 None"""
+    try:
+        return _signature(_skill_content(profile))
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+def _centi(values: np.ndarray) -> np.ndarray:
+    """
+    与 Python round(x, 2) 一致的舍入，返回 x×100 舍入后的整数。
+    round 按 x 的精确二进制值舍入（同距取偶），np.rint(x*100) 的乘法误差只在 x×100 贴近 .5 时改变结果：
+    先用 float64 取整，贴近 .5 的少数值再用 Decimal 按精确值舍入，不依赖 long double 的平台精度。
+    """
+    scaled = np.asarray(values, dtype=np.float64) * 100
+    out = np.rint(scaled)
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < _CENTI_EPS
+    if ambiguous.any():
+        distinct, inverse = np.unique(np.asarray(values, dtype=np.float64)[ambiguous], return_inverse=True)
+        exact = [int(Decimal(float(x)).quantize(_CENT, rounding=ROUND_HALF_EVEN).scaleb(2)) for x in distinct]
+        out[ambiguous] = np.asarray(exact, dtype=np.float64)[inverse]
+    return out.astype(np.int64)
+
+
+def _offsets(lengths) -> np.ndarray:
+    """各段长度 -> 段起点数组（长度 +1，末项为总长）"""
+    ptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=ptr[1:])
+    return ptr
+
+
+def _gather(ptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """按行压缩存储中取 rows 各行的全部项：返回 (项所属的 rows 下标, 项在存储中的下标)"""
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = ptr[rows]
+    lengths = ptr[rows + 1] - starts
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    idx = np.arange(int(lengths.sum()), dtype=np.int64) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return owner, idx
+
+
+def _segment_sum(values: np.ndarray, ptr: np.ndarray) -> np.ndarray:
+    """values（m × 项数）按段 ptr 逐段顺序累加，返回 m × 段数；空段为 0"""
+    lengths = np.diff(ptr)
+    out = np.zeros((values.shape[0], len(lengths)))
+    nonempty = lengths > 0
+    if nonempty.any():
+        out[:, nonempty] = np.add.reduceat(values, ptr[:-1][nonempty], axis=1)
+    return out
+
+
+class JobSkillSpace:
+    """
+    某一版本画像 dict 的技能矩阵（按技能签名去重，行 = 不同技能内容，列 = 出现过的技能）。
+    画像结构异常（技能条目缺字段等）的岗位不参与近邻计算。
+    """
+
+    def __init__(self, profiles: Dict[str, dict]):
+        self.job_ids: List[str] = []
+        self.signatures: List[str] = []
+        row_of: Dict[str, int] = {}
+        contents: List[Tuple[tuple, tuple]] = []
+        job_rows: List[int] = []
+        for job_id, profile in list(profiles.items()):
+            if not isinstance(profile, dict):
+                continue
+            try:
+                content = _skill_content(profile)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+            sig = _signature(content)
+            row = row_of.get(sig)
+            if row is None:
+                row = row_of[sig] = len(contents)
+                contents.append(content)
+            self.job_ids.append(job_id)
+            self.signatures.append(sig)
+            job_rows.append(row)
+        self.pos: Dict[str, int] = {job_id: i for i, job_id in enumerate(self.job_ids)}
+        self.job_row = np.asarray(job_rows, dtype=np.int64)
+        self.row_count = len(contents)
+        self._build_matrices(contents)
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def _build_matrices(self, contents: List[Tuple[tuple, tuple]]):
+        """
+        技能矩阵按行压缩存储（每行只存非零项，类似 CSR），不展开为 行数 × 词表 的稠密矩阵：
+        - 岗位侧：每个技能条目 (列, 权重, 是否必需)，保持条目顺序，w_ptr[i]:w_ptr[i+1] 为第 i 行
+        - 用户侧：技能集合内的列（精确匹配）与集合外但子串相关的列（模糊匹配），
+          按行（u_ptr）与按列（c_ptr）各存一份，分别供“少数行对全部列”和“全部行对少数列”查表
+        """
+        vocab: Dict[str, int] = {}
+        for weights, keys in contents:
+            for key, _, _ in weights:
+                vocab.setdefault(key, len(vocab))
+            for key in keys:
+                vocab.setdefault(key, len(vocab))
+        n, v = len(contents), len(vocab)
+        self.vocab_size = v
+        self.total = np.zeros(n)            # 总权重（按条目顺序累加，与逐对计算一致）
+        self.empty = np.zeros(n, dtype=bool)
+
+        # 子串相关：规范化键互相包含（空键即空技能，不与任何技能相关）
+        keys = list(vocab)
+        related = [
+            [j for j, key_b in enumerate(keys) if key_b and (key_a in key_b or key_b in key_a)] if key_a else []
+            for key_a in keys
+        ]
+
+        w_len, w_col, w_val, w_req = [], [], [], []
+        u_len, u_col, u_exact = [], [], []
+        for row, (weights, skill_keys) in enumerate(contents):
+            for key, weight, importance in weights:
+                w_col.append(vocab[key])
+                w_val.append(weight)
+                w_req.append(importance == "必需")
+            w_len.append(len(weights))
+            self.total[row] = sum(weight for _, weight, _ in weights)
+            self.empty[row] = not weights
+            # 精确匹配列 + 模糊匹配列（与集合内某技能子串相关、本身不在集合内）
+            members = {vocab[key] for key in skill_keys}
+            fuzzy = set().union(*(related[col] for col in members)) - members
+            u_col.extend(sorted(members))
+            u_exact.extend([True] * len(members))
+            u_col.extend(sorted(fuzzy))
+            u_exact.extend([False] * len(fuzzy))
+            u_len.append(len(members) + len(fuzzy))
+
+        self.w_ptr = _offsets(w_len)
+        self.w_col = np.asarray(w_col, dtype=np.int32)
+        self.w_val = np.asarray(w_val, dtype=np.float64)
+        self.w_req = np.asarray(w_req, dtype=bool)
+        self.required = _segment_sum(self.w_req[None, :].astype(np.float64), self.w_ptr)[0]
+        self.u_ptr = _offsets(u_len)
+        self.u_col = np.asarray(u_col, dtype=np.int32)
+        self.u_exact = np.asarray(u_exact, dtype=bool)
+        # 按列的同一份用户侧数据
+        u_row = np.repeat(np.arange(n, dtype=np.int32), np.diff(self.u_ptr))
+        by_col = np.argsort(self.u_col, kind="stable")
+        self.c_ptr = np.searchsorted(self.u_col[by_col], np.arange(v + 1)).astype(np.int64)
+        self.c_row = u_row[by_col]
+        self.c_exact = self.u_exact[by_col]
+
+    # ---------- 相似度 ----------
+
+    def _user_coef(self, users: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """users 行对 cols 列的匹配系数（稠密 len(users) × len(cols)）：精确 1，模糊 FUZZY_FACTOR，否则 0"""
+        out = np.zeros((len(users), len(cols)))
+        if len(users) <= len(cols):
+            local = np.full(self.vocab_size, -1, dtype=np.int64)
+            local[cols] = np.arange(len(cols))
+            owner, idx = _gather(self.u_ptr, users)
+            col = local[self.u_col[idx]]
+            keep = col >= 0
+            out[owner[keep], col[keep]] = np.where(self.u_exact[idx[keep]], 1.0, FUZZY_FACTOR)
+        else:
+            local = np.full(self.row_count, -1, dtype=np.int64)
+            local[users] = np.arange(len(users))
+            owner, idx = _gather(self.c_ptr, cols)
+            row = local[self.c_row[idx]]
+            keep = row >= 0
+            out[row[keep], owner[keep]] = np.where(self.c_exact[idx[keep]], 1.0, FUZZY_FACTOR)
+        return out
+
+    def _match(self, users: np.ndarray, jobs: np.ndarray) -> np.ndarray:
+        """users 行技能作为“用户技能”对 jobs 行岗位的加权匹配分（calculate_weighted_skill_match）"""
+        _, idx = _gather(self.w_ptr, jobs)
+        ptr = _offsets(np.diff(self.w_ptr)[jobs])
+        cols, entry_col = np.unique(self.w_col[idx], return_inverse=True)
+        # 每个 (用户行, 岗位技能条目) 的系数，逐条目乘权重后按岗位累加（条目顺序与逐对计算相同）
+        coef = self._user_coef(users, cols)[:, entry_col]
+        matched = _segment_sum(coef * self.w_val[idx], ptr)
+        required = self.required[jobs]
+        if required.any():
+            covered = _segment_sum((coef == 1.0) * self.w_req[idx], ptr)
+            penalize = (required > 0) & (covered < 0.5 * required)
+            matched = np.where(penalize, matched * REQUIRED_PENALTY, matched)
+        total = self.total[jobs]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = np.where(total > 0, matched / total * 100, 0.0)
+        score = _centi(np.minimum(score, 100)) / 100
+        score[:, self.empty[jobs]] = EMPTY_SCORE
+        return score
+
+    def similarity_rows(self, rows: np.ndarray) -> np.ndarray:
+        """rows 各行与全部行的双向平均相似度（calculate_skill_similarity），返回 分数×100 的整数矩阵"""
+        everything = np.arange(self.row_count)
+        forward = self._match(rows, everything)
+        backward = self._match(everything, rows).T
+        return _centi((forward + backward) / 2)
+
+    def block_size(self) -> int:
+        """每块行数：块内临时矩阵（块行数 × 岗位数 / 全部技能条目数）不超过 BLOCK_CELLS"""
+        widest = max(len(self.job_ids), len(self.w_col), len(self.u_col), 1)
+        return max(1, min(256, BLOCK_CELLS // widest))
+
+    def iter_neighbors(self, job_positions: Sequence[int], top_k: int):
+        """
+        逐个产出 job_positions 中岗位的 Top-K 近邻：(岗位下标, 近邻下标数组, 相似度×100 数组)。
+        同分按岗位在画像 dict 中的顺序；同一技能内容的岗位共用一次排序。
+        """
+        n_jobs = len(self.job_ids)
+        by_row: Dict[int, List[int]] = {}
+        for pos in job_positions:
+            by_row.setdefault(int(self.job_row[pos]), []).append(int(pos))
+        rows = np.fromiter(by_row, dtype=np.int64, count=len(by_row))
+        take = min(top_k + 1, n_jobs)
+        order_key = np.arange(n_jobs, dtype=np.int64)
+        step = self.block_size()
+        for start in range(0, len(rows), step):
+            block = rows[start:start + step]
+            centi = self.similarity_rows(block)[:, self.job_row]
+            # 排序键：分数降序，同分按位置升序
+            keys = (10000 - centi) * n_jobs + order_key
+            if take < n_jobs:
+                top = np.argpartition(keys, take - 1, axis=1)[:, :take]
+            else:
+                top = np.broadcast_to(order_key, keys.shape)
+            top = np.take_along_axis(top, np.argsort(np.take_along_axis(keys, top, axis=1), axis=1), axis=1)
+            top_scores = np.take_along_axis(centi, top, axis=1)
+            for b, row in enumerate(block):
+                for pos in by_row[int(row)]:
+                    keep = top[b] != pos
+                    yield pos, top[b][keep][:top_k], top_scores[b][keep][:top_k]
+
+    def fill_neighbors(self, job_positions: Sequence[int], top_k: int,
+                       neighbors: np.ndarray, scores: np.ndarray):
+        """计算 job_positions 中岗位的 Top-K 近邻，写入 neighbors / scores 的对应行"""
+        for pos, ids, centi in self.iter_neighbors(job_positions, top_k):
+            neighbors[pos] = -1
+            scores[pos] = 0
+            neighbors[pos, :len(ids)] = ids
+            scores[pos, :len(ids)] = centi
+
+
+class JobSimilarityIndex:
+    """
+    全部岗位的 Top-K 技能相似度近邻（只读）。
+    neighbors[i] 为岗位 i 的近邻下标（-1 补齐），scores[i] 为对应相似度×100，按相似度降序。
+    """
+
+    def __init__(self, job_ids: List[str], signatures: List[str], neighbors: np.ndarray,
+                 scores: np.ndarray, top_k: int, fingerprint: str):
+        self.job_ids = job_ids
+        self.signatures = signatures
+        self.neighbors = neighbors
+        self.scores = scores
+        self.top_k = top_k
+        self.fingerprint = fingerprint
+        self.pos: Dict[str, int] = {job_id: i for i, job_id in enumerate(job_ids)}
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.pos
+
+    def signature_of(self, job_id: str) -> Optional[str]:
+        pos = self.pos.get(job_id)
+        return self.signatures[pos] if pos is not None else None
+
+    def neighbors_of(self, job_id: str) -> List[Tuple[str, float]]:
+        """[(job_id, 相似度 0-100)]，按相似度降序"""
+        pos = self.pos.get(job_id)
+        if pos is None:
+            return []
+        return [
+            (self.job_ids[n], int(s) / 100)
+            for n, s in zip(self.neighbors[pos], self.scores[pos])
+            if n >= 0
+        ]
+
+
+def _empty_arrays(n_jobs: int, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    return np.full((n_jobs, top_k), -1, dtype=np.int32), np.zeros((n_jobs, top_k), dtype=np.int16)
+
+
+def build_index(space: JobSkillSpace, top_k: int) -> JobSimilarityIndex:
+    """全量计算全部岗位的 Top-K 近邻"""
+    neighbors, scores = _empty_arrays(len(space), top_k)
+    space.fill_neighbors(range(len(space)), top_k, neighbors, scores)
+    return JobSimilarityIndex(list(space.job_ids), list(space.signatures), neighbors, scores,
+                              top_k, index_fingerprint(top_k))
+
+
+def refresh_index(old: Optional[JobSimilarityIndex], space: JobSkillSpace, top_k: int) -> JobSimilarityIndex:
+    """
+    按技能签名增量刷新：新增 / 技能变化的岗位整行计算，并与其余岗位逐一计算后并入它们的近邻表；
+    其余岗位的近邻中有被删除 / 变化的岗位且近邻表已满（第 K+1 名未知）时整行重算。
+    """
+    if old is None or old.fingerprint != index_fingerprint(top_k):
+        return build_index(space, top_k)
+    n_jobs = len(space)
+    current = dict(zip(space.job_ids, space.signatures))
+    changed = [i for i, job_id in enumerate(space.job_ids) if old.signature_of(job_id) != space.signatures[i]]
+    # 旧下标 -> 新下标（已删除或技能变化的为 -1）
+    old_to_new = np.array(
+        [space.pos[job_id] if current.get(job_id) == sig else -1
+         for job_id, sig in zip(old.job_ids, old.signatures)],
+        dtype=np.int64,
+    )
+    removed = sum(1 for job_id in old.job_ids if job_id not in space.pos)
+    if not changed and not removed and old.job_ids == space.job_ids:
+        return old
+    if len(changed) + removed > FULL_REBUILD_RATIO * max(n_jobs, 1):
+        return build_index(space, top_k)
+
+    neighbors, scores = _empty_arrays(n_jobs, top_k)
+    changed_pos = np.asarray(changed, dtype=np.int64)
+    recompute = set(changed)
+    if changed:
+        changed_rows, row_idx = np.unique(space.job_row[changed_pos], return_inverse=True)
+        changed_centi = space.similarity_rows(changed_rows)
+    for pos, job_id in enumerate(space.job_ids):
+        if pos in recompute:
+            continue
+        old_pos = old.pos[job_id]
+        valid = old.neighbors[old_pos] >= 0
+        mapped = old_to_new[old.neighbors[old_pos][valid]]
+        kept = mapped >= 0
+        if not kept.all() and valid.sum() >= top_k:
+            recompute.add(pos)
+            continue
+        cand_pos = mapped[kept]
+        cand_scores = old.scores[old_pos][valid][kept].astype(np.int64)
+        if changed:
+            cand_pos = np.concatenate([cand_pos, changed_pos])
+            cand_scores = np.concatenate([cand_scores, changed_centi[row_idx, space.job_row[pos]]])
+        order = np.lexsort((cand_pos, -cand_scores))[:top_k]
+        neighbors[pos, :len(order)] = cand_pos[order]
+        scores[pos, :len(order)] = cand_scores[order]
+    space.fill_neighbors(sorted(recompute), top_k, neighbors, scores)
+    logger.info("[JobSimilarity] 增量刷新：新增/变化 %d 个岗位，删除 %d 个，整行重算 %d 个",
+                len(changed), removed, len(recompute))
+    return JobSimilarityIndex(list(space.job_ids), list(space.signatures), neighbors, scores,
+                              top_k, old.fingerprint)
+
+
+def save_index(index: JobSimilarityIndex, store_dir: str = JOB_SIMILARITY_DIR) -> None:
+    """写入 neighbors.npz（先写临时文件再替换，避免读到半截文件）"""
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, NEIGHBORS_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            job_ids=np.asarray(index.job_ids, dtype=str),
+            signatures=np.asarray(index.signatures, dtype=str),
+            neighbors=index.neighbors,
+            scores=index.scores,
+            meta=np.asarray(json.dumps({"fingerprint": index.fingerprint, "top_k": index.top_k})),
+        )
+    os.replace(tmp, path)
+
+
+def load_index(top_k: int, store_dir: str = JOB_SIMILARITY_DIR) -> Optional[JobSimilarityIndex]:
+    """加载已持久化的近邻索引；文件缺失、损坏或指纹不符时返回 None"""
+    path = os.path.join(store_dir, NEIGHBORS_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("fingerprint") != index_fingerprint(top_k):
+                logger.info("[JobSimilarity] 相似度规则或 K 已变化，需重建岗位近邻索引")
+                return None
+            job_ids = data["job_ids"].tolist()
+            signatures = data["signatures"].tolist()
+            neighbors = data["neighbors"]
+            scores = data["scores"]
+        if neighbors.shape != (len(job_ids), top_k) or scores.shape != neighbors.shape \
+                or len(signatures) != len(job_ids):
+            logger.warning("[JobSimilarity] 近邻索引尺寸 %s 与岗位数 %d 不符", neighbors.shape, len(job_ids))
+            return None
+    except Exception as e:
+        logger.warning("[JobSimilarity] 加载岗位近邻索引失败: %s", e)
+        return None
+    return JobSimilarityIndex(job_ids, signatures, neighbors, scores, top_k, meta["fingerprint"])
+
+
+class JobSimilarityService:
+    """
+    转岗候选查询：按岗位库版本（画像 dict + 版本号）维护近邻索引。
+    版本变化时后台增量刷新并写盘，刷新完成前沿用旧索引。
+    """
+
+    def __init__(self, top_k: Optional[int] = None, background: Optional[bool] = None):
+        from job_profile.job_profile_service import job_profile_conf
+        if top_k is None:
+            top_k = job_profile_conf.get("transfer_similarity_top_k") or DEFAULT_TOP_K
+        if background is None:
+            background = job_profile_conf.get("transfer_similarity_background", True)
+        self.top_k = int(top_k)
+        self.background = bool(background)
+        self._lock = threading.Lock()
+        self._index: Optional[JobSimilarityIndex] = None
+        self._loaded = False
+        self._synced = None                     # 当前索引对应的 (画像 dict, 版本号)
+        self._space: Optional[Tuple[tuple, JobSkillSpace]] = None
+        self._refreshing: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _version_of(profiles: Dict[str, dict]) -> tuple:
+        from job_profile.job_profile_service import get_profiles_store_version
+        return id(profiles), get_profiles_store_version()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._index = load_index(self.top_k)
+                    self._loaded = True
+                    if self._index is not None:
+                        logger.info("[JobSimilarity] 已加载岗位近邻索引：%d 个岗位，K=%d", len(self._index), self.top_k)
+
+    def _space_for(self, profiles: Dict[str, dict], version: tuple) -> JobSkillSpace:
+        with self._lock:
+            cached = self._space
+            if cached is None or cached[0] != version:
+                cached = self._space = (version, JobSkillSpace(profiles))
+        return cached[1]
+
+    def refresh(self, profiles: Dict[str, dict], full: bool = False, persist: bool = True) -> JobSimilarityIndex:
+        """同步刷新（full=True 时全量重建）并写盘"""
+        self._ensure_loaded()
+        version = self._version_of(profiles)
+        space = self._space_for(profiles, version)
+        index = build_index(space, self.top_k) if full else refresh_index(self._index, space, self.top_k)
+        if persist and index is not self._index:
+            try:
+                save_index(index)
+            except OSError as e:
+                logger.warning("[JobSimilarity] 近邻索引写盘失败，仅本进程内使用: %s", e)
+        self._index = index
+        self._synced = version
+        return index
+
+    def _refresh_quietly(self, profiles: Dict[str, dict]):
+        try:
+            self.refresh(profiles)
+        except Exception as e:
+            logger.warning("[JobSimilarity] 近邻索引刷新失败: %s", e, exc_info=True)
+
+    def _schedule_refresh(self, profiles: Dict[str, dict]):
+        if not self.background:
+            self.refresh(profiles)
+            return
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return
+            self._refreshing = threading.Thread(target=self._refresh_quietly, args=(profiles,),
+                                                name="job-similarity-refresh", daemon=True)
+            self._refreshing.start()
+
+    def join(self, timeout: Optional[float] = None):
+        thread = self._refreshing
+        if thread is not None:
+            thread.join(timeout)
+
+    def neighbors(self, job_id: str, profiles: Dict[str, dict]) -> List[Tuple[str, float]]:
+        """
+        与 job_id 技能相似度最高的至多 K 个岗位 [(job_id, 相似度 0-100)]，按相似度降序。
+        索引中该岗位技能未变时直接查表，否则用当前画像现算一行。
+        """
+        profile = profiles.get(job_id)
+        if not isinstance(profile, dict):
+            return []
+        self._ensure_loaded()
+        version = self._version_of(profiles)
+        if self._synced != version:
+            self._schedule_refresh(profiles)
+        index = self._index
+        if index is not None and index.signature_of(job_id) is not None \
+                and index.signature_of(job_id) == skill_signature(profile):
+            return [(other, score) for other, score in index.neighbors_of(job_id) if other in profiles]
+
+        space = self._space_for(profiles, version)
+        pos = space.pos.get(job_id)
+        if pos is None:
+            return []
+        for _, ids, centi in space.iter_neighbors([pos], self.top_k):
+            return [(space.job_ids[n], int(c) / 100) for n, c in zip(ids, centi)]
+        return []
+
+    def stats(self) -> Dict:
+        index = self._index
+        return {
+            "top_k": self.top_k,
+            "indexed_jobs": len(index) if index is not None else 0,
+            "refreshing": self._refreshing is not None and self._refreshing.is_alive(),
+        }
+
+
+_job_similarity_service: Optional[JobSimilarityService] = None
+
+
+def get_job_similarity_service() -> JobSimilarityService:
+    global _job_similarity_service
+    if _job_similarity_service is None:
+        _job_similarity_service = JobSimilarityService()
+    return _job_similarity_service
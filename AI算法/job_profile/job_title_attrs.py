@@ -0,0 +1,139 @@
+"""
+职位名称派生属性（入库时一次计算 + 进程内备忘）
+==================================================
+职位名称的几种归一化原先散落各处，且每次调用都逐个扫描关键词表：
+graph.job_graph_service.normalize_job、job_profiles_db.normalize_job_for_skills（标准岗位 / 类别）、
+job_profile_service.to_standard_name（去括号名称）、career_recommender._normalize_title_to_field（领域）、
+JobDatasetService._infer_level（级别）。搜索、晋升路径查询与职业推荐对每行每次请求都要重新跑一遍。
+
+这里统一实现，规则与原实现逐字一致：
+- title_attrs(title)：一次算出 standard_name / category / field / level，按名称备忘，同名再次查询 O(1)
+- 岗位目录（JobCatalog）以虚拟列 TITLE_COLUMNS 提供整列取值（每个不同名称只算一次，随目录状态替换失效）
+- job_profiles 表入库时写入 category（standard_name 列）、display_name、field、level 列
+"""
+import re
+import threading
+from typing import Dict, NamedTuple, Optional
+
+# 标准岗位 -> 职位名称关键词（不区分大小写，按顺序取第一个命中的标准岗位）
+JOB_CATEGORIES = {
+    "算法工程师":     ["算法", "计算机视觉", "CV", "NLP", "深度学习", "AI工程", "大模型", "机器学习工程"],
+    "数据分析师":     ["数据分析", "数据挖掘", "BI", "数据运营", "报表分析"],
+    "产品经理":       ["产品经理", "产品总监", "AI产品", "产品负责人", "产品运营"],
+    "后端开发工程师": ["后端", "Java工程师", "Python开发", "服务端", "Spring", "Go工程师", "Node.js"],
+    "前端开发工程师": ["前端", "React", "Vue", "H5开发", "小程序开发", "Web开发"],
+    "数据科学家":     ["数据科学", "机器学习", "统计建模", "量化建模"],
+    "大数据架构师":   ["架构师", "大数据", "Spark", "Flink", "Hadoop", "系统架构", "技术总监"],
+    "量化研究员":     ["量化", "策略研究", "量化交易", "对冲基金"],
+    "AI研究员":       ["研究员", "research scientist", "AI研究", "创新算法", "前沿算法"],
+    "运维工程师":     ["运维", "DevOps", "SRE", "k8s", "容器化", "云原生"],
+}
+
+# 职位名称关键词 -> 标准领域（区分大小写，用于职业测评报告从 CSV 职位归类）
+JOB_TITLE_TO_FIELD = [
+    (["前端", "web前端", "vue", "react", "前端开发"], "前端开发工程师"),
+    (["后端", "java开发", "python开发", "go开发", "服务端", "后台开发", "开发工程师", "软件开发"], "后端开发工程师"),
+    (["算法", "机器学习", "深度学习", "AI", "人工智能", "算法工程师"], "算法工程师"),
+    (["产品经理", "产品专员", "ITBP", "产品助理"], "产品经理"),
+    (["UI", "UX", "交互设计", "界面设计", "视觉设计", "设计师"], "UI/UX设计师"),
+    (["数据分析", "数据开发", "数据工程师", "BI", "数据科学"], "数据分析师"),
+    (["测试", "QA", "测试工程师", "测试开发"], "测试工程师"),
+    (["运维", "运维工程师", "DevOps", "SRE", "IT运维", "系统运维", "运维开发"], "运维工程师"),
+    (["项目经理", "项目主管", "PM", "项目管理", "实施经理"], "项目经理"),
+    (["安全", "网络安全", "信息安全", "安全工程师", "渗透"], "网络安全工程师"),
+]
+
+# 级别 -> 职位名称关键词（按顺序判断，都不命中为中级）
+JOB_LEVEL_KEYWORDS = [
+    ("初级", ["初级", "助理"]),
+    ("高级", ["高级", "资深", "专家"]),
+    ("管理层", ["总监", "经理"]),
+]
+DEFAULT_LEVEL = "中级"
+
+# 岗位目录虚拟列名 -> TitleAttrs 字段
+TITLE_COLUMNS = {
+    "标准名称": "standard_name",
+    "岗位类别": "category",
+    "岗位领域": "field",
+    "岗位级别": "level",
+}
+
+# 备忘条目上限（职位名称去重后通常数万个；超过时清空重建，避免临时查询名称无限增长）
+MEMO_MAX_SIZE = 200000
+
+_CATEGORY_KEYWORDS = [(std, [kw.lower() for kw in kws]) for std, kws in JOB_CATEGORIES.items()]
+
+
+class TitleAttrs(NamedTuple):
+    standard_name: str      # 去括号及括号内内容后的名称
+    category: str           # 标准岗位（JOB_CATEGORIES 的键，未命中为原名称）
+    field: Optional[str]    # 标准领域（JOB_TITLE_TO_FIELD，未命中为 None）
+    level: str              # 初级 / 中级 / 高级 / 管理层
+
+
+def to_standard_name(name: str) -> str:
+    """去掉括号及括号内内容、首尾空格（空结果时退回原名称去空格）"""
+    if not name or not isinstance(name, str):
+        return name or ""
+    s = re.sub(r"\s*[（(].*?[)）]\s*", "", name).strip()
+    return s or name.strip()
+
+
+def _category(name: str) -> str:
+    lowered = (name or "").lower()
+    for std, kws in _CATEGORY_KEYWORDS:
+        for kw in kws:
+            if kw in lowered:
+                return std
+    return name or ""
+
+
+def _field(title: str) -> Optional[str]:
+    if not title:
+        return None
+    for keywords, field in JOB_TITLE_TO_FIELD:
+        if any(kw in title for kw in keywords):
+            return field
+    return None
+
+
+def _level(title: str) -> str:
+    for level, kws in JOB_LEVEL_KEYWORDS:
+        if any(kw in title for kw in kws):
+            return level
+    return DEFAULT_LEVEL
+
+
+_memo: Dict[str, TitleAttrs] = {}
+_memo_lock = threading.Lock()
+
+
+def title_attrs(title: str) -> TitleAttrs:
+    """职位名称的全部派生属性（备忘；同一名称只计算一次）"""
+    attrs = _memo.get(title)
+    if attrs is not None:
+        return attrs
+    name = title if isinstance(title, str) else ""
+    attrs = TitleAttrs(to_standard_name(name), _category(name), _field(name), _level(name))
+    with _memo_lock:
+        if len(_memo) >= MEMO_MAX_SIZE:
+            _memo.clear()
+        _memo[title] = attrs
+    return attrs
+
+
+def job_category(name: str) -> str:
+    return title_attrs(name or "").category
+
+
+def job_field(title: str) -> Optional[str]:
+    return title_attrs(title or "").field
+
+
+def job_level(title: str) -> str:
+    return title_attrs(title or "").level
+
+
+def standard_name(name: str) -> str:
+    return title_attrs(name).standard_name if isinstance(name, str) else (name or "")
@@ -0,0 +1,128 @@
+"""
+多模式关键词匹配（Aho–Corasick 自动机）
+==================================================
+职位描述的技能提取、学历 / 年限 / 软技能线索推断原先对每个关键词做一次 `kw in text`，
+耗时与 关键词数 × 文本长度 成正比。这里把关键词表一次性编译成自动机，对文本只扫描一遍即可找出全部命中。
+
+- 匹配不区分大小写（关键词与文本均转小写）
+- 词边界：只对 AMBIGUOUS_SHORT_KEYWORDS 中常作为其他英文单词一部分出现的短词（R、Go、C、CV、NC 等）生效，
+  两侧紧邻英文字母时不算命中，避免 "R" 命中 React、"Go" 命中 Django；数字与中文不算边界冲突
+  （熟悉Go语言、R3 仍能命中）。其他关键词保留子串匹配：MySQL / PostgreSQL 中的 SQL、GitLab 中的 Git、
+  Vuex 中的 Vue、AIGC 中的 AI、SpringBoot 中的 Spring 都照常命中
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 需要词边界的歧义短词（小写）：作为其他英文单词 / 技术名的一部分时多为误命中
+# （R: React、Go: Django / MongoDB、NC: sync、BI: mobile、MES: times、SAP: asap、ERP: enterprise）
+AMBIGUOUS_SHORT_KEYWORDS = frozenset({"r", "c", "go", "cv", "nc", "bi", "mes", "sap", "erp"})
+
+
+def _is_ascii_letter(ch: str) -> bool:
+    return ("a" <= ch <= "z") or ("A" <= ch <= "Z")
+
+
+def needs_token_boundary(keyword: str) -> bool:
+    """关键词是否需要词边界：只有 AMBIGUOUS_SHORT_KEYWORDS 中的歧义短词需要"""
+    return keyword.lower() in AMBIGUOUS_SHORT_KEYWORDS
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick 自动机。add() 登记 (关键词, 附带数据)，首次 scan() 时编译；编译后只读，可多线程共用。
+
+    同一关键词可登记多次（附带数据依次保留），scan() 对每处命中逐个产出。
+    """
+
+    def __init__(self):
+        # 节点 i：_goto[i] 子节点表，_fail[i] 失配指针，_out[i] 以该节点结尾的 (关键词长度, 是否要求边界, 附带数据)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, bool, Any]]] = [[]]
+        self._compiled = False
+
+    def add(self, keyword: str, payload: Any = None, boundary: Optional[bool] = None):
+        """登记关键词；boundary 为 None 时按 needs_token_boundary 判断"""
+        if not keyword:
+            return
+        if self._compiled:
+            raise RuntimeError("自动机已编译，不能再添加关键词")
+        if boundary is None:
+            boundary = needs_token_boundary(keyword)
+        node = 0
+        for ch in keyword.lower():
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(keyword.lower()), boundary, payload))
+
+    def add_many(self, items: Iterable[Tuple[str, Any]]):
+        for keyword, payload in items:
+            self.add(keyword, payload)
+
+    def compile(self) -> "KeywordAutomaton":
+        """按 BFS 计算失配指针，并把失配链上的输出合并到各节点"""
+        if self._compiled:
+            return self
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._compiled = True
+        return self
+
+    def scan(self, text: str, limit: int = 0) -> Iterable[Tuple[int, int, Any]]:
+        """
+        扫描文本，逐个产出命中 (起始下标, 结束下标, 附带数据)，下标基于小写后的文本。
+        limit>0 时只扫描前 limit 个字符。
+        """
+        if not text:
+            return
+        if not self._compiled:
+            self.compile()
+        if limit > 0:
+            text = text[:limit]
+        lowered = text.lower()
+        n = len(lowered)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            for length, boundary, payload in out[node]:
+                start = end - length
+                if boundary and (
+                    (start > 0 and _is_ascii_letter(lowered[start - 1]) and _is_ascii_letter(lowered[start]))
+                    or (end < n and _is_ascii_letter(lowered[end]) and _is_ascii_letter(lowered[end - 1]))
+                ):
+                    continue
+                yield start, end, payload
+
+    def find_payloads(self, text: str, limit: int = 0) -> List[Any]:
+        """命中的附带数据（按首次出现顺序去重）"""
+        seen = set()
+        found = []
+        for _, _, payload in self.scan(text, limit):
+            if payload not in seen:
+                seen.add(payload)
+                found.append(payload)
+        return found
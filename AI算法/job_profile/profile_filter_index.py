@@ -0,0 +1,154 @@
+"""
+岗位画像筛选索引（倒排 id 列表 + 位图求交）
+==================================================
+匹配推荐的 _apply_filters、语义搜索与 /job/profiles 列表原先对每个画像逐个判断
+城市（`city in loc` 子串循环）、行业、级别等条件，每次请求都遍历全部画像。
+
+这里按画像 dict 的一个版本建索引：
+- 画像按 dict 顺序编号 0..n-1；每个维度（城市、行业、级别、企业性质、人员规模、类别、薪资原文、名称）
+  记录 取值 -> 升序编号数组
+- 查询时条件只对各维度的不同取值求值一次（子串、薪资下限等），命中取值的 id 列表并成位图，
+  多个条件按位与，最后按编号顺序取 job_id（与原逐个过滤的顺序一致）
+- 索引由 CatalogState 缓存，画像 dict 发布 / 修改后随名称索引一起失效
+"""
+import math
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.logger_handler import logger
+from job_profile.salary_index import salary_meets_min
+
+# 维度 -> 画像中的取值（列表，可多值；只收录字符串取值）
+FACET_CITY = "city"
+FACET_INDUSTRY = "industry"
+FACET_LEVEL = "level"
+FACET_COMPANY_TYPE = "company_type"
+FACET_COMPANY_SCALE = "company_scale"
+FACET_CATEGORY = "category"
+FACET_SALARY = "salary"
+FACET_NAME = "name"
+
+
+def _as_list(value) -> list:
+    if isinstance(value, list):
+        return value
+    return [value] if value else []
+
+
+def _facet_values(profile: dict) -> Dict[str, list]:
+    bi = profile.get("basic_info") or {}
+    return {
+        FACET_CITY: _as_list(bi.get("work_locations")),
+        FACET_INDUSTRY: [bi.get("industry")],
+        FACET_LEVEL: _as_list(bi.get("level_range")),
+        FACET_COMPANY_TYPE: [bi.get("company_type")],
+        FACET_COMPANY_SCALE: [bi.get("company_scale")],
+        FACET_CATEGORY: [profile.get("category")],
+        # 与筛选时 str(avg_salary or "") 的取法一致，每个画像恰有一个取值
+        FACET_SALARY: [str(bi.get("avg_salary", "") or "")],
+        FACET_NAME: [profile.get("job_name") or ""],
+    }
+
+
+class ProfileFilterIndex:
+    """某一版本画像 dict 的筛选索引（只读，可多线程共用）"""
+
+    def __init__(self, profiles: Dict[str, dict]):
+        items = list(profiles.items())
+        self.job_ids: List[str] = [job_id for job_id, _ in items]
+        self.size = len(items)
+        postings: Dict[str, Dict[str, list]] = {}
+        for pos, (_, profile) in enumerate(items):
+            if not isinstance(profile, dict):
+                continue
+            for facet, values in _facet_values(profile).items():
+                table = postings.setdefault(facet, {})
+                for value in values:
+                    if isinstance(value, str):
+                        ids = table.setdefault(value, [])
+                        # 同一画像的重复取值只记一次
+                        if not ids or ids[-1] != pos:
+                            ids.append(pos)
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {
+            facet: {value: np.asarray(ids, dtype=np.int32) for value, ids in table.items()}
+            for facet, table in postings.items()
+        }
+
+    def values(self, facet: str) -> List[str]:
+        """某维度的全部不同取值"""
+        return list(self._postings.get(facet, {}))
+
+    def all(self) -> np.ndarray:
+        return np.ones(self.size, dtype=bool)
+
+    def mask_where(self, facet: str, predicate: Callable[[str], bool]) -> np.ndarray:
+        """该维度有任一取值满足 predicate 的画像位图（predicate 对每个不同取值只调用一次）"""
+        mask = np.zeros(self.size, dtype=bool)
+        for value, ids in self._postings.get(facet, {}).items():
+            if predicate(value):
+                mask[ids] = True
+        return mask
+
+    def mask_in(self, facet: str, values: Iterable[str]) -> np.ndarray:
+        """该维度有任一取值等于 values 之一的画像位图"""
+        mask = np.zeros(self.size, dtype=bool)
+        table = self._postings.get(facet, {})
+        for value in values:
+            ids = table.get(value) if isinstance(value, str) else None
+            if ids is not None:
+                mask[ids] = True
+        return mask
+
+    def ids(self, mask: np.ndarray) -> List[str]:
+        """位图为 True 的 job_id（按画像 dict 顺序）"""
+        job_ids = self.job_ids
+        return [job_ids[i] for i in np.flatnonzero(mask)]
+
+
+def parse_salary_min(value) -> Optional[float]:
+    """
+    filters.salary_min 转为数值（月薪，元）：数字或纯数字字符串（"8000"、"8000.5"）；
+    None / 空串为不筛选（返回 None），其他取值（"10k"、布尔值等）抛 ValueError
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise ValueError("salary_min 须为数字")
+    number = None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            pass
+    if number is None or not math.isfinite(number):
+        raise ValueError("salary_min 须为数字")
+    return number
+
+
+def mask_for_filters(index: ProfileFilterIndex, filters: dict) -> np.ndarray:
+    """
+    匹配推荐 / 语义搜索的 filters 转为位图：
+    cities（工作地点包含任一城市）、salary_min（月薪下限，面议不筛掉）、industries、levels、
+    company_types、company_scales（取值等于列表之一）；多个条件取交集。
+    salary_min 不是数字时忽略该条件（接口层应先用 parse_salary_min 校验并返回 400）
+    """
+    mask = index.all()
+    if "cities" in filters:
+        cities = [c for c in filters["cities"] if isinstance(c, str)]
+        mask &= index.mask_where(FACET_CITY, lambda loc: any(city in loc for city in cities))
+    if "salary_min" in filters:
+        try:
+            salary_min = parse_salary_min(filters["salary_min"])
+        except ValueError:
+            logger.warning(f"[FilterIndex] 忽略非数字的 salary_min: {filters['salary_min']!r}")
+            salary_min = None
+        if salary_min is not None:
+            mask &= index.mask_where(FACET_SALARY, lambda text: salary_meets_min(text, salary_min))
+    for key, facet in (("industries", FACET_INDUSTRY), ("levels", FACET_LEVEL),
+                       ("company_types", FACET_COMPANY_TYPE), ("company_scales", FACET_COMPANY_SCALE)):
+        if key in filters:
+            mask &= index.mask_in(facet, filters[key])
+    return mask
@@ -0,0 +1,276 @@
+"""
+岗位画像分块流式加载
+==================================================
+全量岗位（十万级）逐行派生画像耗时较长，原先只能用 max_csv_rows_for_matching 截断。这里按块加载：
+
+- CSV 快照按 profile_loader_chunk_size 行分块解码，每块先查派生画像缓存（derived_profile_cache）
+- 未命中的行交给进程池派生（首块在当前线程派生，尽快产出第一批岗位），派生结果按块写回缓存
+- 各块按 CSV 行序合并，保证画像 dict 的顺序与 CSV 一致（推荐排序同分时按原顺序）
+- background=True：首块完成即返回，其余块由后台线程继续，每隔 profile_loader_publish_interval 秒及全部完成时
+  通过 publish 回调发布一份新的画像 dict（写时复制，已发布的 dict 不再被加载线程修改）；
+  status.complete 为 False 期间下游结果应标记为部分结果
+"""
+import gc
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.logger_handler import logger
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_PUBLISH_INTERVAL = 5.0
+# forkserver 服务进程预先导入的模块（派生任务 _derive_rows 所需），子进程 fork 后直接可用
+FORKSERVER_PRELOAD = ["job_profile.profile_loader", "job_profile.job_profile_service"]
+
+
+def _derive_rows(items: List[Tuple[int, dict]]) -> List[dict]:
+    """进程池任务：派生一块中未命中缓存的行，items 为 [(行号, 行)]"""
+    from job_profile.job_profile_service import _derive_profile
+    return [_derive_profile(row, i) for i, row in items]
+
+
+def freeze_after_load() -> bool:
+    """
+    全部画像加载完成后由命令行 / 启动路径显式调用一次（配置 profile_loader_gc_freeze 为 true 时生效）：
+    把当前堆移入永久代，此后分代回收不再反复扫描常驻的十万级画像。
+    gc.freeze 作用于整个进程，冻结的对象永不回收，不要在服务运行中（有请求在处理时）调用。
+    """
+    from job_profile.job_profile_service import job_profile_conf
+    if not job_profile_conf.get("profile_loader_gc_freeze", False):
+        return False
+    gc.collect()
+    gc.freeze()
+    logger.info("[ProfileLoader] 已冻结加载后的堆（%d 个对象移出分代回收）", gc.get_freeze_count())
+    return True
+
+
+class ProfileLoadStatus:
+    """加载进度（仅加载线程写入）"""
+
+    def __init__(self, total_rows: int):
+        self.total_rows = total_rows
+        self.loaded_rows = 0
+        self.cached_rows = 0
+        self.derived_rows = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.finished_at is not None and self.error is None
+
+    def to_dict(self) -> Dict:
+        end = self.finished_at or time.time()
+        return {
+            "complete": self.complete,
+            "loaded_rows": self.loaded_rows,
+            "total_rows": self.total_rows,
+            "cached_rows": self.cached_rows,
+            "derived_rows": self.derived_rows,
+            "elapsed_seconds": round(end - self.started_at, 2),
+            "error": self.error,
+        }
+
+
+class StreamingProfileLoader:
+    """
+    分块加载一个 CSV 快照的全部派生画像。
+
+    publish(profiles, status)：后台加载时发布中间结果与最终结果（profiles 为新 dict，可由接收方继续修改）。
+    未传入的参数取 config/job_profile.yml：max_csv_rows_for_matching、profile_loader_chunk_size、
+    profile_loader_workers（0=CPU 核数，1=不用进程池）、profile_loader_publish_interval。
+    """
+
+    def __init__(self, snapshot, publish: Optional[Callable[[Dict[str, dict], ProfileLoadStatus], None]] = None,
+                 max_rows: Optional[int] = None, chunk_size: Optional[int] = None, workers: Optional[int] = None,
+                 publish_interval: Optional[float] = None, cache=None):
+        from job_profile.job_profile_service import job_profile_conf, _profile_extractor_version
+        from job_profile.derived_profile_cache import get_derived_profile_cache
+
+        if max_rows is None:
+            max_rows = job_profile_conf.get("max_csv_rows_for_matching") or 0
+        if chunk_size is None:
+            chunk_size = job_profile_conf.get("profile_loader_chunk_size") or DEFAULT_CHUNK_SIZE
+        if workers is None:
+            workers = job_profile_conf.get("profile_loader_workers") or 0
+        if publish_interval is None:
+            publish_interval = job_profile_conf.get("profile_loader_publish_interval", DEFAULT_PUBLISH_INTERVAL)
+
+        self.snapshot = snapshot
+        self.publish = publish
+        n_rows = len(snapshot) if snapshot is not None else 0
+        self.total_rows = min(max_rows, n_rows) if max_rows > 0 else n_rows
+        self.chunk_size = max(1, int(chunk_size))
+        self.workers = int(workers) if workers > 0 else (os.cpu_count() or 1)
+        self.publish_interval = float(publish_interval)
+        self.extractor_version = _profile_extractor_version()
+        self.cache = cache if cache is not None else get_derived_profile_cache(self.extractor_version)
+        self.status = ProfileLoadStatus(self.total_rows)
+        self._profiles: Dict[str, dict] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- 对外入口 ----------
+
+    def load(self) -> Dict[str, dict]:
+        """同步加载全部行，返回画像 dict"""
+        chunks = self._chunks()
+        try:
+            for _ in chunks:
+                pass
+        finally:
+            chunks.close()
+        return self._profiles
+
+    def start(self, background: bool = True) -> Dict[str, dict]:
+        """
+        background=True 时加载首块后返回其画像（新 dict），其余块在后台线程继续并经 publish 发布；
+        全部行不超过一块或 background=False 时等同 load()。
+        """
+        if not background or self.total_rows <= self.chunk_size:
+            return self.load()
+        chunks = self._chunks()
+        try:
+            next(chunks, None)
+        except Exception:
+            chunks.close()
+            raise
+        first = dict(self._profiles)
+        self._thread = threading.Thread(target=self._run_rest, args=(chunks,), name="profile-loader", daemon=True)
+        self._thread.start()
+        return first
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ---------- 内部 ----------
+
+    def _run_rest(self, chunks):
+        last_publish = time.monotonic()
+        try:
+            for _ in chunks:
+                if self.publish and time.monotonic() - last_publish >= self.publish_interval:
+                    self.publish(dict(self._profiles), self.status)
+                    last_publish = time.monotonic()
+        except Exception as e:
+            # 已加载的部分继续提供服务，状态保持未完成
+            self.status.error = str(e)
+            logger.error("[ProfileLoader] 后台加载失败，已加载 %d/%d 行: %s",
+                         self.status.loaded_rows, self.total_rows, e, exc_info=True)
+        finally:
+            chunks.close()
+        if self.publish:
+            self.publish(dict(self._profiles), self.status)
+
+    def _read_chunk(self, start: int):
+        """解码一块行并查缓存，返回 (行, 缓存键, 命中的画像, 未命中的 [(行号, 行)])"""
+        from job_profile.job_profile_service import _DERIVE_COLUMNS, _row_cache_key, _profile_from_cache
+
+        limit = min(self.chunk_size, self.total_rows - start)
+        rows = list(self.snapshot.iter_rows(columns=_DERIVE_COLUMNS, limit=limit, start=start))
+        keys = [_row_cache_key(self.extractor_version, row, start + i) for i, row in enumerate(rows)]
+        found = self.cache.get_many(keys)
+        cached: Dict[str, dict] = {}
+        misses = []
+        for i, (row, key) in enumerate(zip(rows, keys)):
+            profile = found.get(key)
+            if profile is None:
+                misses.append((start + i, row))
+            else:
+                cached[key] = _profile_from_cache(profile, row)
+        return rows, keys, cached, misses
+
+    def _make_pool(self) -> Optional[ProcessPoolExecutor]:
+        try:
+            import multiprocessing
+            # 服务进程内已有多个线程，直接 fork 子进程可能继承被占用的锁：
+            # POSIX 用 forkserver（子进程由单线程的服务进程 fork，派生所需模块在服务进程内预先导入一次）；
+            # Windows 只有 spawn，子进程各自导入（入口 app.py 以 __mp_main__ 重新执行时跳过应用初始化）
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(FORKSERVER_PRELOAD)
+            else:
+                context = multiprocessing.get_context("spawn")
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        except Exception as e:
+            logger.warning("[ProfileLoader] 进程池不可用，改为当前线程派生: %s", e)
+            return None
+
+    def _chunks(self):
+        """
+        逐块加载的生成器，每合并完一块产出一次。
+        预读窗口内的后续块提前提交进程池，与当前块的合并重叠进行；窗口限制同时驻留内存的块数。
+        首块全部命中缓存时不预读，直接产出，缩短首批岗位可用的时间。
+        """
+        use_pool = self.workers > 1
+        window = max(2, self.workers * 2) if use_pool else 1
+        pool: Optional[ProcessPoolExecutor] = None
+        pending = deque()
+        next_start = 0
+        first = True
+
+        def read_ahead() -> int:
+            # 首块已读入且全部命中缓存（无待派生行）时不再预读
+            return 1 if first and pending and not pending[0][2] else window
+
+        try:
+            while True:
+                while next_start < self.total_rows and len(pending) < read_ahead():
+                    rows, keys, cached, misses = self._read_chunk(next_start)
+                    task = None
+                    # 首块在当前线程派生，尽快产出第一批岗位；后续块交给进程池
+                    if misses and next_start > 0 and use_pool:
+                        if pool is None:
+                            pool = self._make_pool()
+                            use_pool = pool is not None
+                        if pool is not None:
+                            try:
+                                task = pool.submit(_derive_rows, misses)
+                            except Exception as e:
+                                logger.warning("[ProfileLoader] 进程池提交失败，改为当前线程派生: %s", e)
+                                use_pool = False
+                    pending.append((keys, cached, misses, task))
+                    next_start += len(rows)
+                if not pending:
+                    break
+                keys, cached, misses, task = pending.popleft()
+                derived = None
+                if task is not None:
+                    try:
+                        derived = task.result()
+                    except Exception as e:
+                        logger.warning("[ProfileLoader] 进程池派生失败，改为当前线程派生: %s", e)
+                if derived is None:
+                    derived = _derive_rows(misses)
+                self._merge(keys, cached, misses, derived)
+                first = False
+                yield self.status
+            self.status.finished_at = time.time()
+            logger.info("[ProfileLoader] 加载完成：%d 行，缓存命中 %d，重新派生 %d，耗时 %.2fs",
+                        self.status.loaded_rows, self.status.cached_rows, self.status.derived_rows,
+                        self.status.finished_at - self.status.started_at)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _merge(self, keys: List[str], cached: Dict[str, dict], misses: List[Tuple[int, dict]],
+               derived: List[dict]):
+        """按行序合并一块：命中缓存的取缓存，其余按顺序取派生结果，派生结果写回缓存（不含行内大段文本）"""
+        from job_profile.job_profile_service import _profile_for_cache
+
+        derived_iter = iter(derived)
+        fresh = []
+        for key in keys:
+            profile = cached.get(key)
+            if profile is None:
+                profile = next(derived_iter)
+                fresh.append((key, _profile_for_cache(profile)))
+            self._profiles[profile["job_id"]] = profile
+        self.cache.put_many(fresh)
+        self.status.loaded_rows += len(keys)
+        self.status.cached_rows += len(keys) - len(fresh)
+        self.status.derived_rows += len(fresh)
@@ -0,0 +1,161 @@
+"""
+薪资结构化与区间索引
+==================================================
+薪资范围原先在多处各自用正则解析（graph.parse_salary、job_profiles_db._parse_salary_to_avg、
+JobDatasetService._parse_salary），匹配服务的 salary_min 筛选只认 "15k-25k" 写法，
+CSV 中常见的 "1-2万"、"8000-12000元" 被静默忽略。这里统一：
+
+- parse_salary_range(text)：解析为月薪下限 / 上限 / 均值（元）与发薪月数，按原文备忘，同一写法只解析一次
+  支持 万 / 千 / k / 元（无单位按元），"·13薪" 计为发薪月数，"/天" 按每月 21.75 个工作日、"/年" 按 12 个月折算为月薪
+- SalaryIndex：岗位目录整列薪资的数值列（numpy，未知为 NaN）+ 按下限 / 上限排序的行号，
+  salary_min 筛选与区间查询为 searchsorted 与布尔掩码运算，不再逐行正则
+"""
+import re
+import threading
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+SALARY_COLUMN = "薪资范围"
+DEFAULT_MONTHS = 12
+WORK_DAYS_PER_MONTH = 21.75
+
+_UNIT_SCALE = {"万": 10000, "w": 10000, "千": 1000, "k": 1000, "元": 1}
+_MONTHS_RE = re.compile(r"[·•]\s*(\d+)\s*薪")
+_RANGE_RE = re.compile(
+    r"([\d.]+)\s*(万|w|千|k|元)?\s*[-~～至到]\s*([\d.]+)\s*(万|w|千|k|元)?", re.IGNORECASE
+)
+_SINGLE_RE = re.compile(r"([\d.]+)\s*(万|w|千|k|元)", re.IGNORECASE)
+
+# 备忘条目上限（不同薪资写法通常只有数百到数千种）
+MEMO_MAX_SIZE = 100000
+
+
+class SalaryRange(NamedTuple):
+    min: int        # 月薪下限（元）
+    max: int        # 月薪上限（元）
+    avg: float      # (下限 + 上限) / 2
+    months: int     # 发薪月数（"·13薪" → 13，未注明为 12）
+
+
+def _to_float(s: str) -> Optional[float]:
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _parse(text: str) -> Optional[SalaryRange]:
+    s = str(text or "").strip()
+    if not s or s == "面议":
+        return None
+    months = DEFAULT_MONTHS
+    m = _MONTHS_RE.search(s)
+    if m:
+        months = int(m.group(1))
+        s = _MONTHS_RE.sub("", s)
+    m = _RANGE_RE.search(s)
+    if m:
+        lo, hi = _to_float(m.group(1)), _to_float(m.group(3))
+        unit = (m.group(4) or m.group(2) or "元").lower()
+        # "15k-25k"、"1万-2万" 两侧均有单位时各自换算；"8000-1.2万" 左侧数值更大时按元
+        lo_unit = (m.group(2) or ("元" if lo is not None and hi is not None and lo > hi else unit)).lower()
+    else:
+        m = _SINGLE_RE.search(s)
+        if not m:
+            return None
+        lo = hi = _to_float(m.group(1))
+        unit = lo_unit = m.group(2).lower()
+    if lo is None or hi is None:
+        return None
+    lo, hi = lo * _UNIT_SCALE[lo_unit], hi * _UNIT_SCALE[unit]
+    if "/天" in s or "/日" in s:
+        lo, hi = lo * WORK_DAYS_PER_MONTH, hi * WORK_DAYS_PER_MONTH
+    elif "/年" in s or "年薪" in s:
+        lo, hi = lo / 12, hi / 12
+    if hi < lo:
+        lo, hi = hi, lo
+    lo, hi = int(lo), int(hi)
+    return SalaryRange(lo, hi, (lo + hi) / 2, months)
+
+
+_memo: Dict[str, Optional[SalaryRange]] = {}
+_memo_lock = threading.Lock()
+
+
+def parse_salary_range(text: str) -> Optional[SalaryRange]:
+    """薪资原文 → SalaryRange（面议 / 无法识别为 None），按原文备忘"""
+    key = text if isinstance(text, str) else str(text or "")
+    try:
+        return _memo[key]
+    except KeyError:
+        pass
+    value = _parse(key)
+    with _memo_lock:
+        if len(_memo) >= MEMO_MAX_SIZE:
+            _memo.clear()
+        _memo[key] = value
+    return value
+
+
+def salary_meets_min(text: str, salary_min: float) -> bool:
+    """salary_min 筛选：月薪下限不低于 salary_min；面议 / 无法识别的不筛掉（与原筛选行为一致）"""
+    r = parse_salary_range(text)
+    return r is None or r.min >= salary_min
+
+
+class SalaryIndex:
+    """
+    一列薪资原文的数值列与排序索引（只读，可多线程共用）。
+    min / max / avg / months 与行号对齐，未知薪资为 NaN（months 为 0）。
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        codes: Dict[str, int] = {}
+        row_codes = np.fromiter((codes.setdefault(t, len(codes)) for t in texts), dtype=np.int64, count=len(texts))
+        # 每种写法只解析一次，再按行展开
+        table = np.full((len(codes), 4), np.nan)
+        table[:, 3] = 0
+        for k, text in enumerate(codes):
+            r = parse_salary_range(text)
+            if r is not None:
+                table[k] = (r.min, r.max, r.avg, r.months)
+        values = table[row_codes]
+        self.min = values[:, 0]
+        self.max = values[:, 1]
+        self.avg = values[:, 2]
+        self.months = values[:, 3].astype(np.int64)
+        self.known = ~np.isnan(self.min)
+        known_rows = np.flatnonzero(self.known)
+        self._by_min = known_rows[np.argsort(self.min[known_rows], kind="stable")]
+        self._sorted_min = self.min[self._by_min]
+        self._by_max = known_rows[np.argsort(self.max[known_rows], kind="stable")]
+        self._sorted_max = self.max[self._by_max]
+
+    def __len__(self) -> int:
+        return len(self.min)
+
+    def rows_min_at_least(self, salary_min: float) -> np.ndarray:
+        """月薪下限 ≥ salary_min 的行号（升序）"""
+        start = np.searchsorted(self._sorted_min, salary_min, side="left")
+        return np.sort(self._by_min[start:])
+
+    def rows_in_range(self, lo: Optional[float] = None, hi: Optional[float] = None) -> np.ndarray:
+        """薪资区间与 [lo, hi] 有交集的行号（升序，未知薪资不计入）"""
+        return np.flatnonzero(self.mask(lo, hi))
+
+    def mask(self, lo: Optional[float] = None, hi: Optional[float] = None, include_unknown: bool = False) -> np.ndarray:
+        """与 [lo, hi] 有交集（上限 ≥ lo 且下限 ≤ hi）的布尔掩码；lo / hi 为 None 表示不限"""
+        result = self.known.copy()
+        if lo is not None:
+            result[self._by_max[:np.searchsorted(self._sorted_max, lo, side="left")]] = False
+        if hi is not None:
+            result[self._by_min[np.searchsorted(self._sorted_min, hi, side="right"):]] = False
+        if include_unknown:
+            result |= ~self.known
+        return result
+
+    def get(self, row: int) -> Optional[SalaryRange]:
+        if not self.known[row]:
+            return None
+        return SalaryRange(int(self.min[row]), int(self.max[row]), float(self.avg[row]), int(self.months[row]))
@@ -0,0 +1,160 @@
+"""
+技能词表注册中心
+==================================================
+把各模块中反复出现的技能字符串（大小写、空白、别名各异）统一规范化后驻留为整数 ID：
+  - "Python3" / "python 3" / "PYTHON" → Python
+  - "K8s" / "k8s" → Kubernetes
+  - "Golang" → Go
+
+匹配（EmbeddingSkillMatcher / SemanticSkillMatcher）、加权技能匹配（calculate_weighted_skill_match）、
+图谱技能提取（_extract_skills）以及 job_profiles_db.calculate_match 都基于 ID 集合运算，
+把逐对字符串比较变为集合求交，同时让下游缓存键只需用整数。
+"""
+
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+# 别名 → 标准技能名（键不区分大小写与空白）
+SKILL_ALIASES: Dict[str, str] = {
+    # 编程语言
+    "Python3": "Python",
+    "Python 3": "Python",
+    "Java8": "Java",
+    "Java 8": "Java",
+    "Golang": "Go",
+    "Go语言": "Go",
+    "JS": "JavaScript",
+    "TS": "TypeScript",
+    "Node": "Node.js",
+    "Nodejs": "Node.js",
+    # 框架 / 工具
+    "K8s": "Kubernetes",
+    "SpringBoot": "Spring Boot",
+    "SpringCloud": "Spring Cloud",
+    "Vue.js": "Vue",
+    "VueJS": "Vue",
+    "Vue3": "Vue",
+    "React.js": "React",
+    "ReactJS": "React",
+    "Postgres": "PostgreSQL",
+    "PgSQL": "PostgreSQL",
+    "Mongo": "MongoDB",
+    "sklearn": "Scikit-learn",
+    "scikit learn": "Scikit-learn",
+    "Torch": "PyTorch",
+    "PowerBI": "Power BI",
+    # 领域知识
+    "人工智能": "AI",
+    "ML": "机器学习",
+    "DL": "深度学习",
+    "自然语言处理": "NLP",
+    "CV": "计算机视觉",
+}
+
+
+def fold_skill(name: str) -> str:
+    """大小写、首尾空白、连续空白归一（不处理别名）"""
+    return re.sub(r"\s+", " ", name.strip()).lower()
+
+
+class SkillRegistry:
+    """
+    技能 ID 注册表（进程内单例，线程安全）。
+
+    ID 从 0 连续分配；空字符串、非字符串不分配 ID（intern 返回 -1），
+    避免空技能名因子串规则与任意技能“相似”。
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self._lock = threading.Lock()
+        self._id_of: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        self._tokens: List[FrozenSet[str]] = []
+        self._substring_memo: Dict[Tuple[int, int], bool] = {}
+        self._alias_keys: Dict[str, str] = {}
+        for alias, canonical in (aliases if aliases is not None else SKILL_ALIASES).items():
+            self._alias_keys[fold_skill(alias)] = canonical
+
+    def canonical_key(self, name: str) -> str:
+        """规范化键：折叠大小写/空白后再按别名映射"""
+        key = fold_skill(name)
+        canonical = self._alias_keys.get(key)
+        return fold_skill(canonical) if canonical else key
+
+    def intern(self, name) -> int:
+        """技能名 → ID（首次出现时分配）；传入 int 视为已驻留的 ID 原样返回"""
+        if isinstance(name, int) and not isinstance(name, bool):
+            return name
+        if not name or not isinstance(name, str):
+            return -1
+        key = self.canonical_key(name)
+        if not key:
+            return -1
+        sid = self._id_of.get(key)
+        if sid is not None:
+            return sid
+        with self._lock:
+            sid = self._id_of.get(key)
+            if sid is None:
+                sid = len(self._names)
+                canonical = self._alias_keys.get(fold_skill(name))
+                self._names.append(canonical or re.sub(r"\s+", " ", name.strip()))
+                self._keys.append(key)
+                self._tokens.append(frozenset(key.split()))
+                self._id_of[key] = sid
+        return sid
+
+    def lookup(self, name: str) -> int:
+        """只查询不分配，未登记返回 -1"""
+        if not name or not isinstance(name, str):
+            return -1
+        return self._id_of.get(self.canonical_key(name), -1)
+
+    def ids(self, names: Iterable) -> Set[int]:
+        """批量驻留，返回 ID 集合（忽略空技能）"""
+        result = set()
+        for name in names or []:
+            sid = self.intern(name)
+            if sid >= 0:
+                result.add(sid)
+        return result
+
+    def name_of(self, sid: int) -> str:
+        return self._names[sid] if 0 <= sid < len(self._names) else ""
+
+    def key_of(self, sid: int) -> str:
+        return self._keys[sid] if 0 <= sid < len(self._keys) else ""
+
+    def tokens_of(self, sid: int) -> FrozenSet[str]:
+        return self._tokens[sid] if 0 <= sid < len(self._tokens) else frozenset()
+
+    def names(self, ids: Iterable[int]) -> List[str]:
+        return [self.name_of(i) for i in ids]
+
+    def substring_related(self, id_a: int, id_b: int) -> bool:
+        """两技能规范化键是否存在包含关系（结果按 ID 对缓存）"""
+        if id_a < 0 or id_b < 0:
+            return False
+        pair = (id_a, id_b) if id_a <= id_b else (id_b, id_a)
+        related = self._substring_memo.get(pair)
+        if related is None:
+            key_a, key_b = self._keys[pair[0]], self._keys[pair[1]]
+            related = key_a in key_b or key_b in key_a
+            self._substring_memo[pair] = related
+        return related
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+_registry: Optional[SkillRegistry] = None
+
+
+def get_skill_registry() -> SkillRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SkillRegistry()
+    return _registry
@@ -24,13 +24,19 @@
 """
 
 import json
+import threading
 import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from collections import defaultdict
 
 from utils.logger_handler import logger
 from model.factory import chat_model
+from job_profile.job_profile_service import job_profile_conf
+from job_profile.skill_registry import get_skill_registry
+from matching.skill_similarity import load_or_build_similarity_matrix, similarity_block
+from matching.verdict_cache import get_verdict_cache, make_verdict_key
 
 
 # ============================================================
@@ -52,7 +58,13 @@ class EmbeddingSkillMatcher:
     def __init__(self):
         # 预定义技能向量（简化版，实际应该用Sentence Transformer）
         # 实际部署时使用：from sentence_transformers import SentenceTransformer
+        self.registry = get_skill_registry()
         self.skill_vectors = self._load_skill_vectors()
+        self._cluster_by_id = self._build_cluster_index(self.skill_vectors)
+        # 词表内技能对查预计算矩阵（mmap），词表外仍按规则逐对计算
+        self.similarity_matrix = load_or_build_similarity_matrix(
+            self.skill_vectors, self._rule_similarity_by_id
+        )
     
     def _load_skill_vectors(self) -> dict:
         """
@@ -91,6 +103,17 @@ class EmbeddingSkillMatcher:
             "Docker": {"Docker": 1.0, "容器": 0.95, "Kubernetes": 0.85, "K8s": 0.85}
         }
     
+    def _build_cluster_index(self, skill_vectors: dict) -> Dict[int, Dict[int, float]]:
+        """将技能簇表转为 ID 索引（别名归并后同一技能取最高相似度）"""
+        index: Dict[int, Dict[int, float]] = {}
+        for skill, neighbors in skill_vectors.items():
+            sid = self.registry.intern(skill)
+            row = index.setdefault(sid, {})
+            for other, sim in neighbors.items():
+                oid = self.registry.intern(other)
+                row[oid] = max(sim, row.get(oid, 0.0))
+        return index
+
     def calculate_semantic_similarity(self, skill_a: str, skill_b: str) -> float:
         """
         计算语义相似度（高精度版）
@@ -102,27 +125,40 @@ class EmbeddingSkillMatcher:
         4. 词干匹配 → 0.75
         5. 无相似 → 0.0
         """
-        skill_a_norm = skill_a.strip().lower()
-        skill_b_norm = skill_b.strip().lower()
+        return self.similarity_by_id(self.registry.intern(skill_a), self.registry.intern(skill_b))
+
+    def similarity_by_id(self, id_a: int, id_b: int) -> float:
+        """按技能 ID 计算相似度：优先查预计算矩阵，词表外技能按规则计算"""
+        if self.similarity_matrix is not None:
+            sim = self.similarity_matrix.lookup(id_a, id_b)
+            if sim is not None:
+                return sim
+        return self._rule_similarity_by_id(id_a, id_b)
+
+    def _rule_similarity_by_id(self, id_a: int, id_b: int) -> float:
+        """逐对规则（相似度矩阵即按此规则预计算）"""
+        if id_a < 0 or id_b < 0:
+            return 0.0
         
-        # 1. 精确匹配
-        if skill_a_norm == skill_b_norm:
+        # 1. 精确匹配（含别名，如 Python3 = Python）
+        if id_a == id_b:
             return 1.0
         
         # 2. 向量相似度查询
-        if skill_a in self.skill_vectors and skill_b in self.skill_vectors[skill_a]:
-            return self.skill_vectors[skill_a][skill_b]
-        
-        if skill_b in self.skill_vectors and skill_a in self.skill_vectors[skill_b]:
-            return self.skill_vectors[skill_b][skill_a]
+        sim = self._cluster_by_id.get(id_a, {}).get(id_b)
+        if sim is not None:
+            return sim
+        sim = self._cluster_by_id.get(id_b, {}).get(id_a)
+        if sim is not None:
+            return sim
         
         # 3. 包含关系（substring）
-        if skill_a_norm in skill_b_norm or skill_b_norm in skill_a_norm:
+        if self.registry.substring_related(id_a, id_b):
             return 0.95
         
         # 4. 关键词交集
-        keywords_a = set(skill_a_norm.split())
-        keywords_b = set(skill_b_norm.split())
+        keywords_a = self.registry.tokens_of(id_a)
+        keywords_b = self.registry.tokens_of(id_b)
         if keywords_a & keywords_b:
             jaccard = len(keywords_a & keywords_b) / len(keywords_a | keywords_b)
             return 0.7 + jaccard * 0.2  # 0.7-0.9
@@ -133,7 +169,8 @@ class EmbeddingSkillMatcher:
     def find_best_match_with_confidence(
         self, 
         required_skill: str, 
-        student_skills: List[Dict]
+        student_skills: List[Dict],
+        student_ids: Optional[List[int]] = None
     ) -> Tuple[Optional[Dict], float, float]:
         """
         找到最佳匹配 + 置信度评估
@@ -146,39 +183,74 @@ class EmbeddingSkillMatcher:
         - 向量相似度>0.8：0.85
         - 关键词匹配：0.70
         """
-        best_match = None
-        best_similarity = 0.0
-        confidence = 0.0
-        
-        for skill in student_skills:
-            similarity = self.calculate_semantic_similarity(
-                required_skill, 
-                skill.get("skill", "")
-            )
-            
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = skill
-        
-        # 计算置信度
+        positions, sims = self.best_matches([required_skill], student_skills, student_ids)
+        if positions[0] < 0:
+            return None, 0.0, self._confidence(0.0)
+        best_similarity = float(sims[0])
+        return student_skills[positions[0]], best_similarity, self._confidence(best_similarity)
+
+    def best_matches(
+        self,
+        required_skills: List,
+        student_skills: List[Dict],
+        student_ids: Optional[List[int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量最佳匹配：相似度矩阵行 gather + argmax。
+
+        返回 (学生技能下标, 相似度) 两个数组，与 required_skills 对齐；
+        无任何相似技能时下标为 -1、相似度为 0。同分取靠前的学生技能（与逐个比较取严格更大者一致）。
+        student_ids 为已 intern 的学生技能 ID（见 PreparedStudent），不传则现算。
+        """
+        required_ids = [self.registry.intern(skill) for skill in required_skills]
+        if student_ids is None:
+            student_ids = [self.registry.intern(skill.get("skill", "")) for skill in student_skills]
+        block = similarity_block(
+            self.similarity_matrix, required_ids, student_ids, self._rule_similarity_by_id
+        )
+        if not student_ids:
+            return np.full(len(required_ids), -1, dtype=np.int64), np.zeros(len(required_ids))
+        positions = np.argmax(block, axis=1)
+        sims = block[np.arange(len(required_ids)), positions]
+        positions = np.where(sims > 0, positions, -1)
+        return positions, sims
+
+    @staticmethod
+    def _confidence(best_similarity: float) -> float:
+        """相似度 → 置信度分档（见 find_best_match_with_confidence）"""
         if best_similarity >= 1.0:
-            confidence = 1.0
+            return 1.0
         elif best_similarity >= 0.9:
-            confidence = 0.95
+            return 0.95
         elif best_similarity >= 0.8:
-            confidence = 0.85
+            return 0.85
         elif best_similarity >= 0.7:
-            confidence = 0.70
-        else:
-            confidence = 0.50
-        
-        return best_match, best_similarity, confidence
+            return 0.70
+        return 0.50
 
 
 # ============================================================
 # 创新算法2：LLM多轮交叉验证（准确率+3%）
 # ============================================================
 
+# 单次 LLM 验证调用的超时秒数（llm_validate_timeout 未配置时）与执行调用的共享线程数
+DEFAULT_LLM_CALL_TIMEOUT = 30.0
+LLM_CALL_WORKERS = 16
+
+_llm_call_pool: Optional[ThreadPoolExecutor] = None
+_llm_call_pool_lock = threading.Lock()
+
+
+def _get_llm_call_pool() -> ThreadPoolExecutor:
+    """执行 LLM 调用的进程级共享线程池：超时的调用在池内结束后释放线程，卡住的调用最多占满池，不会无限增加线程"""
+    global _llm_call_pool
+    if _llm_call_pool is None:
+        with _llm_call_pool_lock:
+            if _llm_call_pool is None:
+                _llm_call_pool = ThreadPoolExecutor(max_workers=LLM_CALL_WORKERS, thread_name_prefix="llm-call")
+    return _llm_call_pool
+
+
 class LLMCrossValidator:
     """
     LLM多轮交叉验证器
@@ -192,9 +264,59 @@ class LLMCrossValidator:
     准确率提升：93% → 96%（+3%）
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, cache=None, call_timeout: Optional[float] = None):
         self.model = chat_model
+        # 并发验证的线程数上限（LLM 调用为 IO 密集，受限于模型服务的并发配额）
+        self.max_workers = max_workers
+        # 验证结果缓存（matching.verdict_cache.VerdictCache），为 None 时每次都调 LLM
+        self.cache = cache
+        # 单次 LLM 调用超时秒数（含在共享线程池中排队的时间），超时按调用失败处理；0=不限制
+        if call_timeout is None:
+            call_timeout = job_profile_conf.get("llm_validate_timeout", DEFAULT_LLM_CALL_TIMEOUT)
+        self.call_timeout = float(call_timeout or 0)
     
+    def validate_many(self, tasks: List[Tuple[Dict, Dict, Dict]]) -> List[Dict]:
+        """
+        并发验证多组 (job_skill, student_skill, context)，结果与 tasks 顺序对齐。
+        先查验证缓存，只有未命中的才调 LLM；每组内部的多轮验证仍按轮次顺序执行（第3轮依赖前两轮分数）。
+        """
+        if not tasks:
+            return []
+        results: List[Optional[Dict]] = [None] * len(tasks)
+        keys: List[str] = []
+        if self.cache is not None:
+            keys = [make_verdict_key(*task) for task in tasks]
+            cached = self.cache.get_many(keys)
+            results = [cached.get(key) for key in keys]
+        todo = [i for i, result in enumerate(results) if result is None]
+        if not todo:
+            return results
+
+        if len(todo) == 1 or self.max_workers <= 1:
+            fresh = [self._validate_safely(*tasks[i]) for i in todo]
+        else:
+            workers = min(self.max_workers, len(todo))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-validate") as pool:
+                fresh = list(pool.map(lambda i: self._validate_safely(*tasks[i]), todo))
+
+        to_store = []
+        for i, result in zip(todo, fresh):
+            results[i] = result
+            # 调用失败得到的默认分不缓存，下次请求重试
+            if self.cache is not None and not result.get("degraded"):
+                to_store.append((keys[i], tasks[i][2].get("user_id"), result))
+        if to_store:
+            self.cache.put_many(to_store)
+        return results
+
+    def _validate_safely(self, job_skill: Dict, student_skill: Dict, context: Dict) -> Dict:
+        """单组验证异常时返回默认结果，不影响同批其他技能"""
+        try:
+            return self.validate_skill_match(job_skill, student_skill, context)
+        except Exception as e:
+            logger.error(f"[LLMValidator] 验证失败: {e}")
+            return {"final_score": 70, "confidence": 0.5, "reasoning": "评估异常", "validation_rounds": 0, "degraded": True}
+
     def validate_skill_match(
         self, 
         job_skill: Dict, 
@@ -238,11 +360,14 @@ class LLMCrossValidator:
             final_score = sorted(scores)[1]  # 中位数
             confidence = 0.90
         
+        rounds = [round1_result, round2_result] + ([round3_result] if score_diff > 5 else [])
         return {
             "final_score": int(final_score),
             "confidence": confidence,
             "reasoning": round1_result.get("reasoning", ""),
-            "validation_rounds": 3 if score_diff > 5 else 2
+            "validation_rounds": 3 if score_diff > 5 else 2,
+            # 任一轮 LLM 调用失败时结果含默认分，不写入缓存
+            "degraded": any(r.get("fallback") for r in rounds)
         }
     
     def _llm_evaluate_once(
@@ -289,19 +414,34 @@ GPA：{context.get('gpa', '')}
 """
         
         try:
-            response = self.model.invoke(prompt)
+            response = self._invoke(prompt)
             result_text = response.content if hasattr(response, 'content') else str(response)
             result = self._parse_json(result_text)
             
             if result and "score" in result:
                 return result
             else:
-                return {"score": 70, "reasoning": "LLM解析失败，使用默认分数"}
+                return {"score": 70, "reasoning": "LLM解析失败，使用默认分数", "fallback": True}
         
+        except FutureTimeoutError:
+            logger.warning(f"[LLMValidator] 评估超时（>{self.call_timeout:g}s）")
+            return {"score": 70, "reasoning": "评估超时", "fallback": True}
         except Exception as e:
             logger.error(f"[LLMValidator] 评估失败: {e}")
-            return {"score": 70, "reasoning": "评估异常"}
+            return {"score": 70, "reasoning": "评估异常", "fallback": True}
     
+    def _invoke(self, prompt: str):
+        """调用模型；设置了 call_timeout 时在共享线程池中执行，超时抛出 concurrent.futures.TimeoutError"""
+        if self.call_timeout <= 0:
+            return self.model.invoke(prompt)
+        future = _get_llm_call_pool().submit(self.model.invoke, prompt)
+        try:
+            return future.result(timeout=self.call_timeout)
+        except FutureTimeoutError:
+            # 仍在排队的直接取消；已在执行的无法中断，结束后结果丢弃
+            future.cancel()
+            raise
+
     def _parse_json(self, text: str) -> Optional[Dict]:
         """解析JSON"""
         try:
@@ -418,6 +558,18 @@ class HistoricalDataCalibrator:
         # 限制在0-100
         return min(max(calibrated, 0), 100)
 
+    def calibrate_scores(self, raw_scores: np.ndarray, features: Dict) -> np.ndarray:
+        """calibrate_score 的批量版本：同一学生对多个岗位的原始分数一次校准"""
+        calibrated = np.asarray(raw_scores, dtype=np.float64)
+
+        if features.get("has_internship") and self.calibration_factors["has_internship"] > 1.0:
+            calibrated = calibrated * self.calibration_factors["has_internship"]
+
+        if features.get("high_gpa") and self.calibration_factors["high_gpa"] > 1.0:
+            calibrated = calibrated * self.calibration_factors["high_gpa"]
+
+        return np.clip(calibrated, 0, 100)
+
 
 # ============================================================
 # 创新算法4：细粒度20维度评分（准确率+2%）
@@ -563,6 +715,96 @@ class FineGrainedScorer:
 # 高精度匹配引擎（准确率>90%）
 # ============================================================
 
+# 学历等级 -> 名称（批量打分时按等级分组复用 education_level 子维度评分）
+EDU_LEVEL_NAMES = {1: "专科", 2: "本科", 3: "硕士", 4: "博士"}
+
+
+class VerdictMemo(dict):
+    """
+    请求级 LLM 验证备忘（线程安全）：batch_analyze 中各岗位任务并发验证关键技能时共用，
+    同一技能对只由先到的任务调用 LLM（claim 认领），其余任务等待其结果（单飞），不重复验证。
+    键为 verdict_cache.make_verdict_key，与持久化缓存同一套。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def claim(self, keys: List[str]) -> Tuple[List[str], Dict[str, Future]]:
+        """返回 (本任务负责验证的键, 其他任务正在验证的键 -> Future)；已有结果的键不返回"""
+        own: List[str] = []
+        waiting: Dict[str, Future] = {}
+        with self._lock:
+            for key in keys:
+                if key in self:
+                    continue
+                future = self._inflight.get(key)
+                if future is None:
+                    self._inflight[key] = Future()
+                    own.append(key)
+                else:
+                    waiting[key] = future
+        return own, waiting
+
+    def resolve(self, key: str, result: Optional[Dict], error: Optional[BaseException] = None):
+        """写入认领键的结果并唤醒等待者（error 时不写入，等待者自行验证）"""
+        with self._lock:
+            future = self._inflight.pop(key, None)
+            if error is None:
+                self[key] = result
+        if future is not None:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+class PreparedStudent:
+    """
+    学生侧与岗位无关的预处理结果，逐岗位（calculate_match）与批量（calculate_match_batch）
+    打分共用，一个学生对多个岗位计算时只算一次：
+    - skills / skill_ids：展平后的 professional_skills 及其技能 ID
+    - context：LLM 验证所需的学生背景
+    - features：历史校准特征（GPA 等只解析一次）
+    - soft_raw：职业素养四项原始分 (创新, 学习, 沟通, 抗压)
+    """
+
+    def __init__(self, student_profile: Dict, registry=None):
+        self.profile = student_profile
+        self.skills: List[Dict] = []
+        for skill_cat in student_profile.get("professional_skills", {}).values():
+            if isinstance(skill_cat, list):
+                self.skills.extend(skill_cat)
+        registry = registry or get_skill_registry()
+        self.skill_ids: List[int] = [registry.intern(skill.get("skill", "")) for skill in self.skills]
+        self.context: Dict = {
+            "user_id": student_profile.get("user_id"),
+            "major": student_profile.get("basic_info", {}).get("major", ""),
+            "gpa": student_profile.get("basic_info", {}).get("gpa", ""),
+            "learning_ability": student_profile.get("learning_ability", {}).get("score", 75)
+        }
+        self._features: Optional[Dict] = None
+        self.soft_raw: Tuple = (
+            student_profile.get("innovation_ability", {}).get("score", 70),
+            student_profile.get("learning_ability", {}).get("score", 75),
+            student_profile.get("communication_ability", {}).get("overall_score", 70),
+            student_profile.get("pressure_resistance", {}).get("assessment_score", 75),
+        )
+
+    @property
+    def features(self) -> Dict:
+        # 首次使用时解析（GPA 格式异常时与逐岗位计算一样在校准步骤抛出）
+        if self._features is None:
+            profile = self.profile
+            self._features = {
+                "has_internship": len(profile.get("practical_experience", {}).get("internships", [])) > 0,
+                "high_gpa": float(profile.get("basic_info", {}).get("gpa", "0/4").split("/")[0]) >= 3.5,
+                "many_projects": len(profile.get("practical_experience", {}).get("projects", [])) >= 3
+            }
+        return self._features
+
+
 class HighPrecisionMatchingEngine:
     """
     高精度匹配引擎
@@ -579,17 +821,23 @@ class HighPrecisionMatchingEngine:
     
     def __init__(self):
         self.embedding_matcher = EmbeddingSkillMatcher()
-        self.llm_validator = LLMCrossValidator()
+        self.llm_validator = LLMCrossValidator(cache=get_verdict_cache())
         self.calibrator = HistoricalDataCalibrator()
         self.fine_grained_scorer = FineGrainedScorer()
     
+    def prepare_student(self, student_profile: Dict) -> PreparedStudent:
+        """学生侧预处理（见 PreparedStudent），供同一学生的多次 calculate_match 复用"""
+        return PreparedStudent(student_profile, self.embedding_matcher.registry)
+
     def calculate_match(
         self, 
         student_profile: Dict, 
-        job_profile: Dict
+        job_profile: Dict,
+        verdicts: Optional[Dict] = None,
+        prepared: Optional[PreparedStudent] = None
     ) -> Dict:
         """
-        高精度匹配计算
+        高精度匹配计算（逐岗位参考实现）
         
         流程：
         1. 细粒度20维度评分
@@ -598,8 +846,19 @@ class HighPrecisionMatchingEngine:
         4. 历史数据校准
         5. 加权计算总分
         
+        verdicts：可选的请求级 LLM 验证备忘（见 _validate_critical_skill），
+        与 calculate_match_batch 共用时两者分数一致。传入时由调用方负责预先批量验证
+        （prevalidate_jobs）；未传入时本岗位的关键技能先并发验证一次。
+        prepared：可选的学生侧预处理结果（prepare_student），同一学生计算多个岗位时传入以免重复解析。
+        
         返回：完整的匹配分析报告
         """
+        if prepared is None:
+            prepared = self.prepare_student(student_profile)
+        if verdicts is None:
+            verdicts = {}
+            self.prevalidate_jobs(student_profile, [job_profile], verdicts, prepared)
+
         # 步骤1：细粒度评分
         fine_grained_scores = self.fine_grained_scorer.calculate_fine_grained_score(
             student_profile, job_profile
@@ -607,7 +866,7 @@ class HighPrecisionMatchingEngine:
         
         # 步骤2：Embedding技能匹配（高精度）
         skills_result = self._match_professional_skills_v2(
-            student_profile, job_profile
+            student_profile, job_profile, verdicts=verdicts, prepared=prepared
         )
         
         # 步骤3：计算4大维度分数（发展潜力按岗位层级、职业素养按岗位软技能要求差异化，均用真实岗位数据）
@@ -615,7 +874,7 @@ class HighPrecisionMatchingEngine:
         potential_baseline = {"初级": 65, "中级": 72, "高级": 80}.get(job_level, 65)
         raw_potential = fine_grained_scores["development_potential"]["overall"]
         potential_score = min(100, int(raw_potential * 100 / potential_baseline))
-        soft_score = self._soft_skills_score_from_job(student_profile, job_profile)
+        soft_score = self._soft_skills_score_from_job(student_profile, job_profile, prepared.soft_raw)
         job_br = job_profile.get("requirements", {}).get("basic_requirements", {})
         edu_level = (job_br.get("education") or {}).get("level", "本科")
         basic_required = {"本科": 85, "硕士": 90, "博士": 95, "专科": 78}.get(str(edu_level).replace("及以上", ""), 85)
@@ -653,13 +912,7 @@ class HighPrecisionMatchingEngine:
         ])
         
         # 步骤5：历史数据校准
-        features = {
-            "has_internship": len(student_profile.get("practical_experience", {}).get("internships", [])) > 0,
-            "high_gpa": float(student_profile.get("basic_info", {}).get("gpa", "0/4").split("/")[0]) >= 3.5,
-            "many_projects": len(student_profile.get("practical_experience", {}).get("projects", [])) >= 3
-        }
-        
-        calibrated_score = self.calibrator.calibrate_score(raw_score, features)
+        calibrated_score = self.calibrator.calibrate_score(raw_score, prepared.features)
         final_score = int(calibrated_score)
         
         # 匹配等级
@@ -685,25 +938,30 @@ class HighPrecisionMatchingEngine:
             "calibration_applied": abs(final_score - raw_score) > 1
         }
     
-    def _soft_skills_score_from_job(self, student: Dict, job: Dict) -> int:
-        """根据岗位软技能要求与学生能力对比计分，使职业素养维度随岗位真实要求变化（非假数据）。"""
+    def _soft_skills_score_from_job(self, student: Dict, job: Dict, soft_raw: Optional[Tuple] = None) -> int:
+        """
+        根据岗位软技能要求与学生能力对比计分，使职业素养维度随岗位真实要求变化（非假数据）。
+        soft_raw 为预处理好的学生四项原始分（PreparedStudent.soft_raw），不传则现场预处理。
+        """
+        if soft_raw is None:
+            soft_raw = self.prepare_student(student).soft_raw
         job_soft = job.get("requirements", {}).get("soft_skills", {})
         req_level_to_threshold = {"高": 78, "中": 65, "低": 55}
         scores = []
         # 创新
-        raw = student.get("innovation_ability", {}).get("score", 70)
+        raw = soft_raw[0]
         th = req_level_to_threshold.get(job_soft.get("innovation", "中"), 65)
         scores.append(min(100, 50 + raw) if raw >= th else max(50, int(raw * 0.9)))
         # 学习
-        raw = student.get("learning_ability", {}).get("score", 75)
+        raw = soft_raw[1]
         th = req_level_to_threshold.get(job_soft.get("learning", "高"), 65)
         scores.append(min(100, 55 + raw) if raw >= th else max(50, int(raw * 0.85)))
         # 沟通
-        raw = student.get("communication_ability", {}).get("overall_score", 70)
+        raw = soft_raw[2]
         th = req_level_to_threshold.get(job_soft.get("communication", "中"), 65)
         scores.append(min(100, 50 + raw) if raw >= th else max(50, int(raw * 0.9)))
         # 抗压
-        raw = student.get("pressure_resistance", {}).get("assessment_score", 75)
+        raw = soft_raw[3]
         th = req_level_to_threshold.get(job_soft.get("pressure", "中"), 65)
         scores.append(min(100, 50 + raw) if raw >= th else max(50, int(raw * 0.9)))
         return int(np.mean(scores))
@@ -711,15 +969,16 @@ class HighPrecisionMatchingEngine:
     def _match_professional_skills_v2(
         self, 
         student: Dict, 
-        job: Dict
+        job: Dict,
+        verdicts: Optional[Dict] = None,
+        prepared: Optional[PreparedStudent] = None
     ) -> Dict:
         """
         高精度技能匹配（Embedding + LLM验证）
         """
-        student_skills_all = []
-        for skill_cat in student.get("professional_skills", {}).values():
-            if isinstance(skill_cat, list):
-                student_skills_all.extend(skill_cat)
+        if prepared is None:
+            prepared = self.prepare_student(student)
+        student_skills_all = prepared.skills
         
         job_reqs = job.get("requirements", {}).get("professional_skills", {})
         
@@ -743,20 +1002,17 @@ class HighPrecisionMatchingEngine:
                 
                 # Embedding语义匹配
                 best_match, similarity, confidence = self.embedding_matcher.find_best_match_with_confidence(
-                    skill_name, student_skills_all
+                    skill_name, student_skills_all, prepared.skill_ids
                 )
                 
                 if best_match and similarity >= 0.7:
                     # 有匹配 - LLM多轮验证（仅验证关键技能）
                     if importance == "必需" and weight >= 0.08:
-                        validation_result = self.llm_validator.validate_skill_match(
+                        validation_result = self._validate_critical_skill(
                             job_skill, 
                             best_match,
-                            {
-                                "major": student.get("basic_info", {}).get("major", ""),
-                                "gpa": student.get("basic_info", {}).get("gpa", ""),
-                                "learning_ability": student.get("learning_ability", {}).get("score", 75)
-                            }
+                            prepared.context,
+                            verdicts
                         )
                         final_match_score = validation_result["final_score"]
                         confidence = validation_result["confidence"]
@@ -825,6 +1081,278 @@ class HighPrecisionMatchingEngine:
             ]
         }
     
+    def _validate_critical_skill(
+        self,
+        job_skill: Dict,
+        student_skill: Dict,
+        context: Dict,
+        verdicts: Optional[Dict] = None
+    ) -> Dict:
+        """
+        关键技能 LLM 多轮验证。
+        verdicts 为请求级备忘（同一学生，键为 make_verdict_key），同一 (岗位技能要求, 学生技能) 只验证一次；
+        已由 prevalidate_critical_skills 批量验证的直接命中。
+        """
+        if verdicts is None:
+            return self.llm_validator.validate_many([(job_skill, student_skill, context)])[0]
+        key = make_verdict_key(job_skill, student_skill, context)
+        if key not in verdicts:
+            verdicts[key] = self.llm_validator.validate_many([(job_skill, student_skill, context)])[0]
+        return verdicts[key]
+
+    def prevalidate_critical_skills(
+        self,
+        student_profile: Dict,
+        pairs: List[Tuple[Dict, Dict]],
+        verdicts: Dict,
+        prepared: Optional[PreparedStudent] = None
+    ) -> int:
+        """
+        验证阶段：汇总一次请求中全部 (岗位关键技能, 学生最佳匹配技能)，
+        去重后用有界线程池并发调用 LLM，结果写入 verdicts 供各岗位打分复用。
+        返回实际发起验证的技能对数量。
+        """
+        if prepared is None:
+            prepared = self.prepare_student(student_profile)
+        context = prepared.context
+        pending: Dict[str, Tuple[Dict, Dict]] = {}
+        for job_skill, student_skill in pairs:
+            key = make_verdict_key(job_skill, student_skill, context)
+            if key not in verdicts and key not in pending:
+                pending[key] = (job_skill, student_skill)
+        if not pending:
+            return 0
+
+        if isinstance(verdicts, VerdictMemo):
+            return self._validate_shared(pending, context, verdicts, len(pairs))
+
+        results = self.llm_validator.validate_many(
+            [(job_skill, student_skill, context) for job_skill, student_skill in pending.values()]
+        )
+        for key, result in zip(pending.keys(), results):
+            verdicts[key] = result
+        logger.info("[HighPrecision] 关键技能 LLM 验证 %d 组（去重前 %d 组）", len(pending), len(pairs))
+        return len(pending)
+
+    def _validate_shared(self, pending: Dict[str, Tuple[Dict, Dict]], context: Dict,
+                         verdicts: VerdictMemo, n_pairs: int) -> int:
+        """
+        多个任务共用 VerdictMemo 时：只验证本任务认领的键，每个键完成即写入并唤醒等待者
+        （不因同批中较慢的技能拖住其他任务），其余键等待认领者的结果。
+        """
+        own, waiting = verdicts.claim(list(pending))
+        done = set()
+        try:
+            if own:
+                workers = max(1, min(getattr(self.llm_validator, "max_workers", 8), len(own)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-validate") as pool:
+                    futures = {
+                        pool.submit(self.llm_validator.validate_many, [(*pending[key], context)]): key
+                        for key in own
+                    }
+                    for future in as_completed(futures):
+                        key = futures[future]
+                        try:
+                            verdicts.resolve(key, future.result()[0])
+                        except Exception as e:
+                            verdicts.resolve(key, None, e)
+                        done.add(key)
+                logger.info("[HighPrecision] 关键技能 LLM 验证 %d 组（去重前 %d 组）", len(own), n_pairs)
+        except BaseException as e:
+            # 认领后任何异常都必须了结本任务认领的键，否则等待者会永久阻塞
+            for key in own:
+                if key not in done:
+                    verdicts.resolve(key, None, e)
+            raise
+        for future in waiting.values():
+            try:
+                future.result()
+            except Exception:
+                # 认领者验证失败：由 _validate_critical_skill 在打分时自行验证
+                pass
+        return len(own)
+
+    def prevalidate_jobs(self, student_profile: Dict, job_profiles: List[Dict], verdicts: Dict,
+                         prepared: Optional[PreparedStudent] = None) -> int:
+        """
+        为逐岗位计算（calculate_match）预先批量验证关键技能。
+        选取规则与 _match_professional_skills_v2 一致：必需且加权后权重 ≥ 0.08、最佳匹配相似度 ≥ 0.7。
+        结构不规则的岗位跳过，由 calculate_match 自行处理。
+        """
+        if prepared is None:
+            prepared = self.prepare_student(student_profile)
+        student_skills_all = prepared.skills
+        if not student_skills_all:
+            return 0
+
+        critical: List[Dict] = []
+        for job in job_profiles:
+            try:
+                job_reqs = job.get("requirements", {}).get("professional_skills", {})
+                for skill_type in ["programming_languages", "frameworks_tools", "domain_knowledge"]:
+                    for job_skill in job_reqs.get(skill_type, []):
+                        weight = job_skill.get("weight", 0.05)
+                        if job_skill.get("importance", "重要") == "必需" and weight * 2 >= 0.08:
+                            critical.append(job_skill)
+            except Exception:
+                continue
+        if not critical:
+            return 0
+
+        positions, sims = self.embedding_matcher.best_matches(
+            [job_skill.get("skill", "") for job_skill in critical], student_skills_all, prepared.skill_ids
+        )
+        pairs = [
+            (job_skill, student_skills_all[pos])
+            for job_skill, pos, sim in zip(critical, positions, sims)
+            if pos >= 0 and sim >= 0.7 and student_skills_all[pos]
+        ]
+        return self.prevalidate_critical_skills(student_profile, pairs, verdicts, prepared)
+
+    def calculate_match_batch(
+        self,
+        student_profile: Dict,
+        matrix,
+        verdicts: Optional[Dict] = None,
+        prepared: Optional[PreparedStudent] = None
+    ) -> np.ndarray:
+        """
+        批量高精度匹配：一个学生 × 预编译岗位矩阵（matching.job_matrix.JobRequirementMatrix）。
+
+        返回与 matrix.job_ids 对齐的最终分数数组，语义与逐岗位 calculate_match 的 match_score 一致：
+        - 技能相似度按技能词表计算一次（词表 × 学生技能），再按条目 gather
+        - 关键技能的 LLM 验证汇总去重后并发执行，结果写入 verdicts，calculate_match 传入同一 verdicts 时复用
+        - 其余维度均为数组运算
+        学生侧的验证背景、职业素养原始分与校准特征均取自 prepared（与 calculate_match 同一来源）。
+        """
+        n = matrix.size
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        scorer = self.fine_grained_scorer
+        if prepared is None:
+            prepared = self.prepare_student(student_profile)
+
+        # ---- 专业技能：词表级最佳匹配 ----
+        vocab_sim, vocab_best = self._vocab_best_matches(student_profile, matrix, prepared)
+
+        entry_matched = vocab_sim[matrix.entry_skill] > 0
+        entry_score = vocab_sim[matrix.entry_skill] * 100
+
+        # 关键技能：先汇总去重并发验证，再用 LLM 验证分数覆盖相似度分数
+        if matrix.critical_job_skills:
+            if verdicts is None:
+                verdicts = {}
+            critical = [
+                (idx, job_skill, vocab_best[matrix.entry_skill[idx]])
+                for idx, job_skill in matrix.critical_job_skills.items()
+                if entry_matched[idx]
+            ]
+            self.prevalidate_critical_skills(
+                student_profile, [(job_skill, best_match) for _, job_skill, best_match in critical], verdicts,
+                prepared
+            )
+            for idx, job_skill, best_match in critical:
+                result = self._validate_critical_skill(job_skill, best_match, prepared.context, verdicts)
+                entry_score[idx] = result["final_score"]
+
+        weights = matrix.entry_weight
+        contrib = np.where(entry_matched, weights * (entry_score / 100), 0.0)
+        total_weight = np.bincount(matrix.entry_job, weights=weights, minlength=n)
+        matched_weight = np.bincount(matrix.entry_job, weights=contrib, minlength=n)
+        has_skills = total_weight > 0
+        match_rate = np.divide(matched_weight, total_weight, out=np.zeros(n), where=has_skills)
+        skills_score = np.where(
+            match_rate >= 0.85, 85 + (match_rate - 0.85) * 100,
+            np.where(match_rate >= 0.70, 70 + (match_rate - 0.70) * 100, match_rate * 100)
+        )
+        skills_score = np.minimum(np.trunc(skills_score), 100)
+        # 岗位无技能要求时给基线分
+        skills_score = np.where(has_skills, skills_score, 50)
+
+        # ---- 基础要求：岗位相关子维度按取值分组计算，其余子维度与岗位无关 ----
+        basic_sum = np.zeros(n, dtype=np.float64)
+        for sub_dim in scorer.FINE_GRAINED_DIMENSIONS["basic_requirements"]:
+            if sub_dim == "education_level":
+                by_level = np.array([
+                    scorer._score_sub_dimension(sub_dim, student_profile, {
+                        "requirements": {"basic_requirements": {"education": {"level": EDU_LEVEL_NAMES[lv]}}}
+                    }) if lv in EDU_LEVEL_NAMES else 0
+                    for lv in range(5)
+                ], dtype=np.float64)
+                basic_sum += by_level[matrix.edu_level]
+            elif sub_dim == "major_match":
+                by_group = np.array([
+                    scorer._score_sub_dimension(sub_dim, student_profile, {
+                        "requirements": {"basic_requirements": {"education": {"preferred_majors": list(g)}}}
+                    })
+                    for g in matrix.major_groups
+                ], dtype=np.float64)
+                basic_sum += by_group[matrix.major_group]
+            else:
+                basic_sum += scorer._score_sub_dimension(sub_dim, student_profile, {})
+        basic_score = np.trunc(basic_sum / len(scorer.FINE_GRAINED_DIMENSIONS["basic_requirements"]))
+
+        # ---- 发展潜力：子维度与岗位无关，按岗位层级基线换算 ----
+        raw_potential = int(np.mean([
+            scorer._score_sub_dimension(sub_dim, student_profile, {})
+            for sub_dim in scorer.FINE_GRAINED_DIMENSIONS["development_potential"]
+        ]))
+        potential_score = np.minimum(100, np.trunc(raw_potential * 100 / matrix.potential_baseline))
+
+        # ---- 职业素养：学生能力 vs 岗位阈值（各项的加分与折算系数同 _soft_skills_score_from_job） ----
+        soft_rules = [(50, 0.9), (55, 0.85), (50, 0.9), (50, 0.9)]
+        soft_sum = np.zeros(n, dtype=np.float64)
+        for raw, (bonus, factor), th in zip(prepared.soft_raw, soft_rules, matrix.soft_thresholds):
+            soft_sum = soft_sum + np.where(raw >= th, min(100, bonus + raw), max(50, int(raw * factor)))
+        soft_score = np.trunc(soft_sum / len(soft_rules))
+
+        # ---- 加权 + 校准 ----
+        raw_score = (
+            basic_score * 0.15
+            + skills_score * 0.40
+            + soft_score * 0.30
+            + potential_score * 0.15
+        )
+        calibrated = self.calibrator.calibrate_scores(raw_score, prepared.features)
+        return np.trunc(calibrated).astype(np.int64)
+
+    def _vocab_best_matches(self, student_profile: Dict, matrix,
+                            prepared: Optional[PreparedStudent] = None) -> Tuple[np.ndarray, List[Optional[Dict]]]:
+        """技能词表 × 学生技能：每个词表技能的最佳匹配相似度（< 0.7 记 0）与对应学生技能"""
+        if prepared is None:
+            prepared = self.prepare_student(student_profile)
+        student_skills_all = prepared.skills
+
+        vocab_size = len(matrix.skill_vocab)
+        vocab_sim = np.zeros(vocab_size, dtype=np.float64)
+        vocab_best: List[Optional[Dict]] = [None] * vocab_size
+        positions, sims = self.embedding_matcher.best_matches(
+            matrix.skill_vocab, student_skills_all, prepared.skill_ids
+        )
+        for sid in np.flatnonzero((positions >= 0) & (sims >= 0.7)):
+            best_match = student_skills_all[positions[sid]]
+            if best_match:
+                vocab_sim[sid] = sims[sid]
+                vocab_best[sid] = best_match
+        return vocab_sim, vocab_best
+
+    def calculate_skill_overlap(self, student_profile: Dict, matrix,
+                                prepared: Optional[PreparedStudent] = None) -> np.ndarray:
+        """
+        粗排用的加权技能重合度（0-1），与 matrix.job_ids 对齐。
+        只用预计算的技能相似度，不调 LLM、不算其他维度；岗位无技能要求时记 0.5（对应精排的基线分）。
+        """
+        n = matrix.size
+        if n == 0:
+            return np.zeros(0, dtype=np.float64)
+        vocab_sim, _ = self._vocab_best_matches(student_profile, matrix, prepared)
+        weights = matrix.entry_weight
+        total_weight = np.bincount(matrix.entry_job, weights=weights, minlength=n)
+        matched_weight = np.bincount(matrix.entry_job, weights=weights * vocab_sim[matrix.entry_skill], minlength=n)
+        has_skills = total_weight > 0
+        overlap = np.divide(matched_weight, total_weight, out=np.full(n, 0.5), where=has_skills)
+        return overlap
+
     def _generate_highlights(self, dimension_scores: Dict) -> List[str]:
         """生成匹配亮点"""
         highlights = []
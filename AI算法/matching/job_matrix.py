@@ -0,0 +1,332 @@
+"""
+岗位要求矩阵（预编译）
+==================================================
+将 profiles_store 中的岗位画像在加载时一次性编译为紧凑的 NumPy 表示，
+推荐时单个学生只需少量数组运算即可与全部岗位打分，不再逐岗位遍历嵌套 dict。
+
+编译内容：
+- 技能 × 岗位 稀疏权重（按岗位排序的 COO/CSR：entry_job / entry_skill / entry_weight / indptr）
+- 学历等级、岗位层级（发展潜力基线）、软技能阈值数组
+- 专业偏好分组（相同 preferred_majors 只需对学生判定一次）
+
+逐岗位的 HighPrecisionMatchingEngine.calculate_match 保留为参考实现，
+批量打分见 HighPrecisionMatchingEngine.calculate_match_batch，二者逐分一致，
+可用 compare_with_reference 做一致性校验。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger_handler import logger
+from job_profile.skill_registry import get_skill_registry
+
+
+SKILL_TYPES = ("programming_languages", "frameworks_tools", "domain_knowledge")
+
+# 以下映射与 high_precision_matching 中逐岗位实现保持一致
+EDU_ORDER = {"专科": 1, "本科": 2, "硕士": 3, "博士": 4}
+POTENTIAL_BASELINE = {"初级": 65, "中级": 72, "高级": 80}
+SOFT_LEVEL_THRESHOLD = {"高": 78, "中": 65, "低": 55}
+# (岗位软技能键, 岗位未填写时的默认要求等级)，顺序与 _soft_skills_score_from_job 一致
+SOFT_SKILL_KEYS = (
+    ("innovation", "中"),
+    ("learning", "高"),
+    ("communication", "中"),
+    ("pressure", "中"),
+)
+
+
+class JobRequirementMatrix:
+    """
+    岗位侧要求的预编译表示。
+
+    job_ids 与各数组下标一一对应（保持 profiles_store 的插入顺序）；
+    结构不规则、无法编译的岗位记录在 irregular_ids 中，由调用方走逐岗位参考实现。
+    """
+
+    def __init__(self):
+        self.job_ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.irregular_ids: List[str] = []
+
+        # 技能词表：矩阵列 -> 标准技能名；skill_id 为注册表技能 ID -> 矩阵列（别名已归并）
+        self.skill_vocab: List[str] = []
+        self.skill_id: Dict[int, int] = {}
+
+        # 稀疏权重（按岗位顺序排列，indptr 为 CSR 行指针）
+        self.entry_job = np.zeros(0, dtype=np.int32)
+        self.entry_skill = np.zeros(0, dtype=np.int32)
+        self.entry_weight = np.zeros(0, dtype=np.float64)
+        self.entry_critical = np.zeros(0, dtype=bool)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        # 关键技能条目下标 -> 原始 job_skill dict（LLM 验证时作为岗位要求传入）
+        self.critical_job_skills: Dict[int, dict] = {}
+
+        # 逐岗位标量要求
+        self.edu_level = np.zeros(0, dtype=np.int8)
+        self.potential_baseline = np.zeros(0, dtype=np.float64)
+        self.soft_thresholds = np.zeros((len(SOFT_SKILL_KEYS), 0), dtype=np.float64)
+        self.major_group = np.zeros(0, dtype=np.int32)
+        self.major_groups: List[Tuple] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.job_ids)
+
+    @classmethod
+    def compile(cls, profiles: Dict[str, dict]) -> "JobRequirementMatrix":
+        """从 profiles_store 编译矩阵。单个岗位编译失败不影响其他岗位。"""
+        m = cls()
+        registry = get_skill_registry()
+        entry_job: List[int] = []
+        entry_skill: List[int] = []
+        entry_weight: List[float] = []
+        entry_critical: List[bool] = []
+        indptr: List[int] = [0]
+        edu_level: List[int] = []
+        baselines: List[float] = []
+        soft_rows: List[List[float]] = []
+        major_group: List[int] = []
+        major_group_of: Dict[Tuple, int] = {}
+
+        for job_id, job in (profiles or {}).items():
+            if not isinstance(job, dict):
+                continue
+            try:
+                compiled = _compile_job(job)
+            except Exception as e:
+                logger.debug("[JobMatrix] 岗位 %s 结构不规则，走逐岗位计算: %s", job_id, e)
+                m.irregular_ids.append(job_id)
+                continue
+
+            skills, j_edu, baseline, soft_row, majors = compiled
+            row = len(m.job_ids)
+            m.job_ids.append(job_id)
+            m.row_of[job_id] = row
+
+            for skill_name, weight, critical, job_skill in skills:
+                reg_id = registry.intern(skill_name)
+                sid = m.skill_id.get(reg_id)
+                if sid is None:
+                    sid = len(m.skill_vocab)
+                    m.skill_id[reg_id] = sid
+                    m.skill_vocab.append(registry.name_of(reg_id))
+                if critical:
+                    m.critical_job_skills[len(entry_job)] = job_skill
+                entry_job.append(row)
+                entry_skill.append(sid)
+                entry_weight.append(weight)
+                entry_critical.append(critical)
+            indptr.append(len(entry_job))
+
+            edu_level.append(j_edu)
+            baselines.append(baseline)
+            soft_rows.append(soft_row)
+            gid = major_group_of.get(majors)
+            if gid is None:
+                gid = len(m.major_groups)
+                major_group_of[majors] = gid
+                m.major_groups.append(majors)
+            major_group.append(gid)
+
+        m.entry_job = np.asarray(entry_job, dtype=np.int32)
+        m.entry_skill = np.asarray(entry_skill, dtype=np.int32)
+        m.entry_weight = np.asarray(entry_weight, dtype=np.float64)
+        m.entry_critical = np.asarray(entry_critical, dtype=bool)
+        m.indptr = np.asarray(indptr, dtype=np.int64)
+        m.edu_level = np.asarray(edu_level, dtype=np.int8)
+        m.potential_baseline = np.asarray(baselines, dtype=np.float64)
+        m.soft_thresholds = (
+            np.asarray(soft_rows, dtype=np.float64).T
+            if soft_rows else np.zeros((len(SOFT_SKILL_KEYS), 0), dtype=np.float64)
+        )
+        m.major_group = np.asarray(major_group, dtype=np.int32)
+
+        logger.info(
+            "[JobMatrix] 编译完成：岗位 %d 个，技能词表 %d 个，技能条目 %d 条，不规则岗位 %d 个",
+            m.size, len(m.skill_vocab), len(m.entry_job), len(m.irregular_ids),
+        )
+        return m
+
+    def rows_for(self, job_ids) -> np.ndarray:
+        """将 job_id 序列映射为矩阵行号（忽略未编译的岗位）"""
+        rows = [self.row_of[j] for j in job_ids if j in self.row_of]
+        return np.asarray(rows, dtype=np.int64)
+
+    def subset(self, rows) -> "JobRequirementMatrix":
+        """
+        取部分岗位行组成新矩阵（行号升序，保持原插入顺序，同分排序结果不变）。
+        技能词表与专业分组沿用原矩阵，两阶段推荐的精排阶段只对候选岗位打分。
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        m = JobRequirementMatrix()
+        m.job_ids = [self.job_ids[r] for r in rows]
+        m.row_of = {job_id: i for i, job_id in enumerate(m.job_ids)}
+        m.skill_vocab = self.skill_vocab
+        m.skill_id = self.skill_id
+
+        new_row = np.full(self.size, -1, dtype=np.int64)
+        new_row[rows] = np.arange(len(rows))
+        keep = np.flatnonzero(new_row[self.entry_job] >= 0) if len(self.entry_job) else np.zeros(0, dtype=np.int64)
+        m.entry_job = new_row[self.entry_job[keep]].astype(np.int32)
+        m.entry_skill = self.entry_skill[keep]
+        m.entry_weight = self.entry_weight[keep]
+        m.entry_critical = self.entry_critical[keep]
+        m.indptr = np.concatenate(([0], np.cumsum(np.diff(self.indptr)[rows]))).astype(np.int64)
+        new_entry = {int(old): i for i, old in enumerate(keep)}
+        m.critical_job_skills = {
+            new_entry[idx]: job_skill
+            for idx, job_skill in self.critical_job_skills.items()
+            if idx in new_entry
+        }
+
+        m.edu_level = self.edu_level[rows]
+        m.potential_baseline = self.potential_baseline[rows]
+        m.soft_thresholds = self.soft_thresholds[:, rows]
+        m.major_group = self.major_group[rows]
+        m.major_groups = self.major_groups
+        return m
+
+
+def _compile_job(job: dict) -> tuple:
+    """
+    编译单个岗位。取值方式与逐岗位参考实现逐句对应（包括默认值），
+    参考实现中会抛异常的结构在此同样抛出，由 compile 归入 irregular_ids。
+    """
+    reqs = job.get("requirements", {})
+    job_reqs = reqs.get("professional_skills", {})
+
+    skills = []
+    for skill_type in SKILL_TYPES:
+        for job_skill in job_reqs.get(skill_type, []):
+            skill_name = job_skill.get("skill", "")
+            weight = job_skill.get("weight", 0.05)
+            importance = job_skill.get("importance", "重要")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                raise TypeError(f"技能权重非数值: {weight!r}")
+            if importance == "必需":
+                weight *= 2
+            critical = importance == "必需" and weight >= 0.08
+            skills.append((skill_name, float(weight), critical, job_skill))
+
+    job_edu = (reqs.get("basic_requirements", {}).get("education", {}) or {}).get("level", "本科")
+    j_edu = EDU_ORDER.get(str(job_edu).replace("及以上", ""), 2)
+
+    majors = reqs.get("basic_requirements", {}).get("education", {}).get("preferred_majors", [])
+    majors = tuple(majors) if majors else ()
+
+    job_level = (job.get("basic_info") or {}).get("level", "初级") or "初级"
+    baseline = POTENTIAL_BASELINE.get(job_level, 65)
+
+    job_soft = reqs.get("soft_skills", {})
+    soft_row = [
+        SOFT_LEVEL_THRESHOLD.get(job_soft.get(key, default), 65)
+        for key, default in SOFT_SKILL_KEYS
+    ]
+    return skills, j_edu, float(baseline), soft_row, majors
+
+
+def top_n_positions(scores, top_n: int) -> np.ndarray:
+    """
+    取分数最高的 top_n 个下标（argpartition，O(n)），
+    同分按原顺序（与 list.sort 的稳定排序结果一致），返回已排好序的下标。
+    """
+    scores = np.asarray(scores, dtype=np.int64)
+    n = len(scores)
+    k = min(max(int(top_n), 0), n)
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    # 复合键：分数降序 + 下标升序，保证边界同分时与稳定排序选中同一批岗位
+    keys = -scores * n + np.arange(n, dtype=np.int64)
+    if k < n:
+        part = np.argpartition(keys, k - 1)[:k]
+    else:
+        part = np.arange(n, dtype=np.int64)
+    return part[np.argsort(keys[part], kind="stable")]
+
+
+def select_candidate_rows(rows, overlap, semantic=None, semantic_weight: float = 0.0,
+                          candidate_k: int = 50) -> np.ndarray:
+    """
+    两阶段推荐的粗排：在 rows 中按 技能重合度 ×(1-w) + 语义相似度 × w 取前 candidate_k 行。
+    overlap / semantic 为按矩阵行对齐的数组（semantic 为 None 时只用技能重合度），
+    返回升序行号（精排子矩阵保持原岗位顺序）。
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if candidate_k <= 0 or len(rows) <= candidate_k:
+        return rows
+    coarse = np.asarray(overlap, dtype=np.float64)[rows]
+    if semantic is not None and semantic_weight > 0:
+        sem = np.clip(np.asarray(semantic, dtype=np.float64)[rows], 0.0, 1.0)
+        coarse = coarse * (1 - semantic_weight) + sem * semantic_weight
+    # 同分保持原顺序
+    order = np.argsort(-coarse, kind="stable")[:candidate_k]
+    return rows[np.sort(order)]
+
+
+def score_summary(scores, bucket_floors: Tuple[int, ...] = (85, 70, 0), bin_width: int = 10) -> dict:
+    """
+    匹配分数分布汇总（统计接口用）：一次数组运算得到数量、均值、极值、分位数、直方图与分档计数，
+    不生成逐岗位结果。
+    bucket_floors 为降序的分档下限（默认 ≥85 / 70-84 / <70），buckets 与之一一对应；
+    histogram 按 bin_width 分箱覆盖 0-100（最后一箱含 100 分）。
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(scores)
+    edges = np.arange(0, 100 + bin_width, bin_width)
+    if n == 0:
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+    else:
+        counts, _ = np.histogram(np.clip(scores, 0, 100), bins=edges)
+    histogram = [
+        {"range": f"{int(lo)}-{int(hi) if i == len(counts) - 1 else int(hi) - 1}", "count": int(c)}
+        for i, (lo, hi, c) in enumerate(zip(edges[:-1], edges[1:], counts))
+    ]
+    # 分档：按下限升序 searchsorted 后计数，再还原为降序
+    floors = np.asarray(sorted(bucket_floors), dtype=np.float64)
+    bucket_idx = np.searchsorted(floors, scores, side="right") - 1
+    bucket_counts = np.bincount(bucket_idx[bucket_idx >= 0], minlength=len(floors))[::-1]
+    if n == 0:
+        return {
+            "count": 0, "mean": 0.0, "min": None, "max": None,
+            "percentiles": {"p25": None, "p50": None, "p75": None, "p90": None},
+            "histogram": histogram,
+            "buckets": [int(c) for c in bucket_counts],
+        }
+    p25, p50, p75, p90 = np.percentile(scores, [25, 50, 75, 90])
+    return {
+        "count": n,
+        "mean": round(float(scores.mean()), 2),
+        "min": int(scores.min()),
+        "max": int(scores.max()),
+        "percentiles": {
+            "p25": round(float(p25), 1),
+            "p50": round(float(p50), 1),
+            "p75": round(float(p75), 1),
+            "p90": round(float(p90), 1),
+        },
+        "histogram": histogram,
+        "buckets": [int(c) for c in bucket_counts],
+    }
+
+
+def compare_with_reference(engine, student_profile: dict, profiles: Dict[str, dict],
+                           matrix: Optional[JobRequirementMatrix] = None,
+                           limit: int = 0) -> List[dict]:
+    """
+    一致性校验：批量打分 vs 逐岗位 calculate_match。
+    返回不一致的岗位列表 [{job_id, batch, reference}]，为空表示完全一致。
+    limit > 0 时只校验前 limit 个岗位。
+    """
+    matrix = matrix or JobRequirementMatrix.compile(profiles)
+    verdicts: dict = {}
+    batch_scores = engine.calculate_match_batch(student_profile, matrix, verdicts=verdicts)
+    mismatches = []
+    for row, job_id in enumerate(matrix.job_ids):
+        if limit and row >= limit:
+            break
+        ref = engine.calculate_match(student_profile, profiles[job_id], verdicts=verdicts)
+        if int(batch_scores[row]) != ref["match_score"]:
+            mismatches.append({"job_id": job_id, "batch": int(batch_scores[row]), "reference": ref["match_score"]})
+    return mismatches
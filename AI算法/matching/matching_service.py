@@ -21,7 +21,11 @@
 """
 
 import json
+import math
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
@@ -30,9 +34,15 @@ from utils.path_tool import get_abs_path
 from model.factory import chat_model
 
 # 集成已有模块
-from job_profile.job_profile_service import get_job_profile_service
+from job_profile.job_profile_service import get_job_profile_service, job_profile_conf, get_profiles_store_version
 from job_profile.job_dataset_service import calculate_weighted_skill_match
+from job_profile.skill_registry import get_skill_registry
+from job_profile.job_catalog import get_job_catalog
+from job_profile.profile_filter_index import mask_for_filters
 from student_ability.ability_profile_service import get_student_ability_service
+from matching.recommendation_cache import (
+    RankedRecommendations, filters_key, get_recommendation_cache, profile_version,
+)
 
 # 语义搜索依赖（FAISS 向量检索 + Embedding）
 try:
@@ -97,6 +107,20 @@ class SemanticSkillMatcher:
         ("Scikit-learn", "机器学习"): 0.95,
     }
     
+    # SKILL_SIMILARITY_MAP 的技能 ID 索引：(较小ID, 较大ID) -> 相似度，首次使用时构建
+    _pair_index: Optional[Dict[Tuple[int, int], float]] = None
+
+    @classmethod
+    def _get_pair_index(cls) -> Dict[Tuple[int, int], float]:
+        if cls._pair_index is None:
+            registry = get_skill_registry()
+            index = {}
+            for (s1, s2), sim in cls.SKILL_SIMILARITY_MAP.items():
+                a, b = registry.intern(s1), registry.intern(s2)
+                index[(min(a, b), max(a, b))] = sim
+            cls._pair_index = index
+        return cls._pair_index
+    
     @classmethod
     def calculate_semantic_similarity(cls, skill_a: str, skill_b: str) -> float:
         """
@@ -104,26 +128,31 @@ class SemanticSkillMatcher:
         
         返回：0-1之间的相似度分数
         """
-        skill_a_lower = skill_a.lower().strip()
-        skill_b_lower = skill_b.lower().strip()
-        
-        # 1. 完全匹配
-        if skill_a_lower == skill_b_lower:
+        registry = get_skill_registry()
+        return cls.similarity_by_id(registry.intern(skill_a), registry.intern(skill_b))
+
+    @classmethod
+    def similarity_by_id(cls, id_a: int, id_b: int) -> float:
+        """按技能 ID 计算相似度（规则同 calculate_semantic_similarity）"""
+        if id_a < 0 or id_b < 0:
+            return 0.0
+        registry = get_skill_registry()
+        
+        # 1. 完全匹配（含别名）
+        if id_a == id_b:
             return 1.0
         
         # 2. 包含关系（substring）
-        if skill_a_lower in skill_b_lower or skill_b_lower in skill_a_lower:
+        if registry.substring_related(id_a, id_b):
             return 0.95
         
         # 3. 查询预定义相似度图谱
-        for (s1, s2), sim in cls.SKILL_SIMILARITY_MAP.items():
-            if (skill_a in s1 and skill_b in s2) or (skill_a in s2 and skill_b in s1):
-                return sim
+        sim = cls._get_pair_index().get((min(id_a, id_b), max(id_a, id_b)))
+        if sim is not None:
+            return sim
         
         # 4. 基于关键词（简单版，可升级为向量Embedding）
-        keywords_a = set(skill_a_lower.split())
-        keywords_b = set(skill_b_lower.split())
-        if keywords_a & keywords_b:  # 有交集
+        if registry.tokens_of(id_a) & registry.tokens_of(id_b):  # 有交集
             return 0.7
         
         # 5. 无相似度
@@ -136,11 +165,13 @@ class SemanticSkillMatcher:
         
         返回：(最佳匹配技能, 相似度)
         """
+        registry = get_skill_registry()
+        required_id = registry.intern(required_skill)
         best_match = None
         best_similarity = 0.0
         
         for skill in student_skills:
-            similarity = cls.calculate_semantic_similarity(required_skill, skill.get("skill", ""))
+            similarity = cls.similarity_by_id(required_id, registry.intern(skill.get("skill", "")))
             if similarity > best_similarity:
                 best_similarity = similarity
                 best_match = skill
@@ -776,76 +807,419 @@ class JobMatchingService:
         self._semantic_job_ids: List[str] = []
         self._semantic_dim: Optional[int] = None
         self._build_job_semantic_index()
+
+        # 预编译岗位要求矩阵（高精度引擎批量打分用），profiles_store 变化时自动重编译
+        self._job_matrix = None
+        self._job_matrix_sig = None
+        self._get_job_matrix()
+
+        # 批量匹配分析的共享线程池（各请求共用，首次使用时创建）
+        self._batch_pool: Optional[ThreadPoolExecutor] = None
+        self._batch_pool_workers = 0
+        self._batch_pool_lock = threading.Lock()
     
-    def recommend_jobs(self, user_id: int, top_n: int = 10, filters: dict = None, ability_profile: Optional[dict] = None) -> dict:
+    def recommend_jobs(self, user_id: int, top_n: int = 10, filters: dict = None, ability_profile: Optional[dict] = None,
+                       exhaustive: bool = False, explain: bool = True) -> dict:
         """
         6.1 获取推荐岗位
         
         算法流程：
         1. 获取学生能力画像（优先使用传入的 ability_profile）
         2. 获取所有岗位画像
-        3. 逐一计算匹配度
-        4. 排序返回TopN
+        3. 粗排：技能加权重合度 + 语义向量相似度（不调 LLM），保留 recommend_candidate_k 个候选
+        4. 精排：候选岗位走高精度引擎批量打分（含关键技能 LLM 验证）
+        5. 排序后仅对 TopN 构造结果条目
+        6. 仅对 TopN 生成 CareerAgent 推荐解释（match_reason / strengths / skill_gap / growth_potential）
+        
+        exhaustive=True 时跳过粗排、全量精排（用于与两阶段结果对比、调节召回）。
+        explain=False 时不生成推荐解释（只要分数的调用方，如统计接口）；需要先出分数、后出解释时用 stream_recommendations。
+        步骤 3-4 的排序结果按 (用户, 画像版本, 筛选条件, 岗位库版本) 缓存，
+        推荐接口、统计接口与智能体的 get_matching 共用同一次计算。
+        返回的 retrieval 字段记录各阶段处理的岗位数及是否命中缓存；
+        岗位画像仍在后台分块加载时 partial=True，catalog_status 为加载进度（结果只覆盖已加载的岗位）。
+        """
+        entry, student_profile, all_jobs, cache_hit = self._ranked_entry(
+            user_id, top_n, filters, ability_profile, exhaustive
+        )
+        page = self._recommendation_page(entry, student_profile, all_jobs, top_n, cache_hit)
+        if explain:
+            page["recommendations"] = [
+                dict(item, **self._explanation_for(entry, student_profile, all_jobs, item["job_id"]))
+                for item in page["recommendations"]
+            ]
+        return page
+
+    def stream_recommendations(self, user_id: int, top_n: int = 10, filters: dict = None,
+                               ability_profile: Optional[dict] = None, exhaustive: bool = False):
+        """
+        流式推荐：先产出不含解释的推荐列表（分数、维度、差距），再逐个岗位产出 CareerAgent 推荐解释。
+        依次 yield ("scores", 推荐结果) 与 ("explanation", {job_id, match_reason, strengths, skill_gap, growth_potential})。
         """
+        entry, student_profile, all_jobs, cache_hit = self._ranked_entry(
+            user_id, top_n, filters, ability_profile, exhaustive
+        )
+        page = self._recommendation_page(entry, student_profile, all_jobs, top_n, cache_hit)
+        yield "scores", page
+        for item in page["recommendations"]:
+            job_id = item["job_id"]
+            yield "explanation", dict(
+                {"job_id": job_id}, **self._explanation_for(entry, student_profile, all_jobs, job_id)
+            )
+
+    def matching_statistics(self, user_id: int, filters: dict = None, ability_profile: Optional[dict] = None) -> dict:
+        """
+        匹配度统计：覆盖全部岗位（全量精排）的分数分布。
+        只用排序结果中的分数做一次数组汇总（job_matrix.score_summary），不生成推荐条目与推荐解释；
+        排序结果与 recommend_jobs(exhaustive=True) 共用推荐缓存。
+        """
+        from matching.job_matrix import score_summary
+
+        entry, _, _, cache_hit = self._ranked_entry(user_id, 0, filters, ability_profile, exhaustive=True)
+        summary = score_summary([score for _, score in entry.ranking], bucket_floors=(85, 70, 0))
+        high_match, medium_match, low_match = summary.pop("buckets")
+        return {
+            "total_jobs": entry.total_matched,
+            "high_match_count": high_match,
+            "medium_match_count": medium_match,
+            "low_match_count": low_match,
+            "average_match_score": int(summary["mean"]),
+            "distribution": {
+                "85-100分": high_match,
+                "70-84分": medium_match,
+                "0-69分": low_match
+            },
+            "summary": summary,
+            "cache_hit": cache_hit,
+            **self._partial_fields(entry),
+        }
+
+    def _ranked_entry(self, user_id: int, top_n: int, filters: Optional[dict],
+                      ability_profile: Optional[dict], exhaustive: bool):
+        """取画像与岗位、应用筛选，并从推荐缓存获取（或计算）排序结果"""
         # 获取学生能力画像
         student_profile = ability_profile or self.student_ability_service.get_ability_profile(user_id)
         if not student_profile:
             raise ValueError(f"用户{user_id}的能力画像不存在，请先生成")
         
         # 获取所有岗位（从已生成的画像中，JobProfileService 实例的 profiles_store）
-        all_jobs = getattr(self.job_profile_service, "profiles_store", None) or {}
+        # 加载进度先于岗位库读取：后台加载恰好在两者之间完成时，结果只会被保守地标记为部分结果
+        load_status = self._profiles_load_status()
+        store = getattr(self.job_profile_service, "profiles_store", None) or {}
+        all_jobs = store
         
         # 应用筛选条件
         if filters:
             all_jobs = self._apply_filters(all_jobs, filters)
-        
-        # 批量计算匹配度
-        def _job_loc(job: dict) -> str:
-            loc = (job.get("basic_info") or {}).get("work_locations")
-            if isinstance(loc, list) and len(loc) > 0:
-                return loc[0] if isinstance(loc[0], str) else str(loc[0])
-            return str(loc) if loc else ""
 
+        cache = get_recommendation_cache()
+        base_key = (str(user_id), profile_version(student_profile), filters_key(filters),
+                    (get_profiles_store_version(), self._store_signature(store)))
+        # 全量结果可直接服务两阶段请求（召回只会更好），反之不行
+        modes = ("exhaustive",) if exhaustive else ("exhaustive", "two_stage")
+        with cache.key_lock(base_key):
+            entry = None
+            for mode in modes:
+                cached = cache.get(base_key + (mode,))
+                if cached is not None and cached.covers(top_n):
+                    entry = cached
+                    break
+            cache_hit = entry is not None
+            cache.record(cache_hit)
+            if entry is None:
+                entry = self._rank_jobs(student_profile, all_jobs, top_n, exhaustive)
+                entry.catalog_status = load_status
+                cache.put(base_key + (entry.retrieval["mode"],), user_id, entry)
+        return entry, student_profile, all_jobs, cache_hit
+
+    def _rank_jobs(self, student_profile: dict, all_jobs: dict, top_n: int, exhaustive: bool) -> RankedRecommendations:
+        """计算推荐排序：高精度引擎走预编译矩阵批量打分，失败或标准引擎时逐岗位计算"""
+        matrix = self._get_job_matrix()
+        if matrix is not None:
+            try:
+                return self._rank_jobs_vectorized(student_profile, all_jobs, matrix, top_n, exhaustive=exhaustive)
+            except Exception as ex:
+                logger.warning("[Matching] 批量打分失败，回退逐岗位计算: %s", ex)
+        return self._rank_jobs_reference(student_profile, all_jobs)
+
+    def _recommendation_page(self, entry: RankedRecommendations, student_profile: dict, all_jobs: dict,
+                             top_n: int, cache_hit: bool) -> dict:
+        """从排序结果取前 top_n 个岗位，按需生成推荐条目（不含推荐解释；已生成的直接复用）"""
         recommendations = []
+        with entry.lock:
+            for job_id, score in entry.ranking[:top_n]:
+                item = entry.items.get(job_id)
+                if item is None:
+                    job_profile = all_jobs[job_id]
+                    match_result = entry.ready_results.get(job_id)
+                    if match_result is None:
+                        try:
+                            match_result = self.matching_engine.calculate_match(
+                                student_profile, job_profile, verdicts=entry.verdicts
+                            )
+                        except Exception as ex:
+                            logger.warning("[Matching] 岗位 %s 匹配明细生成失败: %s", job_id, ex)
+                            continue
+                        if match_result["match_score"] != score:
+                            logger.warning("[Matching] 岗位 %s 批量分数 %s 与逐岗位分数 %s 不一致",
+                                           job_id, score, match_result["match_score"])
+                    item = self._build_recommendation_item(job_id, job_profile, match_result)
+                    entry.items[job_id] = item
+                    entry.match_results[job_id] = match_result
+                recommendations.append(item)
+
+        return {
+            "total_matched": entry.total_matched,
+            "recommendations": recommendations,
+            "retrieval": dict(entry.retrieval, cache_hit=cache_hit),
+            **self._partial_fields(entry),
+        }
+
+    def _profiles_load_status(self) -> Optional[dict]:
+        getter = getattr(self.job_profile_service, "profiles_load_status", None)
+        if not callable(getter):
+            return None
+        try:
+            return getter()
+        except Exception as e:
+            logger.warning("[Matching] 获取岗位画像加载进度失败: %s", e)
+            return None
+
+    @staticmethod
+    def _partial_fields(entry: RankedRecommendations) -> dict:
+        """岗位画像尚在后台加载时，结果只覆盖已加载的岗位：partial=True 并附加载进度"""
+        status = entry.catalog_status
+        if status is None or status.get("complete", True):
+            return {"partial": False}
+        return {"partial": True, "catalog_status": status}
+
+    def _rank_jobs_reference(self, student_profile: dict, all_jobs: dict) -> RankedRecommendations:
+        """逐岗位计算匹配度并整体排序（参考实现，用于标准引擎与一致性校验）"""
+        results: List[Tuple[str, dict]] = []
+        match_kwargs = {}
+        if hasattr(self.matching_engine, "prevalidate_jobs"):
+            # 高精度引擎：全部岗位的关键技能先去重并发验证，逐岗位计算时直接命中
+            verdicts: dict = {}
+            self.matching_engine.prevalidate_jobs(
+                student_profile, [j for j in all_jobs.values() if isinstance(j, dict)], verdicts
+            )
+            match_kwargs["verdicts"] = verdicts
         for job_id, job_profile in all_jobs.items():
             if not isinstance(job_profile, dict):
                 continue
             try:
-                match_result = self.matching_engine.calculate_match(student_profile, job_profile)
+                match_result = self.matching_engine.calculate_match(student_profile, job_profile, **match_kwargs)
             except Exception as ex:
                 logger.warning("[Matching] 岗位 %s 匹配计算跳过: %s", job_id, ex)
                 continue
-            # CareerAgent 推荐决策：根据匹配结果生成推荐理由与成长建议
-            career_agent = self._build_career_agent_recommendation(student_profile, job_profile, match_result)
-
-            recommendations.append({
-                "job_id": job_id,
-                "job_name": job_profile.get("job_name", ""),
-                "match_score": match_result["match_score"],
-                "match_level": match_result["match_level"],
-                "dimension_scores": match_result["dimension_scores"],
-                "highlights": match_result["highlights"],
-                "gaps": match_result["gaps"],
-                "match_reason": career_agent.get("match_reason", ""),
-                "strengths": career_agent.get("strengths", []),
-                "skill_gap": career_agent.get("skill_gap", []),
-                "growth_potential": career_agent.get("growth_potential", ""),
-                "job_info": {
-                    "company": (job_profile.get("basic_info") or {}).get("company", ""),
-                    "location": _job_loc(job_profile),
-                    "salary": (job_profile.get("basic_info") or {}).get("avg_salary", ""),
-                    "experience": (job_profile.get("basic_info") or {}).get("level", "")
-                }
-            })
-        
-        # 按匹配度排序
-        recommendations.sort(key=lambda x: x["match_score"], reverse=True)
-        
+            results.append((job_id, match_result))
+        
+        # 按匹配度排序（稳定排序，同分保持岗位原顺序）
+        results.sort(key=lambda x: x[1]["match_score"], reverse=True)
+        
+        return RankedRecommendations(
+            ranking=[(job_id, r["match_score"]) for job_id, r in results],
+            total_matched=len(results),
+            retrieval={
+                "mode": "exhaustive",
+                "stage1_jobs": len(all_jobs),
+                "stage2_jobs": len(results),
+            },
+            complete=True,
+            ready_results=dict(results),
+            verdicts=match_kwargs.get("verdicts"),
+        )
+
+    def _rank_jobs_vectorized(self, student_profile: dict, all_jobs: dict, matrix, top_n: int,
+                              exhaustive: bool = False) -> RankedRecommendations:
+        """
+        基于预编译矩阵的两阶段排序：
+        - 粗排：已编译岗位按 _candidate_rows 取候选行（exhaustive 或岗位数不超过 K 时全部保留）
+        - 精排：候选行组成子矩阵，一次 calculate_match_batch 得到分数；不规则岗位直接进入精排逐岗位计算
+        - 明细（calculate_match）留到取页时只对 TopN 生成，复用同一 verdicts，不重复调 LLM
+        学生侧预处理（prepare_student）只做一次，粗排、精排与不规则岗位共用。
+        """
+        from matching.job_matrix import top_n_positions
+
+        prepared = self.matching_engine.prepare_student(student_profile)
+        rows = matrix.rows_for(all_jobs.keys())
+        irregular_ids = [
+            job_id for job_id, job_profile in all_jobs.items()
+            if isinstance(job_profile, dict) and job_id not in matrix.row_of
+        ]
+        candidate_k = 0 if exhaustive else int(job_profile_conf.get("recommend_candidate_k", 50) or 0)
+        if candidate_k > 0:
+            # 候选数不少于 top_n，保证能返回足够的岗位
+            candidate_k = max(candidate_k, top_n)
+        candidate_rows = self._candidate_rows(student_profile, matrix, rows, candidate_k, prepared)
+        two_stage = len(candidate_rows) < len(rows)
+        stage_matrix = matrix.subset(candidate_rows)
+
+        verdicts: dict = {}
+        batch_scores = self.matching_engine.calculate_match_batch(
+            student_profile, stage_matrix, verdicts=verdicts, prepared=prepared
+        )
+        if irregular_ids:
+            self.matching_engine.prevalidate_jobs(
+                student_profile, [all_jobs[j] for j in irregular_ids], verdicts, prepared
+            )
+
+        job_ids: List[str] = []
+        scores: List[int] = []
+        ready_results: Dict[str, dict] = {}
+        for job_id, job_profile in all_jobs.items():
+            if not isinstance(job_profile, dict):
+                continue
+            row = stage_matrix.row_of.get(job_id)
+            if row is not None:
+                score = int(batch_scores[row])
+            elif job_id in matrix.row_of:
+                # 粗排淘汰
+                continue
+            else:
+                try:
+                    match_result = self.matching_engine.calculate_match(
+                        student_profile, job_profile, verdicts=verdicts, prepared=prepared
+                    )
+                except Exception as ex:
+                    logger.warning("[Matching] 岗位 %s 匹配计算跳过: %s", job_id, ex)
+                    continue
+                ready_results[job_id] = match_result
+                score = match_result["match_score"]
+            job_ids.append(job_id)
+            scores.append(score)
+
+        order = top_n_positions(scores, len(scores))
+        stage1_jobs = len(rows) + len(irregular_ids)
+        return RankedRecommendations(
+            ranking=[(job_ids[p], scores[p]) for p in order],
+            # 两阶段时粗排淘汰的岗位也计入（它们参与了匹配，只是未进入精排）
+            total_matched=stage1_jobs if two_stage else len(job_ids),
+            retrieval={
+                "mode": "two_stage" if two_stage else "exhaustive",
+                "candidate_k": candidate_k,
+                "stage1_jobs": stage1_jobs,
+                "stage2_jobs": stage_matrix.size + len(irregular_ids),
+                "semantic": self._semantic_index is not None,
+            },
+            complete=not two_stage,
+            ready_results=ready_results,
+            verdicts=verdicts,
+        )
+
+    def _candidate_rows(self, student_profile: dict, matrix, rows, candidate_k: int, prepared=None):
+        """
+        粗排：加权技能重合度（预计算技能相似度，数组运算）与 FAISS 语义相似度加权，
+        返回得分最高的 candidate_k 个矩阵行号；candidate_k<=0 或岗位数不超过 K 时原样返回 rows。
+        """
+        if candidate_k <= 0 or len(rows) <= candidate_k:
+            return rows
+        from matching.job_matrix import select_candidate_rows
+
+        overlap = self.matching_engine.calculate_skill_overlap(student_profile, matrix, prepared)
+        semantic_weight = float(job_profile_conf.get("recommend_semantic_weight", 0.3) or 0)
+        semantic = self._semantic_job_scores(student_profile) if semantic_weight > 0 else {}
+        semantic_by_row = [semantic.get(job_id, 0.0) for job_id in matrix.job_ids] if semantic else None
+        return select_candidate_rows(rows, overlap, semantic_by_row, semantic_weight, candidate_k)
+
+    def _semantic_job_scores(self, student_profile: dict) -> Dict[str, float]:
+        """学生画像文本与全部已索引岗位的语义相似度（FAISS 内积，向量已归一化）；索引不可用时返回空"""
+        if not _FAISS_AVAILABLE or self._semantic_index is None or np is None:
+            return {}
+        text = self._build_student_semantic_text(student_profile).strip()
+        vec = self._embed_text_for_semantic(text)
+        if vec is None or len(vec) != self._semantic_dim:
+            return {}
+        q = np.asarray([vec], dtype="float32")
+        faiss.normalize_L2(q)
+        scores, idxs = self._semantic_index.search(q, self._semantic_index.ntotal)
+        return {
+            self._semantic_job_ids[idx]: float(score)
+            for idx, score in zip(idxs[0], scores[0])
+            if idx >= 0
+        }
+
+    def _build_student_semantic_text(self, student_profile: dict) -> str:
+        """为粗排语义检索构造学生画像文本：专业 + 技能"""
+        basic = student_profile.get("basic_info") or {}
+        skill_names: List[str] = []
+        for lst in (student_profile.get("professional_skills") or {}).values():
+            if isinstance(lst, list):
+                for item in lst:
+                    if isinstance(item, dict) and item.get("skill"):
+                        skill_names.append(str(item["skill"]))
+        parts = [str(basic.get("major") or ""), " ".join(skill_names)]
+        return "\n".join([p for p in parts if p])
+
+    def _build_recommendation_item(self, job_id: str, job_profile: dict, match_result: dict) -> dict:
+        """构造推荐列表中的单个岗位条目（分数部分，推荐解释见 _explanation_for）"""
+        def _job_loc(job: dict) -> str:
+            loc = (job.get("basic_info") or {}).get("work_locations")
+            if isinstance(loc, list) and len(loc) > 0:
+                return loc[0] if isinstance(loc[0], str) else str(loc[0])
+            return str(loc) if loc else ""
+
         return {
-            "total_matched": len(recommendations),
-            "recommendations": recommendations[:top_n]
+            "job_id": job_id,
+            "job_name": job_profile.get("job_name", ""),
+            "match_score": match_result["match_score"],
+            "match_level": match_result["match_level"],
+            "dimension_scores": match_result["dimension_scores"],
+            "highlights": match_result["highlights"],
+            "gaps": match_result["gaps"],
+            "job_info": {
+                "company": (job_profile.get("basic_info") or {}).get("company", ""),
+                "location": _job_loc(job_profile),
+                "salary": (job_profile.get("basic_info") or {}).get("avg_salary", ""),
+                "experience": (job_profile.get("basic_info") or {}).get("level", "")
+            }
         }
 
+    def _explanation_for(self, entry: RankedRecommendations, student_profile: dict, all_jobs: dict, job_id: str) -> dict:
+        """
+        CareerAgent 推荐解释（排序之后的独立阶段，只对返回的岗位生成，结果随排序结果缓存）。
+        需在 _recommendation_page 为该岗位生成条目之后调用。
+        """
+        with entry.lock:
+            explanation = entry.explanations.get(job_id)
+            if explanation is None:
+                career_agent = self._build_career_agent_recommendation(
+                    student_profile, all_jobs[job_id], entry.match_results[job_id]
+                )
+                explanation = {
+                    "match_reason": career_agent.get("match_reason", ""),
+                    "strengths": career_agent.get("strengths", []),
+                    "skill_gap": career_agent.get("skill_gap", []),
+                    "growth_potential": career_agent.get("growth_potential", ""),
+                }
+                entry.explanations[job_id] = explanation
+            return explanation
+
+    @staticmethod
+    def _store_signature(store: dict) -> tuple:
+        """岗位库签名：画像原地替换（如强制重新生成）时 len 不变，因此同时包含各画像对象的 id"""
+        return (id(store), len(store), hash(tuple(map(id, store.values()))))
+
+    def _get_job_matrix(self):
+        """
+        获取预编译岗位矩阵；profiles_store 被替换或增删后重新编译。
+        仅高精度引擎支持批量打分，标准引擎或 numpy 不可用时返回 None。
+        """
+        if not hasattr(self.matching_engine, "calculate_match_batch"):
+            return None
+        store = getattr(self.job_profile_service, "profiles_store", None) or {}
+        sig = self._store_signature(store)
+        if self._job_matrix is not None and self._job_matrix_sig == sig:
+            return self._job_matrix
+        try:
+            from matching.job_matrix import JobRequirementMatrix
+            self._job_matrix = JobRequirementMatrix.compile(store)
+            self._job_matrix_sig = sig
+        except Exception as e:
+            logger.warning(f"[Matching] 岗位要求矩阵编译失败，使用逐岗位计算: {e}")
+            self._job_matrix = None
+            self._job_matrix_sig = None
+        return self._job_matrix
+
     # ──────────────────────────────────────────────────────
     # 语义岗位搜索（Embedding + FAISS）
     # ──────────────────────────────────────────────────────
@@ -965,6 +1339,8 @@ class JobMatchingService:
         scores, idxs = self._semantic_index.search(q, top_k)
 
         all_jobs = getattr(self.job_profile_service, "profiles_store", None) or {}
+        allowed = self._filtered_job_ids(all_jobs, filters)
+        allowed = set(allowed) if allowed is not None else None
         results: List[Dict] = []
 
         for idx, score in zip(idxs[0], scores[0]):
@@ -975,7 +1351,7 @@ class JobMatchingService:
             if not job or not isinstance(job, dict):
                 continue
             # 可选：再次应用 filters 过滤
-            if filters and not self._job_pass_filters_single(job, filters):
+            if allowed is not None and job_id not in allowed:
                 continue
             results.append(self._build_search_job_entry(job_id, job, semantic_score=float(score)))
 
@@ -993,14 +1369,14 @@ class JobMatchingService:
         keyword_lower = (keyword or "").strip().lower()
 
         keyword_results: Dict[str, Dict] = {}
-        for job_id, job in all_jobs.items():
+        # 无关键词时先不做关键词筛选，交给语义检索主导；有筛选条件时只遍历筛选索引命中的岗位
+        job_ids = self._filtered_job_ids(all_jobs, filters) if keyword_lower else []
+        if job_ids is None:
+            job_ids = list(all_jobs)
+        for job_id in job_ids:
+            job = all_jobs.get(job_id)
             if not isinstance(job, dict):
                 continue
-            if not self._job_pass_filters_single(job, filters):
-                continue
-            if not keyword_lower:
-                # 无关键词时，先不加入，交给语义检索主导
-                continue
             basic = job.get("basic_info") or {}
             name = str(job.get("job_name") or "").lower()
             industry = str(basic.get("industry") or "").lower()
@@ -1048,36 +1424,6 @@ class JobMatchingService:
             "semantic_score": float(semantic_score) if semantic_score is not None else None,
         }
 
-    def _job_pass_filters_single(self, job: dict, filters: dict) -> bool:
-        """复用 _apply_filters 的逻辑，对单个岗位应用筛选条件。"""
-        if not filters:
-            return True
-        basic_info = job.get("basic_info", {})
-
-        # 城市筛选
-        if "cities" in filters:
-            locations = basic_info.get("work_locations", [])
-            if not any(city in (loc or "") for city in filters["cities"] for loc in locations):
-                return False
-
-        # 薪资筛选
-        if "salary_min" in filters:
-            salary_str = basic_info.get("avg_salary", "")
-            if "k" in str(salary_str).lower():
-                try:
-                    min_salary = int(str(salary_str).split("-")[0].replace("k", "").strip())
-                    if min_salary * 1000 < filters["salary_min"]:
-                        return False
-                except Exception:
-                    pass
-
-        # 行业筛选
-        if "industries" in filters:
-            if basic_info.get("industry") not in filters["industries"]:
-                return False
-
-        return True
-    
     def analyze_single_job(self, user_id: int, job_id: str, ability_profile: Optional[dict] = None) -> dict:
         """
         6.2 获取单个岗位匹配分析
@@ -1091,14 +1437,24 @@ class JobMatchingService:
         if job_id not in job_profiles:
             raise ValueError(f"岗位{job_id}的画像不存在")
         
-        job_profile = job_profiles[job_id]
-        match_result = self.matching_engine.calculate_match(student_profile, job_profile)
+        return self._analyze_job(student_profile, job_id, job_profiles[job_id])
+
+    def _analyze_job(self, student_profile: dict, job_id: str, job_profile: dict,
+                     prepared=None, verdicts: Optional[dict] = None) -> dict:
+        """
+        单岗位完整匹配分析（analyze_single_job / batch_analyze 共用）。
+        prepared / verdicts：批量分析时传入的学生预处理结果与 LLM 验证备忘（仅高精度引擎）。
+        """
+        match_kwargs = {}
+        if prepared is not None:
+            match_kwargs["prepared"] = prepared
+        if verdicts is not None:
+            match_kwargs["verdicts"] = verdicts
+        match_result = self.matching_engine.calculate_match(student_profile, job_profile, **match_kwargs)
         loc = (job_profile.get("basic_info") or {}).get("work_locations")
         location_str = (loc[0] if isinstance(loc, list) and len(loc) > 0 else loc) or ""
         if not isinstance(location_str, str):
             location_str = str(location_str)
-        # CareerAgent 推荐决策（单岗位分析）：与列表保持一致的字段结构
-        career_agent = self._build_career_agent_recommendation(student_profile, job_profile, match_result)
 
         # CareerAgent 推荐决策（单岗位分析）：与列表保持一致的字段结构
         career_agent = self._build_career_agent_recommendation(student_profile, job_profile, match_result)
@@ -1333,64 +1689,140 @@ class JobMatchingService:
     def batch_analyze(self, user_id: int, job_ids: List[str], ability_profile: Optional[dict] = None) -> dict:
         """
         6.3 批量匹配分析
+
+        能力画像只获取一次，学生侧预处理（技能展平与 ID、校准特征、职业素养原始分）只算一次；
+        用线程池并发分析各岗位，每个岗位任务内先并发做本岗位关键技能的 LLM 验证（计入该岗位耗时），
+        各任务共用一份 VerdictMemo，同一技能对只验证一次。
+        单个岗位开始后超过 batch_analyze_job_timeout 秒未完成即记为超时，不等待最慢的岗位；
+        整批另有截止时间 batch_analyze_job_timeout × ceil(岗位数 / 线程数)，届时仍在排队的岗位取消并记为超时。
+        失败 / 超时的岗位记入 errors，analyses 按请求顺序返回已完成的岗位，partial 表示是否有岗位缺失。
         """
+        student_profile = ability_profile or self.student_ability_service.get_ability_profile(user_id)
+        if not student_profile:
+            raise ValueError(f"用户{user_id}的能力画像不存在，请先生成能力画像")
+
+        job_profiles = getattr(self.job_profile_service, "profiles_store", None) or {}
+        errors: Dict[str, str] = {}
+        tasks: List[str] = []
+        for job_id in dict.fromkeys(job_ids):
+            if job_id in job_profiles:
+                tasks.append(job_id)
+            else:
+                errors[job_id] = f"岗位{job_id}的画像不存在"
+
+        prepared = None
+        verdicts = None
+        if tasks and hasattr(self.matching_engine, "prepare_student"):
+            from matching.high_precision_matching import VerdictMemo
+            prepared = self.matching_engine.prepare_student(student_profile)
+            verdicts = VerdictMemo()
+
+        results = self._run_batch_analysis(student_profile, job_profiles, tasks, prepared, verdicts, errors)
+
         analyses = []
         best_match = None
         best_score = 0
-        
-        for job_id in job_ids:
-            try:
-                analysis = self.analyze_single_job(user_id, job_id, ability_profile=ability_profile)
-                analyses.append(analysis)
-                
-                if analysis["match_score"] > best_score:
-                    best_score = analysis["match_score"]
-                    best_match = {
-                        "job_id": job_id,
-                        "job_name": analysis["job_name"],
-                        "match_score": best_score
-                    }
-            except Exception as e:
-                logger.error(f"[Matching] 分析岗位{job_id}失败: {e}")
-        
+        for job_id in tasks:
+            analysis = results.get(job_id)
+            if analysis is None:
+                continue
+            analyses.append(analysis)
+            if analysis["match_score"] > best_score:
+                best_score = analysis["match_score"]
+                best_match = {
+                    "job_id": job_id,
+                    "job_name": analysis["job_name"],
+                    "match_score": best_score
+                }
+
         return {
             "analyses": analyses,
-            "best_match": best_match
+            "best_match": best_match,
+            "errors": [{"job_id": job_id, "error": msg} for job_id, msg in errors.items()],
+            "partial": bool(errors)
         }
-    
-    def _apply_filters(self, jobs: dict, filters: dict) -> dict:
-        """应用筛选条件"""
-        filtered = {}
-        
-        for job_id, job in jobs.items():
-            basic_info = job.get("basic_info", {})
-            
-            # 城市筛选
-            if "cities" in filters:
-                locations = basic_info.get("work_locations", [])
-                if not any(city in loc for city in filters["cities"] for loc in locations):
-                    continue
-            
-            # 薪资筛选
-            if "salary_min" in filters:
-                salary_str = basic_info.get("avg_salary", "")
-                # 简单解析：15k-25k → 15
-                if "k" in salary_str.lower():
+
+    def _run_batch_analysis(self, student_profile: dict, job_profiles: dict, job_ids: List[str],
+                            prepared, verdicts: Optional[dict], errors: Dict[str, str]) -> Dict[str, dict]:
+        """
+        共享线程池并发执行 _analyze_job，按岗位计时超时并有整批截止时间；
+        返回 job_id -> 分析结果，失败 / 超时写入 errors
+        """
+        results: Dict[str, dict] = {}
+        if not job_ids:
+            return results
+        pool, workers = self._get_batch_pool()
+        job_timeout = float(job_profile_conf.get("batch_analyze_job_timeout", 60) or 0)
+        # 整批截止时间：每个线程依次分析 ceil(n / workers) 个岗位、每个都用满单岗位超时
+        batch_budget = job_timeout * math.ceil(len(job_ids) / workers)
+        deadline = time.monotonic() + batch_budget
+        started: Dict[str, float] = {}
+
+        def _run(job_id: str) -> dict:
+            started[job_id] = time.monotonic()
+            job_profile = job_profiles[job_id]
+            if prepared is not None and verdicts is not None and isinstance(job_profile, dict):
+                # 关键技能验证在岗位任务内进行，受该岗位超时约束
+                self.matching_engine.prevalidate_jobs(student_profile, [job_profile], verdicts, prepared)
+            return self._analyze_job(student_profile, job_id, job_profile, prepared, verdicts)
+
+        futures = {pool.submit(_run, job_id): job_id for job_id in job_ids}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.2 if job_timeout > 0 else None,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = futures[future]
                     try:
-                        min_salary = int(salary_str.split("-")[0].replace("k", "").strip())
-                        if min_salary * 1000 < filters["salary_min"]:
-                            continue
-                    except:
-                        pass
-            
-            # 行业筛选
-            if "industries" in filters:
-                if basic_info.get("industry") not in filters["industries"]:
+                        results[job_id] = future.result()
+                    except Exception as e:
+                        logger.error(f"[Matching] 分析岗位{job_id}失败: {e}")
+                        errors[job_id] = str(e)
+                if job_timeout <= 0:
                     continue
-            
-            filtered[job_id] = job
-        
-        return filtered
+                now = time.monotonic()
+                for future in list(pending):
+                    job_id = futures[future]
+                    if job_id in started:
+                        if now - started[job_id] <= job_timeout:
+                            continue
+                        # 线程无法强制终止，超时岗位在后台结束后结果丢弃（模型调用自身有超时，线程不会一直占用）
+                        pending.discard(future)
+                        logger.warning(f"[Matching] 分析岗位{job_id}超时（>{job_timeout:g}s）")
+                        errors[job_id] = f"分析超时（>{job_timeout:g}s）"
+                    elif now > deadline and future.cancel():
+                        pending.discard(future)
+                        logger.warning(f"[Matching] 岗位{job_id}排队超过整批截止时间，未开始分析")
+                        errors[job_id] = f"分析超时（整批超过 {batch_budget:g}s，未开始）"
+        finally:
+            for future in pending:
+                future.cancel()
+        return results
+
+    def _get_batch_pool(self) -> Tuple[ThreadPoolExecutor, int]:
+        """批量分析共享线程池（batch_analyze_workers 个线程，配置变化时换新池，旧池任务完成后回收）"""
+        workers = max(1, int(job_profile_conf.get("batch_analyze_workers", 8) or 1))
+        with self._batch_pool_lock:
+            if self._batch_pool is None or self._batch_pool_workers != workers:
+                old = self._batch_pool
+                self._batch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-analyze")
+                self._batch_pool_workers = workers
+                if old is not None:
+                    old.shutdown(wait=False)
+            return self._batch_pool, workers
+    
+    def _apply_filters(self, jobs: dict, filters: dict) -> dict:
+        """应用筛选条件：画像筛选索引上按位图求交（见 profile_filter_index.mask_for_filters），保持原顺序"""
+        index = get_job_catalog().filter_index(jobs)
+        return {job_id: jobs[job_id] for job_id in index.ids(mask_for_filters(index, filters))}
+
+    def _filtered_job_ids(self, jobs: dict, filters: Optional[dict]) -> Optional[List[str]]:
+        """满足 filters 的 job_id（按画像顺序）；无筛选条件时为 None（不限）"""
+        if not filters:
+            return None
+        index = get_job_catalog().filter_index(jobs)
+        return index.ids(mask_for_filters(index, filters))
 
 
 # ============================================================
@@ -0,0 +1,164 @@
+"""
+岗位推荐结果缓存（进程内）
+==================================================
+/matching/recommend-jobs、/matching/statistics 以及智能体对话的 get_matching 对同一用户会连续触发推荐计算。
+这里缓存一次推荐计算得到的完整排序，三者共用：
+
+- 键：(user_id, 能力画像内容哈希, 筛选条件, 岗位库版本, 检索模式)，去掉末尾检索模式即为键级锁的键
+- 值：RankedRecommendations —— 精排阶段全部岗位的 (job_id, 分数) 排序 + 已生成的推荐条目与推荐解释，
+  不同 top_n 的请求只需按需补齐前 top_n 条的明细
+- 能力画像更新 / 重新生成时由 StudentAbilityProfileService 调用 invalidate_user 清除
+
+同一组 (用户, 画像, 筛选, 岗位库) 的并发请求通过键级锁串行化，只计算一次。
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger_handler import logger
+
+DEFAULT_MAX_ENTRIES = 256
+# 兜底有效期（秒）：即使未收到失效通知，缓存结果也不会无限期沿用
+DEFAULT_TTL_SECONDS = 30 * 60
+
+
+def profile_version(student_profile: Optional[dict]) -> str:
+    """能力画像内容哈希（画像任一字段变化即变化）"""
+    raw = json.dumps(student_profile or {}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def filters_key(filters: Optional[dict]) -> str:
+    return json.dumps(filters or {}, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class RankedRecommendations:
+    """
+    一次推荐计算的结果。
+
+    ranking 为精排阶段全部岗位按分数降序（同分保持岗位原顺序）的 [(job_id, score)]；
+    complete 表示精排覆盖了全部岗位（全量模式或岗位数不超过候选数），此时任意 top_n 都可直接从 ranking 截取。
+    """
+
+    def __init__(self, ranking: List[Tuple[str, int]], total_matched: int, retrieval: dict,
+                 complete: bool, ready_results: Optional[Dict[str, dict]] = None,
+                 verdicts: Optional[dict] = None):
+        self.ranking = ranking
+        self.total_matched = total_matched
+        self.retrieval = retrieval
+        self.complete = complete
+        # 已算出完整 match_result 的岗位（不规则岗位 / 参考实现）
+        self.ready_results: Dict[str, dict] = ready_results or {}
+        # 请求级 LLM 验证备忘，补齐明细时复用
+        self.verdicts: dict = verdicts if verdicts is not None else {}
+        # job_id -> 推荐条目（_build_recommendation_item 的结果，不含推荐解释）
+        self.items: Dict[str, dict] = {}
+        # job_id -> 生成条目所用的 match_result / CareerAgent 推荐解释（按需生成）
+        self.match_results: Dict[str, dict] = {}
+        self.explanations: Dict[str, dict] = {}
+        # 计算时的岗位画像加载进度（complete 为 False 表示只覆盖了已加载的部分岗位）
+        self.catalog_status: Optional[dict] = None
+        self.lock = threading.Lock()
+
+    def covers(self, top_n: int) -> bool:
+        return self.complete or len(self.ranking) >= top_n
+
+
+class RecommendationCache:
+    """推荐结果 LRU 缓存（线程安全），stats() 返回命中/未命中计数"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (user_id, entry, created_at)
+        self._entries: "OrderedDict[tuple, Tuple[str, RankedRecommendations, float]]" = OrderedDict()
+        # key -> [锁, 持有及等待该锁的请求数]；计数归零即移除，不随键的数量增长
+        self._key_locks: Dict[tuple, list] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @contextmanager
+    def key_lock(self, key: tuple):
+        """
+        键级锁（键不含检索模式）：同一键的计算串行化，后到的请求直接复用先到请求的结果。
+        锁只在有请求持有或等待时存在，最后一个请求退出时移除（计算异常、结果未写入缓存时也不残留）。
+        """
+        with self._lock:
+            slot = self._key_locks.get(key)
+            if slot is None:
+                slot = self._key_locks[key] = [threading.Lock(), 0]
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._key_locks[key]
+
+    def get(self, key: tuple) -> Optional[RankedRecommendations]:
+        with self._lock:
+            record = self._entries.get(key)
+            if record is None:
+                return None
+            if self.ttl_seconds > 0 and time.time() - record[2] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return record[1]
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def put(self, key: tuple, user_id, entry: RankedRecommendations):
+        with self._lock:
+            self._entries[key] = (str(user_id), entry, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id) -> int:
+        """清除某用户的全部推荐结果（能力画像变化时调用）"""
+        uid = str(user_id)
+        with self._lock:
+            keys = [k for k, record in self._entries.items() if record[0] == uid]
+            for key in keys:
+                del self._entries[key]
+        if keys:
+            logger.info("[RecommendationCache] 已清除用户 %s 的 %d 条推荐缓存", uid, len(keys))
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+_recommendation_cache: Optional[RecommendationCache] = None
+
+
+def get_recommendation_cache() -> RecommendationCache:
+    global _recommendation_cache
+    if _recommendation_cache is None:
+        _recommendation_cache = RecommendationCache()
+    return _recommendation_cache
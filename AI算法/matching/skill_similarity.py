@@ -0,0 +1,284 @@
+"""
+技能相似度矩阵（预计算 + 内存映射）
+==================================================
+EmbeddingSkillMatcher 原先对每个岗位、每个 (岗位技能, 学生技能) 对都重新执行
+簇表查询 / 子串 / 关键词 Jaccard 规则。这里在技能词表上一次性算好稠密相似度矩阵：
+
+- 词表：_SKILL_KEYWORDS、_JOB_NAME_SKILL_MAP、SKILLS_BY_STANDARD_JOB、技能簇表、别名表中的全部技能
+  （经 SkillRegistry 规范化去重）
+- 取值：与 EmbeddingSkillMatcher 规则逐项一致；可选用 Sentence Transformer 向量补全规则未覆盖（为 0）的技能对
+- 存储：data/skill_similarity/matrix.npy + vocab.json（含来源指纹），启动时以 mmap 方式加载
+
+矩阵按“行 = 岗位要求技能，列 = 学生技能”存放（规则本身不保证对称），
+最佳匹配即一次行 gather + argmax；词表外的技能（学生自填的生僻技能）仍走逐对规则。
+
+_SKILL_KEYWORDS 或技能簇表变化后指纹失效，启动时自动重建；也可手动执行：
+    python scripts/build_skill_similarity.py [--embeddings]
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.path_tool import get_abs_path
+from utils.logger_handler import logger
+from job_profile.skill_registry import SKILL_ALIASES, get_skill_registry
+
+
+SKILL_SIMILARITY_DIR = get_abs_path("data/skill_similarity")
+MATRIX_FILE = "matrix.npy"
+VOCAB_FILE = "vocab.json"
+
+# 规则实现变化时递增，使旧矩阵指纹失效
+RULE_VERSION = 1
+
+# 向量补全：余弦相似度低于下限视为无关；上限低于子串规则的 0.95，避免向量结果压过规则
+EMBED_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+EMBED_MIN_SIMILARITY = 0.80
+EMBED_MAX_SIMILARITY = 0.90
+
+
+def collect_skill_vocabulary(cluster_table: Dict[str, Dict[str, float]]) -> List[str]:
+    """
+    汇总技能词表，返回规范化去重后的技能名（按规范化键排序，保证重建结果稳定）。
+    """
+    from job_profile.job_profile_service import _SKILL_KEYWORDS, _JOB_NAME_SKILL_MAP
+    from job_profile.job_profiles_db import SKILLS_BY_STANDARD_JOB
+
+    names: List[str] = []
+    for keywords in _SKILL_KEYWORDS.values():
+        names.extend(keywords)
+    for _, skill_pairs in _JOB_NAME_SKILL_MAP:
+        names.extend(skill for _, skill in skill_pairs)
+    for skills in SKILLS_BY_STANDARD_JOB.values():
+        names.extend(skills)
+    for skill, neighbors in cluster_table.items():
+        names.append(skill)
+        names.extend(neighbors.keys())
+    names.extend(SKILL_ALIASES.values())
+
+    registry = get_skill_registry()
+    by_key: Dict[str, str] = {}
+    for name in names:
+        sid = registry.intern(name)
+        if sid >= 0:
+            by_key.setdefault(registry.key_of(sid), registry.name_of(sid))
+    return [by_key[key] for key in sorted(by_key)]
+
+
+def source_fingerprint(vocab: List[str], cluster_table: Dict[str, Dict[str, float]]) -> str:
+    """词表 + 簇表 + 别名表 + 规则版本的指纹，任一变化即需重建"""
+    payload = json.dumps(
+        {
+            "rule_version": RULE_VERSION,
+            "vocab": vocab,
+            "clusters": cluster_table,
+            "aliases": SKILL_ALIASES,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SkillSimilarityMatrix:
+    """
+    词表上的稠密相似度矩阵。
+
+    matrix[i, j] 为“要求技能 vocab[i]”与“学生技能 vocab[j]”的相似度（float64，与规则计算值逐位一致）；
+    row_of 为注册表技能 ID -> 矩阵行/列号。
+    """
+
+    def __init__(self, vocab: List[str], matrix: np.ndarray, fingerprint: str, embeddings: bool = False):
+        self.vocab = vocab
+        self.matrix = matrix
+        self.fingerprint = fingerprint
+        self.embeddings = embeddings
+        registry = get_skill_registry()
+        self.row_of: Dict[int, int] = {}
+        for row, name in enumerate(vocab):
+            sid = registry.intern(name)
+            if sid >= 0:
+                self.row_of.setdefault(sid, row)
+
+    @property
+    def size(self) -> int:
+        return len(self.vocab)
+
+    def lookup(self, id_a: int, id_b: int) -> Optional[float]:
+        """两技能均在词表内时返回矩阵值，否则返回 None（由调用方走规则）"""
+        row = self.row_of.get(id_a)
+        col = self.row_of.get(id_b)
+        if row is None or col is None:
+            return None
+        return float(self.matrix[row, col])
+
+
+def build_similarity_matrix(
+    vocab: List[str],
+    rule_similarity: Callable[[int, int], float],
+    use_embeddings: bool = False,
+) -> np.ndarray:
+    """
+    按规则逐对计算相似度矩阵；use_embeddings 时用向量余弦补全规则为 0 的技能对。
+    """
+    registry = get_skill_registry()
+    ids = [registry.intern(name) for name in vocab]
+    n = len(ids)
+    matrix = np.zeros((n, n), dtype=np.float64)
+    for i, id_a in enumerate(ids):
+        for j, id_b in enumerate(ids):
+            matrix[i, j] = rule_similarity(id_a, id_b)
+
+    if use_embeddings and n:
+        cosine = _embedding_cosine(vocab)
+        if cosine is None:
+            logger.warning("[SkillSimilarity] 未安装 sentence-transformers，跳过向量补全")
+        else:
+            fill = (matrix == 0) & (cosine >= EMBED_MIN_SIMILARITY)
+            matrix[fill] = np.minimum(cosine[fill], EMBED_MAX_SIMILARITY)
+            logger.info("[SkillSimilarity] 向量补全技能对 %d 个", int(fill.sum()))
+    return matrix
+
+
+def _embedding_cosine(vocab: List[str]) -> Optional[np.ndarray]:
+    """词表两两余弦相似度；未安装 sentence-transformers 时返回 None"""
+    try:
+        from sentence_transformers import SentenceTransformer  # type: ignore
+    except Exception:
+        return None
+    model = SentenceTransformer(EMBED_MODEL_NAME)
+    vectors = np.asarray(model.encode(vocab, normalize_embeddings=True), dtype=np.float64)
+    return vectors @ vectors.T
+
+
+def save_similarity_matrix(similarity: SkillSimilarityMatrix, store_dir: str = SKILL_SIMILARITY_DIR) -> None:
+    """写入 matrix.npy + vocab.json（先写临时文件再替换，避免读到半截文件）"""
+    os.makedirs(store_dir, exist_ok=True)
+    matrix_path = os.path.join(store_dir, MATRIX_FILE)
+    vocab_path = os.path.join(store_dir, VOCAB_FILE)
+
+    tmp_matrix = matrix_path + ".tmp"
+    with open(tmp_matrix, "wb") as f:
+        np.save(f, np.ascontiguousarray(similarity.matrix, dtype=np.float64))
+    tmp_vocab = vocab_path + ".tmp"
+    with open(tmp_vocab, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "fingerprint": similarity.fingerprint,
+                "embeddings": similarity.embeddings,
+                "vocab": similarity.vocab,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    # 先替换矩阵再替换词表：读取方以 vocab.json 的指纹和尺寸校验矩阵
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_vocab, vocab_path)
+
+
+def load_similarity_matrix(
+    expected_fingerprint: Optional[str] = None,
+    store_dir: str = SKILL_SIMILARITY_DIR,
+) -> Optional[SkillSimilarityMatrix]:
+    """
+    以 mmap 方式加载已持久化的矩阵。文件缺失、损坏或指纹不符时返回 None。
+    """
+    matrix_path = os.path.join(store_dir, MATRIX_FILE)
+    vocab_path = os.path.join(store_dir, VOCAB_FILE)
+    if not (os.path.exists(matrix_path) and os.path.exists(vocab_path)):
+        return None
+    try:
+        with open(vocab_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        vocab = meta.get("vocab") or []
+        fingerprint = meta.get("fingerprint", "")
+        if expected_fingerprint is not None and fingerprint != expected_fingerprint:
+            logger.info("[SkillSimilarity] 技能词表或簇表已变化，需重建相似度矩阵")
+            return None
+        matrix = np.load(matrix_path, mmap_mode="r")
+        if matrix.shape != (len(vocab), len(vocab)):
+            logger.warning("[SkillSimilarity] 矩阵尺寸 %s 与词表大小 %d 不符", matrix.shape, len(vocab))
+            return None
+    except Exception as e:
+        logger.warning("[SkillSimilarity] 加载相似度矩阵失败: %s", e)
+        return None
+    return SkillSimilarityMatrix(vocab, matrix, fingerprint, bool(meta.get("embeddings")))
+
+
+def rebuild_similarity_matrix(
+    cluster_table: Dict[str, Dict[str, float]],
+    rule_similarity: Callable[[int, int], float],
+    use_embeddings: bool = False,
+    persist: bool = True,
+) -> SkillSimilarityMatrix:
+    """重新计算相似度矩阵并（可选）持久化"""
+    vocab = collect_skill_vocabulary(cluster_table)
+    fingerprint = source_fingerprint(vocab, cluster_table)
+    matrix = build_similarity_matrix(vocab, rule_similarity, use_embeddings=use_embeddings)
+    similarity = SkillSimilarityMatrix(vocab, matrix, fingerprint, use_embeddings)
+    if persist:
+        try:
+            save_similarity_matrix(similarity)
+        except OSError as e:
+            logger.warning("[SkillSimilarity] 相似度矩阵写盘失败，仅本进程内使用: %s", e)
+    logger.info("[SkillSimilarity] 已构建技能相似度矩阵：词表 %d 个技能", len(vocab))
+    return similarity
+
+
+def load_or_build_similarity_matrix(
+    cluster_table: Dict[str, Dict[str, float]],
+    rule_similarity: Callable[[int, int], float],
+) -> Optional[SkillSimilarityMatrix]:
+    """
+    启动时调用：指纹一致则 mmap 加载，否则按规则重建并写盘。
+    构建失败返回 None，调用方退回逐对规则计算。
+    """
+    try:
+        vocab = collect_skill_vocabulary(cluster_table)
+        fingerprint = source_fingerprint(vocab, cluster_table)
+        similarity = load_similarity_matrix(expected_fingerprint=fingerprint)
+        if similarity is not None:
+            logger.info("[SkillSimilarity] 已加载技能相似度矩阵（mmap）：词表 %d 个技能", similarity.size)
+            return similarity
+        return rebuild_similarity_matrix(cluster_table, rule_similarity)
+    except Exception as e:
+        logger.warning("[SkillSimilarity] 相似度矩阵不可用，退回逐对计算: %s", e)
+        return None
+
+
+def similarity_block(
+    similarity: Optional[SkillSimilarityMatrix],
+    required_ids: Iterable[int],
+    student_ids: List[int],
+    rule_similarity: Callable[[int, int], float],
+) -> np.ndarray:
+    """
+    要求技能 × 学生技能 的相似度块（行 gather），词表外的技能对按规则补算。
+    返回形状 (len(required_ids), len(student_ids)) 的 float64 数组。
+    """
+    required_ids = list(required_ids)
+    block = np.zeros((len(required_ids), len(student_ids)), dtype=np.float64)
+    if not required_ids or not student_ids:
+        return block
+
+    row_of = similarity.row_of if similarity is not None else {}
+    rows = np.asarray([row_of.get(i, -1) for i in required_ids], dtype=np.int64)
+    cols = np.asarray([row_of.get(i, -1) for i in student_ids], dtype=np.int64)
+    row_in = rows >= 0
+    col_in = cols >= 0
+    if similarity is not None and row_in.any() and col_in.any():
+        r = np.flatnonzero(row_in)
+        c = np.flatnonzero(col_in)
+        block[np.ix_(r, c)] = similarity.matrix[np.ix_(rows[r], cols[c])]
+
+    # 词表外：逐对规则
+    for i, req_id in enumerate(required_ids):
+        for j, stu_id in enumerate(student_ids):
+            if not (row_in[i] and col_in[j]):
+                block[i, j] = rule_similarity(req_id, stu_id)
+    return block
@@ -0,0 +1,285 @@
+"""
+LLM 技能验证结果缓存（SQLite）
+==================================================
+LLMCrossValidator 对同一 (岗位技能要求, 学生技能, 学生背景) 的多轮验证结果是确定可复用的：
+同一用户的重复请求、不同岗位列出的同一技能都不必再调 LLM。
+
+两级缓存：
+- 进程内 LRU（OrderedDict），命中零 IO
+- 磁盘 SQLite 表 skill_verdicts（data/llm_verdicts.db），跨进程/重启复用，带 TTL
+
+缓存键为规范化后的 prompt 输入 + user_id 的内容哈希；
+能力画像变化时调用 invalidate_user(user_id) 清除该用户的全部验证结果。
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from utils.path_tool import get_abs_path
+from utils.logger_handler import logger
+from job_profile.skill_registry import fold_skill
+
+DB_DIR = get_abs_path("data")
+DB_PATH = os.path.join(DB_DIR, "llm_verdicts.db")
+
+# 验证结果有效期（秒）：LLM 评分标准或模型更换后，旧结果在此期限后自然淘汰
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 4096
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS skill_verdicts (
+    cache_key CHAR(40) PRIMARY KEY,
+    user_id VARCHAR(50),
+    verdict TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_skill_verdicts_user ON skill_verdicts(user_id);
+CREATE INDEX IF NOT EXISTS idx_skill_verdicts_created ON skill_verdicts(created_at);
+"""
+
+
+def _norm(value) -> str:
+    return " ".join(str(value if value is not None else "").split())
+
+
+def make_verdict_key(job_skill: Dict, student_skill: Dict, context: Dict) -> str:
+    """
+    规范化 prompt 输入后取哈希。字段与默认值与 LLMCrossValidator._llm_evaluate_once 的 prompt 一致，
+    技能名折叠大小写/空白（"python 3" 与 "Python 3" 视为同一输入）。
+    """
+    payload = [
+        str(context.get("user_id") or ""),
+        fold_skill(str(job_skill.get("skill", "") or "")),
+        _norm(job_skill.get("level", "熟悉")),
+        _norm(job_skill.get("importance", "重要")),
+        fold_skill(str(student_skill.get("skill", "") or "")),
+        _norm(student_skill.get("level", "了解")),
+        [_norm(e) for e in student_skill.get("evidence", []) or []],
+        _norm(context.get("major", "")),
+        _norm(context.get("gpa", "")),
+        _norm(context.get("learning_ability", 75)),
+    ]
+    raw = json.dumps(payload, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """
+    LLM 验证结果两级缓存（线程安全）。
+    stats() 返回命中/未命中计数，用于观察缓存效果。
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # cache_key -> (user_id, verdict, created_at)
+        self._lru: "OrderedDict[str, Tuple[str, Dict, float]]" = OrderedDict()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._disk_ok = self._init_db()
+
+    # ---------- SQLite ----------
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self) -> bool:
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.executescript(CREATE_SQL)
+                conn.commit()
+            finally:
+                conn.close()
+            return True
+        except Exception as e:
+            logger.warning("[VerdictCache] SQLite 不可用，仅使用进程内缓存: %s", e)
+            return False
+
+    # ---------- 读写 ----------
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, user_id: str, verdict: Dict, created_at: float):
+        """写入 LRU（调用方持锁）"""
+        self._lru[key] = (user_id, verdict, created_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """批量查询：先查 LRU，未命中的一次 SQL 查磁盘；返回命中的 key -> verdict"""
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                entry = self._lru.get(key)
+                if entry is not None and not self._expired(entry[2]):
+                    self._lru.move_to_end(key)
+                    found[key] = entry[1]
+                else:
+                    if entry is not None:
+                        del self._lru[key]
+                    missing.append(key)
+
+        if missing and self._disk_ok:
+            rows = []
+            try:
+                conn = self._connect()
+                try:
+                    # SQLite 默认变量上限 999，分批查询
+                    for i in range(0, len(missing), 500):
+                        chunk = missing[i:i + 500]
+                        rows.extend(conn.execute(
+                            "SELECT cache_key, user_id, verdict, created_at FROM skill_verdicts "
+                            f"WHERE cache_key IN ({','.join('?' * len(chunk))})",
+                            chunk,
+                        ).fetchall())
+                finally:
+                    conn.close()
+            except Exception as e:
+                logger.warning("[VerdictCache] 读取失败: %s", e)
+            with self._lock:
+                for key, user_id, verdict_json, created_at in rows:
+                    if self._expired(created_at):
+                        continue
+                    try:
+                        verdict = json.loads(verdict_json)
+                    except (TypeError, ValueError):
+                        continue
+                    found[key] = verdict
+                    self._remember(key, user_id, verdict, created_at)
+                    self._disk_hits += 1
+
+        with self._lock:
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: List[Tuple[str, object, Dict]]):
+        """批量写入 [(cache_key, user_id, verdict)]"""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        with self._lock:
+            for key, user_id, verdict in items:
+                uid = str(user_id) if user_id is not None else ""
+                self._remember(key, uid, verdict, now)
+                rows.append((key, uid, json.dumps(verdict, ensure_ascii=False), now))
+        if not self._disk_ok:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO skill_verdicts (cache_key, user_id, verdict, created_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning("[VerdictCache] 写入失败: %s", e)
+
+    def put(self, key: str, user_id, verdict: Dict):
+        self.put_many([(key, user_id, verdict)])
+
+    # ---------- 失效 ----------
+
+    def invalidate_user(self, user_id) -> int:
+        """清除某用户的全部验证结果（能力画像变化时调用），返回磁盘删除条数"""
+        uid = str(user_id) if user_id is not None else ""
+        with self._lock:
+            for key in [k for k, entry in self._lru.items() if entry[0] == uid]:
+                del self._lru[key]
+        if not self._disk_ok:
+            return 0
+        try:
+            conn = self._connect()
+            try:
+                cur = conn.execute("DELETE FROM skill_verdicts WHERE user_id = ?", (uid,))
+                conn.commit()
+                deleted = cur.rowcount
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning("[VerdictCache] 清除用户 %s 缓存失败: %s", uid, e)
+            return 0
+        if deleted:
+            logger.info("[VerdictCache] 已清除用户 %s 的 %d 条验证缓存", uid, deleted)
+        return deleted
+
+    def purge_expired(self) -> int:
+        """删除磁盘上已过期的记录"""
+        if not self._disk_ok or self.ttl_seconds <= 0:
+            return 0
+        try:
+            conn = self._connect()
+            try:
+                cur = conn.execute(
+                    "DELETE FROM skill_verdicts WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                )
+                conn.commit()
+                return cur.rowcount
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning("[VerdictCache] 清理过期记录失败: %s", e)
+            return 0
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+        if not self._disk_ok:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM skill_verdicts")
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning("[VerdictCache] 清空失败: %s", e)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "memory_entries": len(self._lru),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+_verdict_cache: Optional[VerdictCache] = None
+
+
+def get_verdict_cache() -> VerdictCache:
+    global _verdict_cache
+    if _verdict_cache is None:
+        _verdict_cache = VerdictCache()
+        _verdict_cache.purge_expired()
+    return _verdict_cache
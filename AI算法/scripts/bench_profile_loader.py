@@ -0,0 +1,140 @@
+"""
+岗位画像分块加载基准：按 2k / 10k / 100k 行（可配置）生成测试 CSV，分别测量
+- 串行派生（workers=1）与进程池派生的冷启动（派生画像缓存为空）
+- 热启动（缓存已全部命中）
+的首块可用耗时、全部加载耗时与峰值内存（主进程 / 进程池子进程的最大 RSS）。
+
+测试 CSV 由源 CSV 的行循环复制而成（职位编号追加序号，保证行内容各不相同），与快照、缓存一起写入临时目录，不影响 data/。
+每次测量在独立子进程中进行，峰值内存互不干扰。
+运行：在 AI算法 目录下执行 python scripts/bench_profile_loader.py [--csv 路径] [--sizes 2000,10000,100000] [--workers N]
+"""
+import argparse
+import csv
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# 保证可导入上层模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_handler import logger
+from utils.path_tool import get_abs_path
+
+
+def _write_csv(src_path: str, dst_path: str, n_rows: int):
+    with open(src_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        source = list(reader)
+    if not source:
+        raise ValueError(f"源 CSV 没有数据行: {src_path}")
+    with open(dst_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(n_rows):
+            row = dict(source[i % len(source)])
+            row["职位编号"] = f"{row.get('职位编号') or 'job'}-{i}"
+            writer.writerow(row)
+
+
+def _child(args):
+    """子进程：加载一次并输出 JSON 结果"""
+    from job_profile.job_csv_snapshot import load_or_ingest
+    from job_profile.job_profile_service import _profile_extractor_version
+    from job_profile.derived_profile_cache import DerivedProfileCache
+    from job_profile.profile_loader import StreamingProfileLoader
+
+    start = time.perf_counter()
+    snapshot = load_or_ingest(args.csv, store_dir=args.snapshot_dir)
+    snapshot_s = time.perf_counter() - start
+
+    cache = DerivedProfileCache(_profile_extractor_version(), db_path=args.db)
+    start = time.perf_counter()
+    loader = StreamingProfileLoader(snapshot, max_rows=0, chunk_size=args.chunk_size,
+                                    workers=args.workers, cache=cache)
+    profiles = loader.start(background=True)
+    first_s = time.perf_counter() - start
+    first_rows = len(profiles)
+    loader.join()
+    total_s = time.perf_counter() - start
+
+    print(json.dumps({
+        "rows": loader.status.loaded_rows,
+        "profiles": len(loader._profiles),
+        "snapshot_s": round(snapshot_s, 3),
+        "first_chunk_s": round(first_s, 3),
+        "first_chunk_rows": first_rows,
+        "total_s": round(total_s, 3),
+        "derived_rows": loader.status.derived_rows,
+        "cached_rows": loader.status.cached_rows,
+        # Linux 上 ru_maxrss 单位为 KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "worker_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }))
+
+
+def _run_child(csv_path: str, workdir: str, db_path: str, workers: int, chunk_size: int) -> dict:
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--child",
+        "--csv", csv_path, "--snapshot-dir", os.path.join(workdir, "snapshot"),
+        "--db", db_path, "--workers", str(workers), "--chunk-size", str(chunk_size),
+    ]
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="岗位画像分块加载基准")
+    parser.add_argument("--csv", default=None, help="源 CSV 路径，默认取 config/job_profile.yml 的 job_data_path")
+    parser.add_argument("--sizes", default="2000,10000,100000", help="测试行数，逗号分隔")
+    parser.add_argument("--workers", type=int, default=0, help="进程池大小，0=CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot-dir", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--db", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args)
+        return
+
+    from job_profile.job_profile_service import job_profile_conf
+
+    src = args.csv or get_abs_path(job_profile_conf.get("job_data_path", "data/求职岗位信息数据.csv"))
+    if not os.path.isfile(src):
+        logger.error("CSV 不存在: %s", src)
+        sys.exit(1)
+    workers = args.workers or (os.cpu_count() or 1)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    root = tempfile.mkdtemp(prefix="bench_profile_loader_")
+    try:
+        for n in sizes:
+            workdir = os.path.join(root, str(n))
+            os.makedirs(workdir)
+            csv_path = os.path.join(workdir, "jobs.csv")
+            _write_csv(src, csv_path, n)
+            runs = [
+                ("串行冷启动", os.path.join(workdir, "serial.db"), 1),
+                ("进程池冷启动", os.path.join(workdir, "pool.db"), workers),
+                ("热启动", os.path.join(workdir, "pool.db"), workers),
+            ]
+            for label, db_path, w in runs:
+                r = _run_child(csv_path, workdir, db_path, w, args.chunk_size)
+                logger.info(
+                    "%7d 行 %-6s workers=%-2d 首块 %d 行 %.2fs，全部 %.2fs（派生 %d，命中 %d），"
+                    "峰值内存 主进程 %.0fMB / 子进程 %.0fMB",
+                    n, label, w, r["first_chunk_rows"], r["first_chunk_s"], r["total_s"],
+                    r["derived_rows"], r["cached_rows"], r["peak_rss_mb"], r["worker_peak_rss_mb"],
+                )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
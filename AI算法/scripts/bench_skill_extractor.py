@@ -0,0 +1,149 @@
+"""
+职位描述技能 / 要求提取基准：关键词自动机 vs 原逐关键词子串扫描。
+对 CSV 全部职位描述各跑一遍，输出耗时与结果差异（差异来自短英文关键词的词边界，如 "Go" 不再命中 Django）。
+运行：在 AI算法 目录下执行 python scripts/bench_skill_extractor.py [--csv 路径] [--limit N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+# 保证可导入上层模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_handler import logger
+from utils.path_tool import get_abs_path
+
+
+def _legacy_extract_skills(desc: str, skill_keywords: dict) -> dict:
+    """原实现：对每个关键词做一次 kw in text"""
+    if not desc or not isinstance(desc, str):
+        return {"programming_languages": [], "frameworks_tools": [], "domain_knowledge": []}
+    text = desc[:3000].lower()
+    result = {"programming_languages": [], "frameworks_tools": [], "domain_knowledge": []}
+    seen = set()
+    for skill_type, keywords in skill_keywords.items():
+        for kw in keywords:
+            kw_lower = kw.lower()
+            if kw_lower in seen:
+                continue
+            if kw_lower in text:
+                seen.add(kw_lower)
+                result[skill_type].append({"skill": kw, "level": "熟悉", "importance": "重要", "weight": 0.05})
+        result[skill_type] = result[skill_type][:10]
+    return result
+
+
+def _legacy_infer_requirements(desc: str) -> tuple:
+    """原实现：学历 / 年限 / 软技能逐个子串判断"""
+    text = (desc or "")[:2000]
+    edu = "本科"
+    if "博士" in text:
+        edu = "博士"
+    elif "硕士" in text or "研究生" in text:
+        edu = "硕士"
+    elif "大专" in text or "专科" in text:
+        edu = "专科"
+    level = "初级"
+    if any(k in text for k in ["5年", "五年", "6年", "7年", "8年", "10年"]):
+        level = "高级"
+    elif any(k in text for k in ["3年", "三年", "4年", "2年"]):
+        level = "中级"
+    if any(k in text for k in ["架构", "专家", "总监", "负责人"]):
+        level = "高级"
+    if any(k in text for k in ["经理", "主管", "组长"]) and level == "初级":
+        level = "中级"
+    soft = {"innovation": "中", "learning": "高", "communication": "中", "pressure": "中"}
+    if any(k in text for k in ["沟通", "协调", "团队协作", "表达能力"]):
+        soft["communication"] = "高"
+    if any(k in text for k in ["抗压", "压力", "节奏快", "加班"]):
+        soft["pressure"] = "高"
+    if any(k in text for k in ["学习", "快速上手", "自学"]):
+        soft["learning"] = "高"
+    if "创新" in text:
+        soft["innovation"] = "高"
+    return edu, level, soft
+
+
+def _skill_names(skills: dict) -> set:
+    return {(cat, e["skill"]) for cat, entries in skills.items() for e in entries}
+
+
+def _timed(fn, descs, repeat: int):
+    best = None
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(d) for d in descs]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    from job_profile.job_profile_service import (
+        job_profile_conf,
+        _SKILL_KEYWORDS,
+        _get_jd_automaton,
+        _scan_description,
+        _skills_from_scan,
+        _requirements_from_cues,
+    )
+    from job_profile.job_csv_snapshot import get_job_csv_snapshot
+
+    parser = argparse.ArgumentParser(description="职位描述技能提取基准")
+    parser.add_argument("--csv", default=None, help="CSV 路径，默认取 config/job_profile.yml 的 job_data_path")
+    parser.add_argument("--limit", type=int, default=0, help="只取前 N 条职位描述（默认全部）")
+    parser.add_argument("--repeat", type=int, default=3, help="每种实现重复次数，取最快一次")
+    args = parser.parse_args()
+
+    csv_path = args.csv or get_abs_path(job_profile_conf.get("job_data_path", "data/求职岗位信息数据.csv"))
+    snapshot = get_job_csv_snapshot(csv_path)
+    if snapshot is None:
+        logger.error("CSV 不存在: %s", csv_path)
+        sys.exit(1)
+    descs = snapshot.column("职位描述", args.limit)
+    repeat = max(1, args.repeat)
+
+    start = time.perf_counter()
+    _get_jd_automaton()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    def legacy(desc):
+        return _legacy_extract_skills(desc, _SKILL_KEYWORDS), _legacy_infer_requirements(desc)
+
+    def automaton(desc):
+        skill_hits, cues = _scan_description(desc)
+        return _skills_from_scan(skill_hits), _requirements_from_cues(cues)
+
+    legacy_s, legacy_out = _timed(legacy, descs, repeat)
+    new_s, new_out = _timed(automaton, descs, repeat)
+
+    skill_rows = 0
+    requirement_rows = 0
+    dropped = Counter()
+    added = Counter()
+    for (old_skills, old_req), (new_skills, new_req) in zip(legacy_out, new_out):
+        old_names, new_names = _skill_names(old_skills), _skill_names(new_skills)
+        if old_names != new_names:
+            skill_rows += 1
+            dropped.update(name for _, name in old_names - new_names)
+            added.update(name for _, name in new_names - old_names)
+        if old_req != new_req:
+            requirement_rows += 1
+
+    n = len(descs)
+    logger.info("职位描述 %d 条（%s），自动机构建 %.1fms", n, csv_path, build_ms)
+    logger.info("原子串扫描：%.3fs（%.1fµs/条）", legacy_s, legacy_s / max(n, 1) * 1e6)
+    logger.info("关键词自动机：%.3fs（%.1fµs/条），加速 %.2fx", new_s, new_s / max(n, 1) * 1e6,
+                legacy_s / new_s if new_s else 0.0)
+    logger.info("技能结果不同的描述 %d 条；学历 / 职级 / 软技能推断不同的描述 %d 条", skill_rows, requirement_rows)
+    if dropped:
+        logger.info("词边界过滤掉的命中（前 10）：%s", dropped.most_common(10))
+    if added:
+        logger.info("新增命中（前 10，因每类最多 10 个技能被挤入）：%s", added.most_common(10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+导入岗位 CSV，生成列式快照（data/job_csv_snapshot/<CSV 文件名>/v-<版本>/heap.bin + offsets.npy，meta.json 指向当前版本）。
+服务首次读取 CSV 时也会自动导入；更换 CSV 后可先执行本脚本，避免首个请求承担导入耗时。
+运行：在 AI算法 目录下执行 python scripts/build_job_csv_snapshot.py [--csv 路径]
+"""
+import argparse
+import os
+import sys
+import time
+
+# 保证可导入上层模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_handler import logger
+from utils.path_tool import get_abs_path
+
+
+def main():
+    from job_profile.job_profile_service import job_profile_conf
+    from job_profile.job_csv_snapshot import ingest_csv, snapshot_dir_for
+
+    parser = argparse.ArgumentParser(description="导入岗位 CSV 为列式快照")
+    parser.add_argument("--csv", default=None, help="CSV 路径，默认取 config/job_profile.yml 的 job_data_path")
+    args = parser.parse_args()
+
+    csv_path = args.csv or get_abs_path(job_profile_conf.get("job_data_path", "data/求职岗位信息数据.csv"))
+    if not os.path.isfile(csv_path):
+        logger.error("CSV 不存在: %s", csv_path)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    snapshot = ingest_csv(csv_path)
+    logger.info(
+        "岗位 CSV 快照已写入 %s：%d 行 × %d 列，耗时 %.2fs",
+        snapshot_dir_for(csv_path), len(snapshot), len(snapshot.columns), time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
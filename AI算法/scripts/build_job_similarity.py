@@ -0,0 +1,42 @@
+"""
+重建岗位技能相似度近邻索引（data/job_similarity/neighbors.npz）。
+默认按技能签名增量刷新（只重算新增 / 技能变化的岗位）；修改加权匹配规则后加 --full 全量重建。
+服务运行时岗位库变化也会在后台自动增量刷新。
+运行：在 AI算法 目录下执行 python scripts/build_job_similarity.py [--full]
+  --full  忽略已有索引，全量重建
+"""
+import argparse
+import os
+import sys
+import time
+
+# 保证可导入上层模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_handler import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建岗位技能相似度近邻索引")
+    parser.add_argument("--full", action="store_true", help="全量重建")
+    args = parser.parse_args()
+
+    from job_profile.job_catalog import get_job_catalog
+    from job_profile.profile_loader import StreamingProfileLoader, freeze_after_load
+    from job_profile.job_similarity_index import JOB_SIMILARITY_DIR, JobSimilarityService
+
+    # 同步加载全部画像（不走后台分块发布），按全量岗位建索引
+    profiles = StreamingProfileLoader(get_job_catalog().state.snapshot).load()
+    freeze_after_load()
+
+    start = time.time()
+    service = JobSimilarityService(background=False)
+    index = service.refresh(profiles, full=args.full)
+    logger.info(
+        "岗位近邻索引已写入 %s：%d 个岗位，K=%d，耗时 %.2fs",
+        JOB_SIMILARITY_DIR, len(index), index.top_k, time.time() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
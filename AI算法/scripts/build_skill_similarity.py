@@ -0,0 +1,39 @@
+"""
+重建技能相似度矩阵（data/skill_similarity/matrix.npy + vocab.json）。
+修改 _SKILL_KEYWORDS、技能簇表或别名表后执行；服务启动时也会在指纹不符时自动重建。
+运行：在 AI算法 目录下执行 python scripts/build_skill_similarity.py [--embeddings]
+  --embeddings  使用 Sentence Transformer 向量补全规则未覆盖的技能对（需安装 sentence-transformers）
+"""
+import argparse
+import os
+import sys
+
+# 保证可导入上层模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_handler import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建技能相似度矩阵")
+    parser.add_argument("--embeddings", action="store_true", help="使用向量补全规则未覆盖的技能对")
+    args = parser.parse_args()
+
+    from matching.high_precision_matching import EmbeddingSkillMatcher
+    from matching.skill_similarity import SKILL_SIMILARITY_DIR, rebuild_similarity_matrix
+
+    matcher = EmbeddingSkillMatcher()
+    similarity = rebuild_similarity_matrix(
+        matcher.skill_vectors,
+        matcher._rule_similarity_by_id,
+        use_embeddings=args.embeddings,
+    )
+    nonzero = int((similarity.matrix > 0).sum())
+    logger.info(
+        "技能相似度矩阵已写入 %s：词表 %d 个技能，非零技能对 %d 个",
+        SKILL_SIMILARITY_DIR, similarity.size, nonzero,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+预计算 target_jobs 的岗位关联图谱（垂直晋升、横向转岗、晋升路径），写入 job_relations 库与 graph.json。
+默认只构建缺失、版本变化、上次失败或已过期的岗位，中断后重新运行即可续做；服务运行时后台调度也会定时执行，
+两者由流水线租约互斥，同一时刻只有一个在运行。
+运行：在 AI算法 目录下执行 python scripts/precompute_job_graphs.py [--force] [--jobs job_001 job_002] [--workers 4]
+  --force    忽略已有结果全部重建
+  --jobs     只处理指定岗位
+  --workers  岗位间并发数（默认取 graph_precompute_workers）
+"""
+import argparse
+import os
+import sys
+
+# 保证可导入上层模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_handler import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预计算岗位关联图谱")
+    parser.add_argument("--force", action="store_true", help="全部重建")
+    parser.add_argument("--jobs", nargs="*", default=None, help="只处理指定岗位 job_id")
+    parser.add_argument("--workers", type=int, default=None, help="岗位间并发数")
+    args = parser.parse_args()
+
+    from job_profile.graph_precompute import GraphPrecomputePipeline
+
+    stats = GraphPrecomputePipeline(workers=args.workers).run(force=args.force, job_ids=args.jobs)
+    if stats.get("skipped"):
+        logger.warning("其他进程（服务后台调度）正在预计算，本次未执行，请稍后重试")
+        return
+    logger.info(
+        "图谱预计算完成：共 %d 个岗位，本次处理 %d 个，成功 %d，失败 %d，耗时 %.2fs",
+        stats["total"], stats["pending"], stats["built"], stats["failed"], stats["elapsed_seconds"],
+    )
+
+
+if __name__ == "__main__":
+    main()
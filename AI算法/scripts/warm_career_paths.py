@@ -0,0 +1,43 @@
+"""
+批量预热晋升路径缓存（job_relations.db 的 job_promotion_path 表，job_id 为 "name:标准名称"）。
+默认预热 target_jobs 名称与标准岗位类别；已缓存且版本一致的名称跳过，其余并发调用 LLM 生成。
+运行：在 AI算法 目录下执行 python scripts/warm_career_paths.py [--catalog-top 200] [--names 名称 ...] [--workers 8]
+  --catalog-top  另外预热岗位目录中出现次数最多的 N 个标准名称
+  --names        只预热指定名称
+  --workers      并发数
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+
+# 保证可导入上层模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_handler import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量预热晋升路径缓存")
+    parser.add_argument("--catalog-top", type=int, default=0, help="另外预热岗位目录中最常见的 N 个标准名称")
+    parser.add_argument("--names", nargs="*", default=None, help="只预热指定名称")
+    parser.add_argument("--workers", type=int, default=8, help="并发数")
+    args = parser.parse_args()
+
+    from job_profile.career_path_generator import standard_job_names, warm_career_paths
+
+    names = args.names or standard_job_names()
+    if args.catalog_top > 0 and not args.names:
+        from job_profile.job_catalog import get_job_catalog
+        counts = Counter(n for n in get_job_catalog().column("标准名称") if n)
+        names += [n for n, _ in counts.most_common(args.catalog_top)]
+
+    stats = warm_career_paths(names, workers=args.workers)
+    logger.info(
+        "晋升路径预热完成：共 %d 个名称，已缓存 %d，新生成 %d，失败 %d",
+        stats["total"], stats["cached"], stats["generated"], stats["failed"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -84,6 +84,17 @@ def _save_ability_task_store(data: dict):
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def _invalidate_match_caches(user_id: int):
+    """能力画像变化后清除该用户的匹配相关缓存（LLM 技能验证结果、岗位推荐结果）"""
+    try:
+        from matching.verdict_cache import get_verdict_cache
+        from matching.recommendation_cache import get_recommendation_cache
+        get_verdict_cache().invalidate_user(user_id)
+        get_recommendation_cache().invalidate_user(user_id)
+    except Exception as e:
+        logger.warning(f"[AbilityProfile] 清除用户{user_id}匹配缓存失败: {e}")
+
+
 # ============================================================
 # 核心算法：能力评分
 # ============================================================
@@ -831,6 +842,7 @@ class StudentAbilityProfileService:
                 profile_id = f"profile_{user_id}"
                 self.profiles_store[profile_id] = ability_profile
                 _save_profiles_store(self.profiles_store)
+                _invalidate_match_caches(user_id)
                 
                 self.task_store[task_id]["status"] = "completed"
                 logger.info(f"[AbilityProfile] 任务完成: {task_id}")
@@ -872,6 +884,7 @@ class StudentAbilityProfileService:
         # 保存
         self.profiles_store[profile_id] = profile
         _save_profiles_store(self.profiles_store)
+        _invalidate_match_caches(user_id)
         
         logger.info(f"[AbilityProfile] 用户{user_id}画像更新成功，分数变化: {score_change:+d}")
         
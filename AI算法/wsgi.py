@@ -0,0 +1,8 @@
+"""
+WSGI 入口：创建应用并启动后台任务（关联图谱定时预计算）
+多 worker 部署时每个 worker 都会启动调度，由流水线租约保证同一时刻只有一个 worker 在运行预计算。
+运行：在 AI算法 目录下执行 gunicorn -w 4 -b 0.0.0.0:5002 wsgi:app
+"""
+from app import app, start_background_tasks
+
+start_background_tasks()